@@ -0,0 +1,105 @@
+"""
+Benchmark the analytics implementations against a local MongoDB.
+
+Seeds 10k, 100k and 1M synthetic orders into a throwaway database and
+compares latency and Python memory for the "scan" (Python loops),
+"pipeline" (server-side aggregation) and "rollup" (pre-aggregated) modes.
+
+Usage:
+    python benchmarks/bench_analytics.py [10000 100000 1000000]
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017
+    DB_NAME    defaults to bench_analytics (dropped before every run)
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'bench_analytics')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+PRODUCT_COUNT = 200
+BATCH_SIZE = 10_000
+RUNS = 3
+
+MODES = {
+    "scan": server._analytics_from_scan,
+    "pipeline": server._analytics_from_pipeline,
+    "rollup": server._analytics_from_rollups,
+}
+
+
+async def seed(db, count: int):
+    await db.client.drop_database(db.name)
+    products = [
+        {"id": f"bench-{i}", "name": f"Product {i}", "description": "", "price": 10.0,
+         "category_id": "bench", "stock": 0, "created_at": datetime.now(timezone.utc).isoformat()}
+        for i in range(PRODUCT_COUNT)
+    ]
+    await db.products.insert_many(products)
+    await server.reconcile_indexes()
+
+    statuses = [s.value for s in server.OrderStatus]
+    now = datetime.now(timezone.utc)
+    for start in range(0, count, BATCH_SIZE):
+        batch = []
+        for _ in range(min(BATCH_SIZE, count - start)):
+            items = [
+                {"product_id": f"bench-{random.randrange(PRODUCT_COUNT)}", "product_name": "",
+                 "quantity": random.randint(1, 3), "price": 10.0}
+                for _ in range(random.randint(1, 4))
+            ]
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "user_id": "bench",
+                "items": items,
+                "total": sum(i["quantity"] * i["price"] for i in items),
+                "status": random.choice(statuses),
+                "shipping_address": {},
+                "created_at": (now - timedelta(minutes=random.randrange(60 * 24 * 90))).isoformat(),
+            })
+        await db.orders.insert_many(batch, ordered=False)
+    await server.rebuild_analytics_rollups()
+
+
+async def measure(fn):
+    timings = []
+    peak = 0
+    for _ in range(RUNS):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = await fn()
+        timings.append(time.perf_counter() - started)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return min(timings), peak, result
+
+
+async def main(sizes):
+    db = server.db
+    print(f"{'orders':>10}  {'mode':<9} {'best (ms)':>10} {'peak mem (MB)':>14} {'orders counted':>15}")
+    for size in sizes:
+        await seed(db, size)
+        for name, fn in MODES.items():
+            elapsed, peak, result = await measure(fn)
+            counted = sum(result["status_breakdown"].values())
+            print(f"{size:>10}  {name:<9} {elapsed * 1000:>10.1f} {peak / 1024 / 1024:>14.1f} {counted:>15}")
+    await server.client.drop_database(db.name)
+    server.client.close()
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    asyncio.run(main(sizes))
@@ -0,0 +1,62 @@
+"""
+Compare bytes served per product-listing page before and after image variants.
+
+Every image in the uploads directory is run through generate_image_variants
+(the same function upload_file uses). The script then reports what a
+listing page of PAGE_SIZE products costs when it serves the original
+uploads versus the "card" WebP/AVIF variants.
+
+Usage:
+    python benchmarks/bench_image_bytes.py [uploads_dir]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'bench_images')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+PAGE_SIZE = 12
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".avif"}
+
+
+def main(uploads_dir: Path):
+    images = sorted(p for p in uploads_dir.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not images:
+        print(f"No images found in {uploads_dir}")
+        return
+
+    rows = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        started = time.perf_counter()
+        for image in images:
+            try:
+                variants = server.generate_image_variants(str(image), output_dir, image.stem)
+            except Exception as e:
+                print(f"   skipped {image.name}: {e}")
+                continue
+            card = variants["card"]
+            rows.append({
+                "original": image.stat().st_size,
+                **{fmt: (Path(output_dir) / card[fmt]).stat().st_size for fmt in card if fmt not in ("width", "height")},
+            })
+        elapsed = time.perf_counter() - started
+
+    formats = [key for key in rows[0] if key != "original"]
+    print(f"{len(rows)} images, variants generated in {elapsed:.1f}s ({elapsed / len(rows) * 1000:.0f} ms per image)\n")
+    print(f"{'served':<12} {'avg per image':>14} {f'per page ({PAGE_SIZE})':>16} {'vs original':>12}")
+    original_avg = sum(r["original"] for r in rows) / len(rows)
+    for key in ["original"] + formats:
+        avg = sum(r[key] for r in rows) / len(rows)
+        label = key if key == "original" else f"card.{key}"
+        print(f"{label:<12} {avg / 1024:>11.1f} KB {avg * PAGE_SIZE / 1024:>13.1f} KB {avg / original_avg:>11.1%}")
+
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else server.ROOT_DIR / "uploads")
@@ -0,0 +1,115 @@
+"""
+Benchmark product import throughput (rows/sec).
+
+Generates a synthetic catalog as CSV and NDJSON and imports it into a
+throwaway database three ways: one validated insert_one per row (what
+create_product does), the streaming CSV import and the streaming NDJSON
+import. The CSV import is then repeated against the populated catalog to
+measure pure updates, and the export is timed as well.
+
+Usage:
+    python benchmarks/bench_import.py [row_count]
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017
+    DB_NAME    defaults to bench_import (dropped before every run)
+"""
+
+import asyncio
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'bench_import')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+FIELDS = ["id", "sku", "name", "description", "price", "category_id", "stock"]
+
+
+def rows(count: int):
+    for i in range(count):
+        yield {
+            "id": f"bench-{i}",
+            "sku": f"SKU-{i:08d}",
+            "name": f"Product {i}",
+            "description": f"Synthetic product number {i}, imported by the benchmark",
+            "price": round(5 + (i % 500) * 0.37, 2),
+            "category_id": f"cat-{i % 25}",
+            "stock": i % 40,
+        }
+
+
+def write_files(directory: Path, count: int):
+    csv_path, ndjson_path = directory / "catalog.csv", directory / "catalog.ndjson"
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows(count))
+    with open(ndjson_path, "w") as f:
+        for row in rows(count):
+            f.write(json.dumps(row) + "\n")
+    return csv_path, ndjson_path
+
+
+async def reset(db):
+    await db.client.drop_database(db.name)
+    await server.reconcile_indexes()
+    await server.startup()
+
+
+async def insert_one_per_row(db, count: int):
+    for row in rows(count):
+        product = server.Product(**server.ProductCreate(**row).model_dump())
+        product_dict = product.model_dump()
+        product_dict["created_at"] = product_dict["created_at"].isoformat()
+        await db.products.insert_one(product_dict)
+
+
+async def streaming_import(path: Path, fmt: str):
+    job = await server.create_product_import_job(path, fmt, "id")
+    job = await server.run_product_import(job["id"])
+    assert job["status"] == "completed" and not job["failed"], job
+
+
+async def export(fmt: str):
+    size = 0
+    async for chunk in server.iter_product_export(fmt):
+        size += len(chunk)
+    return size
+
+
+async def main(count: int):
+    db = server.db
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path, ndjson_path = write_files(Path(directory), count)
+        print(f"{count} rows, batches of {server.PRODUCT_IMPORT_BATCH_SIZE}\n")
+        print(f"{'method':<28} {'seconds':>9} {'rows/sec':>10}")
+
+        async def report(label: str, coroutine, fresh: bool = True):
+            if fresh:
+                await reset(db)
+            started = time.perf_counter()
+            await coroutine
+            elapsed = time.perf_counter() - started
+            print(f"{label:<28} {elapsed:>9.2f} {count / elapsed:>10.0f}")
+
+        await report("insert_one per row", insert_one_per_row(db, count))
+        await report("streaming CSV (inserts)", streaming_import(csv_path, "csv"))
+        await report("streaming CSV (updates)", streaming_import(csv_path, "csv"), fresh=False)
+        await report("streaming NDJSON (inserts)", streaming_import(ndjson_path, "ndjson"))
+        await report("export CSV", export("csv"), fresh=False)
+        await report("export NDJSON", export("ndjson"), fresh=False)
+
+    await server.client.drop_database(db.name)
+    server.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
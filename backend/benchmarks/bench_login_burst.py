@@ -0,0 +1,122 @@
+"""
+Measure /api/products latency while 100 logins arrive at once.
+
+Starts the API under uvicorn twice against a throwaway database: once
+hashing on the event loop (PASSWORD_HASH_WORKERS=0, the old behaviour)
+and once with the bounded bcrypt thread pool. In each run a steady stream
+of catalog requests is timed while LOGINS customers sign in together,
+and the p50/p99 catalog latency plus the login outcomes are reported.
+
+Usage:
+    python benchmarks/bench_login_burst.py [logins] [hash_workers]
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+from passlib.context import CryptContext
+from pymongo import MongoClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PORT = 8767
+DB_NAME = "bench_login_burst"
+PASSWORD = "burst-password"
+CATALOG_CLIENTS = 4
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_server(mongo_url: str, hash_workers: int, logins: int):
+    env = {**os.environ, "MONGO_URL": mongo_url, "DB_NAME": DB_NAME, "GODADDY_SSH_HOST": "",
+           "PASSWORD_HASH_WORKERS": str(hash_workers), "RESPONSE_CACHE_BACKEND": "off",
+           "JOB_WORKER_CONCURRENCY": "0"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"http://127.0.0.1:{PORT}/health", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.2)
+
+        catalog_latencies = []
+        burst_over = threading.Event()
+
+        def browse():
+            session = requests.Session()
+            while not burst_over.is_set():
+                started = time.perf_counter()
+                session.get(f"http://127.0.0.1:{PORT}/api/products?limit=12", timeout=120)
+                catalog_latencies.append(time.perf_counter() - started)
+
+        start = threading.Barrier(logins)
+
+        def login(i: int) -> int:
+            session = requests.Session()
+            start.wait()
+            response = session.post(f"http://127.0.0.1:{PORT}/api/auth/login",
+                                    json={"email": f"burst{i}@example.com", "password": PASSWORD}, timeout=120)
+            return response.status_code
+
+        browsers = [threading.Thread(target=browse) for _ in range(CATALOG_CLIENTS)]
+        for thread in browsers:
+            thread.start()
+        time.sleep(1)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=logins) as executor:
+            statuses = Counter(executor.map(login, range(logins)))
+        elapsed = time.perf_counter() - started
+        burst_over.set()
+        for thread in browsers:
+            thread.join()
+        return catalog_latencies, statuses, elapsed
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(logins: int, hash_workers: int):
+    mongo_url = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+    mongo = MongoClient(mongo_url)
+    mongo.drop_database(DB_NAME)
+    db = mongo[DB_NAME]
+    now = datetime.now(timezone.utc).isoformat()
+    hashed = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(PASSWORD)
+    db.users.insert_many([{"id": str(uuid.uuid4()), "email": f"burst{i}@example.com", "full_name": f"Burst {i}",
+                           "role": "customer", "password": hashed, "created_at": now} for i in range(logins)])
+    db.products.insert_many([{"id": str(uuid.uuid4()), "name": f"Product {i}", "description": "", "price": 10.0,
+                              "category_id": "bench", "stock": 5, "created_at": now} for i in range(200)])
+    try:
+        print(f"{logins} concurrent logins, {CATALOG_CLIENTS} clients browsing /api/products\n")
+        print(f"{'hashing':<22} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'burst (s)':>10}  logins")
+        for label, workers in [("event loop (before)", 0), (f"{hash_workers} threads (after)", hash_workers)]:
+            latencies, statuses, elapsed = run_server(mongo_url, workers, logins)
+            print(f"{label:<22} {statistics.median(latencies) * 1000:>9.1f} {percentile(latencies, 0.99) * 1000:>9.1f} "
+                  f"{max(latencies) * 1000:>9.1f} {elapsed:>10.2f}  {dict(sorted(statuses.items()))}")
+    finally:
+        mongo.drop_database(DB_NAME)
+        mongo.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 100, args[1] if len(args) > 1 else 4)
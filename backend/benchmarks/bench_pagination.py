@@ -0,0 +1,105 @@
+"""
+Benchmark deep pagination of the orders list: skip/limit pages vs keyset cursors.
+
+Seeds synthetic orders into a throwaway database, builds the startup
+indexes, then times fetching page PAGE (default 1000) through paginate()
+in offset mode (skip + count_documents) and in cursor mode (the `after`
+token of the previous page, with and without a total count).
+
+Usage:
+    python benchmarks/bench_pagination.py [order_count] [page]
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017
+    DB_NAME    defaults to bench_pagination (dropped before and after the run)
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'bench_pagination')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+LIMIT = 12
+BATCH_SIZE = 10_000
+RUNS = 20
+
+
+async def seed(db, count: int):
+    await db.client.drop_database(db.name)
+    now = datetime.now(timezone.utc)
+    for start in range(0, count, BATCH_SIZE):
+        await db.orders.insert_many([
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": f"user-{i % 50}",
+                "items": [{"product_id": "bench", "product_name": "", "quantity": 1, "price": 10.0}],
+                "total": 10.0,
+                "status": "pending",
+                "shipping_address": {},
+                # Several orders share each timestamp so the id tie-breaker is exercised
+                "created_at": (now - timedelta(seconds=i // 3)).isoformat(),
+            }
+            for i in range(start, min(start + BATCH_SIZE, count))
+        ], ordered=False)
+    await server.reconcile_indexes()
+    await server.startup()
+
+
+async def timed(fn):
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        docs, pagination = await fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), docs
+
+
+async def main(count: int, page: int):
+    db = server.db
+    await seed(db, count)
+    projection = {"_id": 0}
+
+    # The cursor a client would hold after walking to page - 1
+    previous = await db.orders.find({}, projection).sort(server.KEYSET_SORT) \
+        .skip((page - 1) * LIMIT - 1).limit(1).to_list(1)
+    after = server.encode_cursor(previous[0])
+
+    modes = {
+        "offset, exact count": lambda: server.paginate(db.orders, {}, projection, page, LIMIT),
+        "offset, no count": lambda: server.paginate(db.orders, {}, projection, page, LIMIT, count="none"),
+        "cursor, estimated": lambda: server.paginate(db.orders, {}, projection, page, LIMIT,
+                                                     cursor=True, after=after, count="estimated"),
+        "cursor, no count": lambda: server.paginate(db.orders, {}, projection, page, LIMIT,
+                                                    cursor=True, after=after, count="none"),
+    }
+    print(f"{count} orders, page {page} ({LIMIT} per page), median of {RUNS} runs\n")
+    print(f"{'mode':<22} {'latency (ms)':>13}")
+    pages = {}
+    for name, fn in modes.items():
+        elapsed, docs = await timed(fn)
+        pages[name] = docs
+        print(f"{name:<22} {elapsed * 1000:>13.2f}")
+
+    # Offset pages have no defined order, so only check the cursor page is the sorted slice
+    expected = await db.orders.find({}, projection).sort(server.KEYSET_SORT) \
+        .skip((page - 1) * LIMIT).limit(LIMIT).to_list(LIMIT)
+    same = [d["id"] for d in pages["cursor, no count"]] == [d["id"] for d in expected]
+    print(f"\nCursor page matches sorted skip page: {same}")
+
+    await server.client.drop_database(db.name)
+    server.client.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    asyncio.run(main(args[0] if args else 200_000, args[1] if len(args) > 1 else 1000))
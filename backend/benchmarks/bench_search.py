@@ -0,0 +1,111 @@
+"""
+Benchmark product search: regex scan vs text index vs in-memory inverted index.
+
+Seeds a synthetic bilingual catalog (products plus entity.product.*
+Arabic translations) into a throwaway database, then times every search
+mode over the same queries and prints the in-memory index footprint.
+
+Usage:
+    python benchmarks/bench_search.py [product_count]
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017
+    DB_NAME    defaults to bench_search (dropped before and after the run)
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'bench_search')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+EN_WORDS = ["phone", "case", "leather", "wireless", "charger", "cotton", "shirt", "garden", "lamp",
+            "kitchen", "knife", "steel", "running", "shoes", "camera", "lens", "desk", "chair", "rug"]
+AR_WORDS = ["هاتف", "غطاء", "جلد", "لاسلكي", "شاحن", "قطن", "قميص", "حديقة", "مصباح",
+            "مطبخ", "سكين", "فولاذ", "جري", "أحذية", "كاميرا", "عدسة", "مكتب", "كرسي", "سجادة"]
+QUERIES = ["phone", "wireless charger", "leather ca", "هاتف", "احذيه", "مصب", "steel knife", "zzz"]
+RUNS = 50
+PAGE = 12
+
+
+async def seed(db, count: int):
+    await db.client.drop_database(db.name)
+    products, translations = [], []
+    for i in range(count):
+        words = random.sample(range(len(EN_WORDS)), 3)
+        product_id = f"bench-{i}"
+        products.append({
+            "id": product_id,
+            "name": " ".join(EN_WORDS[w] for w in words[:2]).title(),
+            "description": " ".join(EN_WORDS[w] for w in words) + " for everyday use",
+            "price": 10.0,
+            "category_id": f"cat-{i % 10}",
+            "stock": 5,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+        translations.append({"key": f"entity.product.{product_id}.name", "en": "", "type": "product",
+                             "ref_id": product_id, "ar": " ".join(AR_WORDS[w] for w in words[:2])})
+        translations.append({"key": f"entity.product.{product_id}.description", "en": "", "type": "product",
+                             "ref_id": product_id, "ar": " ".join(AR_WORDS[w] for w in words)})
+    await db.products.insert_many(products)
+    await db.translations.insert_many(translations)
+    await server.reconcile_indexes()
+    await server.startup()
+
+
+async def time_mode(fn, query):
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        total, _ = await fn(query, {}, 0, PAGE)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), total
+
+
+async def main(count: int):
+    db = server.db
+    server.SEARCH_MODE = "memory"
+    await seed(db, count)
+
+    modes = {
+        "regex": server._search_products_regex,
+        "text": server._search_products_text,
+        "memory": server._search_products_memory,
+    }
+    print(f"{count} products, median of {RUNS} runs, page size {PAGE}\n")
+    print(f"{'query':<18} " + " ".join(f"{name + ' (ms)':>12} {'hits':>6}" for name in modes))
+    for query in QUERIES:
+        row = []
+        for fn in modes.values():
+            elapsed, total = await time_mode(fn, query)
+            row.append(f"{elapsed * 1000:>12.2f} {total:>6}")
+        print(f"{query:<18} " + " ".join(row))
+
+    started = time.perf_counter()
+    for _ in range(RUNS):
+        for query in QUERIES:
+            server.catalog_search_index.search(query)
+    per_lookup = (time.perf_counter() - started) / (RUNS * len(QUERIES))
+    print(f"\nIndex id resolution alone: {per_lookup * 1_000_000:.1f} µs per query")
+
+    stats = server.catalog_search_index.stats()
+    print(f"Index footprint: ~{stats['approx_bytes'] / 1024 / 1024:.1f} MB "
+          f"({stats['tokens']} tokens, {stats['prefixes']} prefixes, {stats['postings']} postings)")
+    for structure, size in stats["approx_bytes_by_structure"].items():
+        print(f"   {structure:<10} ~{size / 1024 / 1024:.1f} MB")
+
+    await server.client.drop_database(db.name)
+    server.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
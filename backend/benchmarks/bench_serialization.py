@@ -0,0 +1,140 @@
+"""
+Benchmark product page serialization: validated models vs TrustedShape + orjson.
+
+"before" builds Product(**doc) per row and renders it with jsonable_encoder
+and json.dumps, which is what the product listing did. "after" is the
+current read path (PRODUCT_SHAPE.dump_many + dump_json). The script prints
+pages per second for 12-, 100- and 500-item pages, the top functions of a
+CPU profile of the 500-item page for both paths, and, with --http, the
+requests per second of GET /api/products through the ASGI app against
+MongoDB (response cache off).
+
+Usage:
+    python benchmarks/bench_serialization.py [--http]
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017 (--http only)
+    DB_NAME    defaults to bench_serialization (dropped before and after)
+"""
+
+import asyncio
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'bench_serialization')
+os.environ['RESPONSE_CACHE_BACKEND'] = 'off'
+os.environ['JOB_WORKER_CONCURRENCY'] = '0'
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import server  # noqa: E402
+
+PAGE_SIZES = [12, 100, 500]
+SECONDS_PER_CASE = 2.0
+
+
+def make_products(count: int):
+    now = datetime.now(timezone.utc)
+    return [{
+        "id": str(uuid.uuid4()),
+        "name": f"Product {i}",
+        "description": "A sturdy everyday product with a reasonably long description " * 2,
+        "price": 10 + i % 90,
+        "category_id": f"cat-{i % 10}",
+        "image_url": f"/api/uploads/{uuid.uuid4()}.webp",
+        "stock": i % 25,
+        "sku": f"SKU-{i:06d}",
+        "created_at": now - timedelta(minutes=i),
+    } for i in range(count)]
+
+
+def render_before(products):
+    page = {"data": [server.Product(**p) for p in products], "pagination": {"total": len(products)}}
+    return json.dumps(jsonable_encoder(page), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def render_after(products):
+    return server.dump_json(server._product_page(products, {"total": len(products)}))
+
+
+def pages_per_second(render, products) -> float:
+    rendered = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < SECONDS_PER_CASE:
+        render(products)
+        rendered += 1
+    return rendered / (time.perf_counter() - started)
+
+
+def profile(render, products, label: str):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(50):
+        render(products)
+    profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("tottime").print_stats(8)
+    lines = [line for line in out.getvalue().splitlines() if line.strip()]
+    print(f"\n{label}: 50 renders of a {len(products)}-item page, top functions by own time")
+    start = next(i for i, line in enumerate(lines) if line.lstrip().startswith("ncalls"))
+    for line in lines[start:start + 9]:
+        print(f"   {line}")
+
+
+async def http_requests_per_second(limit: int) -> float:
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        done = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < SECONDS_PER_CASE:
+            response = await client.get("/api/products", params={"limit": limit})
+            response.raise_for_status()
+            done += 1
+        return done / (time.perf_counter() - started)
+
+
+async def http_benchmark():
+    db = server.db
+    await server.client.drop_database(db.name)
+    await db.products.insert_many(make_products(max(PAGE_SIZES)))
+    baseline = server._product_page
+    print(f"\n{'page size':>9} {'before (req/s)':>15} {'after (req/s)':>14}")
+    for size in PAGE_SIZES:
+        server._product_page = lambda products, pagination: {
+            "data": [server.Product(**p) for p in products], "pagination": pagination}
+        before = await http_requests_per_second(size)
+        server._product_page = baseline
+        after = await http_requests_per_second(size)
+        print(f"{size:>9} {before:>15.0f} {after:>14.0f}")
+    await server.client.drop_database(db.name)
+    server.client.close()
+
+
+def main(http: bool):
+    products = make_products(max(PAGE_SIZES))
+    assert render_before(products[:12]) == render_after(products[:12]), "paths render different JSON"
+    print(f"{'page size':>9} {'before (pages/s)':>17} {'after (pages/s)':>16} {'speedup':>8}")
+    for size in PAGE_SIZES:
+        page = products[:size]
+        before = pages_per_second(render_before, page)
+        after = pages_per_second(render_after, page)
+        print(f"{size:>9} {before:>17.0f} {after:>16.0f} {after / before:>7.1f}x")
+    profile(render_before, products, "before")
+    profile(render_after, products, "after")
+    if http:
+        asyncio.run(http_benchmark())
+
+
+if __name__ == "__main__":
+    main("--http" in sys.argv[1:])
@@ -0,0 +1,151 @@
+"""
+Measure backend memory while 20 clients upload 50 MB files at once.
+
+Starts the API under uvicorn in a subprocess (local storage, claims-only
+admin auth so no admin user has to exist), fires concurrent multipart
+uploads at /api/upload and samples the server's RSS from /proc while
+they run. Linux only.
+
+Usage:
+    python benchmarks/bench_upload_memory.py [concurrency] [size_mb]
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017 (used for startup only)
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import jwt
+import requests
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PORT = 8765
+JWT_SECRET = "bench-upload-secret"
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class MultipartBody:
+    """File-like multipart body generated on the fly, so the client does not buffer it either"""
+
+    def __init__(self, boundary: str, index: int, size: int):
+        self.head = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"bench-{index}.bin\"\r\n"
+                     f"Content-Type: application/octet-stream\r\n\r\n").encode()
+        self.tail = f"\r\n--{boundary}--\r\n".encode()
+        self.size = size
+        self.block = os.urandom(1024 * 1024)
+        self.position = 0
+
+    def __len__(self):
+        return len(self.head) + self.size + len(self.tail)
+
+    def read(self, n: int = -1) -> bytes:
+        total = len(self)
+        if self.position >= total:
+            return b""
+        n = total - self.position if n is None or n < 0 else min(n, total - self.position)
+        out = bytearray()
+        while len(out) < n:
+            pos = self.position
+            if pos < len(self.head):
+                piece = self.head[pos:pos + n - len(out)]
+            elif pos < len(self.head) + self.size:
+                offset = (pos - len(self.head)) % len(self.block)
+                remaining = len(self.head) + self.size - pos
+                piece = self.block[offset:offset + min(n - len(out), remaining)]
+            else:
+                start = pos - len(self.head) - self.size
+                piece = self.tail[start:start + n - len(out)]
+            out += piece
+            self.position += len(piece)
+        return bytes(out)
+
+
+def upload(url: str, token: str, size: int, index: int) -> int:
+    boundary = f"bench{index}"
+    response = requests.post(
+        url,
+        data=MultipartBody(boundary, index, size),
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+        },
+        timeout=600,
+    )
+    return response.status_code
+
+
+def main(concurrency: int, size_mb: int):
+    size = size_mb * 1024 * 1024
+    uploads_dir = tempfile.mkdtemp(prefix="bench-uploads-")
+    env = {
+        **os.environ,
+        "MONGO_URL": os.environ.get("MONGO_URL", "mongodb://localhost:27017"),
+        "DB_NAME": "bench_upload",
+        "UPLOADS_DIR": uploads_dir,
+        "UPLOAD_MAX_BYTES": str(size + 1024 * 1024),
+        "AUTH_CLAIMS_ONLY": "true",
+        "JWT_SECRET": JWT_SECRET,
+        "GODADDY_SSH_HOST": "",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"http://127.0.0.1:{PORT}/health", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.2)
+        token = jwt.encode({"user_id": "bench", "role": "admin", "type": "access",
+                            "exp": int(time.time()) + 3600}, JWT_SECRET, algorithm="HS256")
+
+        baseline = rss_mb(server.pid)
+        peak = baseline
+        done = threading.Event()
+
+        def sample():
+            nonlocal peak
+            while not done.is_set():
+                peak = max(peak, rss_mb(server.pid))
+                time.sleep(0.05)
+
+        sampler = threading.Thread(target=sample)
+        sampler.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            statuses = list(executor.map(
+                lambda i: upload(f"http://127.0.0.1:{PORT}/api/upload", token, size, i), range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        sampler.join()
+
+        print(f"{concurrency} concurrent uploads of {size_mb} MB in {elapsed:.1f}s, statuses: {sorted(set(statuses))}")
+        print(f"Server RSS baseline {baseline:.0f} MB, peak {peak:.0f} MB, growth {peak - baseline:.0f} MB")
+        print(f"Growth per concurrent upload: {(peak - baseline) / concurrency:.1f} MB")
+    finally:
+        server.terminate()
+        server.wait()
+        for path in Path(uploads_dir).glob("*"):
+            path.unlink()
+        os.rmdir(uploads_dir)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 20, args[1] if len(args) > 1 else 50)
@@ -0,0 +1,113 @@
+"""
+Flash-sale load test: many buyers order the same product at once.
+
+Starts the API under uvicorn in a subprocess against a throwaway database,
+creates one product with STOCK units and BUYERS customers, then has every
+customer POST /api/orders for one unit at the same moment. Afterwards it
+checks that exactly STOCK orders succeeded, the rest got 409, stock ended
+at zero and the stored orders account for every unit sold.
+
+Usage:
+    python benchmarks/load_test_orders.py [buyers] [stock]
+
+Environment:
+    MONGO_URL          defaults to mongodb://localhost:27017
+    ORDER_TRANSACTIONS passed through to the server (needs a replica set)
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import jwt
+import requests
+from pymongo import MongoClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PORT = 8766
+JWT_SECRET = "load-test-orders-secret"
+DB_NAME = "load_test_orders"
+ADDRESS = {"street_address": "1 Main St", "city": "Town", "state": "ST", "zip_code": "00000"}
+
+
+def main(buyers: int, stock: int):
+    mongo_url = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+    mongo = MongoClient(mongo_url)
+    mongo.drop_database(DB_NAME)
+    db = mongo[DB_NAME]
+    now = datetime.now(timezone.utc).isoformat()
+    product_id = str(uuid.uuid4())
+    db.products.insert_one({"id": product_id, "name": "Flash sale item", "description": "", "price": 19.99,
+                            "category_id": "sale", "stock": stock, "created_at": now})
+    users = [{"id": str(uuid.uuid4()), "email": f"buyer{i}@example.com", "full_name": f"Buyer {i}",
+              "role": "customer", "password": "x", "created_at": now} for i in range(buyers)]
+    db.users.insert_many(users)
+    tokens = [jwt.encode({"user_id": u["id"], "email": u["email"], "role": "customer", "type": "access",
+                          "exp": int(time.time()) + 3600}, JWT_SECRET, algorithm="HS256") for u in users]
+
+    env = {**os.environ, "MONGO_URL": mongo_url, "DB_NAME": DB_NAME, "JWT_SECRET": JWT_SECRET, "GODADDY_SSH_HOST": ""}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"http://127.0.0.1:{PORT}/health", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.2)
+
+        start = threading.Barrier(buyers)
+
+        def buy(token: str) -> int:
+            session = requests.Session()
+            start.wait()
+            response = session.post(
+                f"http://127.0.0.1:{PORT}/api/orders",
+                json={"items": [{"product_id": product_id, "product_name": "", "quantity": 1, "price": 0.01}],
+                      "total": 0.01, "shipping_address": ADDRESS},
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=120,
+            )
+            return response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=buyers) as executor:
+            statuses = Counter(executor.map(buy, tokens))
+        elapsed = time.perf_counter() - started
+
+        remaining = db.products.find_one({"id": product_id})["stock"]
+        orders = list(db.orders.find({"items.product_id": product_id}))
+        sold = sum(item["quantity"] for order in orders for item in order["items"])
+        totals_ok = all(abs(order["total"] - 19.99) < 1e-9 for order in orders)
+
+        print(f"{buyers} buyers, {stock} in stock, {elapsed:.2f}s")
+        print(f"Responses: {dict(sorted(statuses.items()))}")
+        print(f"Orders stored: {len(orders)}, units sold: {sold}, stock left: {remaining}")
+        checks = {
+            "no overselling": sold <= stock and remaining >= 0,
+            "every unit sold": sold == min(stock, buyers) and statuses[200] == sold,
+            "stock matches orders": remaining == stock - sold,
+            "server-side prices": totals_ok,
+        }
+        for name, ok in checks.items():
+            print(f"{'✓' if ok else '✗'} {name}")
+        return 0 if all(checks.values()) else 1
+    finally:
+        server.terminate()
+        server.wait()
+        mongo.drop_database(DB_NAME)
+        mongo.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    sys.exit(main(args[0] if args else 500, args[1] if len(args) > 1 else 100))
@@ -0,0 +1,60 @@
+"""
+Reconcile MongoDB indexes with INDEX_SPECS in server.py.
+build.sh runs `sync` on every deploy; the API itself only checks the
+indexes at startup and logs the ones that are missing or out of date.
+Run `sync` by hand for a fresh local database. A unique index is
+skipped, not half-built, while duplicate values remain.
+
+Usage:
+    python manage_indexes.py sync [--drop-extra]   create / rebuild indexes
+    python manage_indexes.py check                 report drift, change nothing
+    python manage_indexes.py explain               show the plans of the hot queries
+"""
+
+import argparse
+import asyncio
+import sys
+
+from server import client, explain_hot_queries, reconcile_indexes
+
+SYMBOLS = {"ok": "✓", "created": "+", "rebuilt": "~", "dropped": "-", "failed": "✗"}
+
+
+async def sync(dry_run: bool, drop_extra: bool) -> int:
+    print("Checking indexes..." if dry_run else "Reconciling indexes...")
+    report = await reconcile_indexes(dry_run=dry_run, drop_extra=drop_extra)
+    for row in report:
+        detail = f" ({row['detail']})" if row["detail"] else ""
+        print(f"   {SYMBOLS.get(row['action'], '!')} {row['collection']}.{row['index']}: {row['action']}{detail}")
+    pending = [r for r in report if r["action"] in ("create", "rebuild", "failed")]
+    print(f"{len(report)} indexes, {len(pending)} {'out of date' if dry_run else 'failed'}")
+    return 1 if pending else 0
+
+
+async def explain() -> int:
+    print(f"{'query':<24} {'collection':<18} {'plan':<40} index")
+    flagged = 0
+    for row in await explain_hot_queries():
+        problems = [label for label, hit in (("COLLSCAN", row["collection_scan"]), ("SORT", row["in_memory_sort"])) if hit]
+        flagged += bool(problems)
+        plan = " > ".join(row["stages"])
+        print(f"{'✗' if problems else '✓'} {row['name']:<22} {row['collection']:<18} {plan:<40} "
+              f"{', '.join(row['indexes']) or '-'}")
+    print(f"{flagged} queries scan the collection or sort in memory")
+    return 1 if flagged else 0
+
+
+async def main(args) -> int:
+    try:
+        if args.command == "explain":
+            return await explain()
+        return await sync(args.command == "check", args.drop_extra)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile MongoDB indexes with INDEX_SPECS")
+    parser.add_argument("command", choices=["sync", "check", "explain"])
+    parser.add_argument("--drop-extra", action="store_true", help="also drop indexes that are not in INDEX_SPECS")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,38 @@
+"""
+Convert ISO-string timestamps to native BSON dates.
+Safe to run while the API is serving: documents are converted in batches
+and the API reads both formats. Run it again until nothing is left; a
+document with an unparseable value is reported and left untouched.
+
+Usage:
+    python migrate_dates.py [collection ...] [--batch-size 1000] [--pause 0.05] [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from server import TIMESTAMP_FIELDS, client, migrate_timestamps
+
+
+async def main(collections, batch_size: int, pause: float, dry_run: bool):
+    print(f"{'Checking' if dry_run else 'Converting'} timestamps in {len(collections)} collections...")
+    for name in collections:
+        summary = await migrate_timestamps(name, TIMESTAMP_FIELDS[name], batch_size, pause, dry_run)
+        left = f", {summary['remaining']} left" if summary['remaining'] else ""
+        print(f"   ✓ {name}: {summary['converted']} {'to convert' if dry_run else 'converted'}{left}")
+        if summary['invalid']:
+            print(f"   ✗ {name}: {summary['invalid']} values could not be parsed")
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert ISO-string timestamps to BSON dates")
+    parser.add_argument("collections", nargs="*", help=f"default: all of {', '.join(sorted(TIMESTAMP_FIELDS))}")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0, help="seconds to sleep between batches")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    unknown = set(args.collections) - set(TIMESTAMP_FIELDS)
+    if unknown:
+        parser.error(f"no timestamp fields known for: {', '.join(sorted(unknown))}")
+    asyncio.run(main(args.collections or sorted(TIMESTAMP_FIELDS), args.batch_size, args.pause, args.dry_run))
@@ -0,0 +1,87 @@
+"""
+Import or export the product catalog as CSV or NDJSON.
+
+Imports stream the file in batches of PRODUCT_IMPORT_BATCH_SIZE rows and
+upsert them with unordered bulk writes, keyed on id (default) or sku.
+Progress is stored in the import_jobs collection, so an interrupted import
+can be continued with "resume". Exports stream the catalog from a cursor.
+
+Usage:
+    python product_catalog.py import catalog.csv [--key sku] [--format ndjson]
+    python product_catalog.py resume JOB_ID
+    python product_catalog.py export products.csv [--format ndjson]
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from server import (PRODUCT_IMPORT_FORMATS, client, create_product_import_job, iter_product_export,
+                    run_product_import)
+
+
+def print_job(job: dict):
+    print(f"   Job {job['id']}: {job['status']}")
+    print(f"   ✓ {job['rows_processed']} rows read")
+    print(f"   ✓ {job['inserted']} inserted, {job['updated']} updated")
+    if job['failed']:
+        print(f"   ✗ {job['failed']} rows rejected")
+        for error in job['errors'][:20]:
+            print(f"      row {error['row']}: {error['error']}")
+    if job.get('error'):
+        print(f"   ✗ {job['error']}")
+        print(f"   Continue with: python product_catalog.py resume {job['id']}")
+
+
+async def import_file(path: Path, fmt: str, key: str):
+    print(f"Importing {path} ({fmt}, keyed on {key})...")
+    job = await create_product_import_job(path.resolve(), fmt, key)
+    print_job(await run_product_import(job['id']))
+
+
+async def resume(job_id: str):
+    print(f"Resuming import {job_id}...")
+    print_job(await run_product_import(job_id))
+
+
+async def export_file(path: Path, fmt: str):
+    print(f"Exporting products to {path} ({fmt})...")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        async for chunk in iter_product_export(fmt):
+            f.write(chunk)
+    print(f"   ✓ {path.stat().st_size} bytes written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export the product catalog")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import")
+    import_parser.add_argument("path", type=Path)
+    import_parser.add_argument("--format", choices=["csv", "ndjson"])
+    import_parser.add_argument("--key", choices=["id", "sku"], default="id")
+    resume_parser = commands.add_parser("resume")
+    resume_parser.add_argument("job_id")
+    export_parser = commands.add_parser("export")
+    export_parser.add_argument("path", type=Path)
+    export_parser.add_argument("--format", choices=["csv", "ndjson"])
+    args = parser.parse_args()
+
+    fmt = getattr(args, "format", None) or PRODUCT_IMPORT_FORMATS.get(getattr(args, "path", Path()).suffix.lower(), "csv")
+    if args.command == "import":
+        coroutine = import_file(args.path, fmt, args.key)
+    elif args.command == "resume":
+        coroutine = resume(args.job_id)
+    else:
+        coroutine = export_file(args.path, fmt)
+
+    async def run():
+        try:
+            await coroutine
+        finally:
+            client.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
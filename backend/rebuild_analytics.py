@@ -0,0 +1,31 @@
+"""
+Rebuild the analytics rollups from the orders collection.
+Run this after restoring a backup, importing orders directly into MongoDB,
+or whenever the dashboard numbers look out of sync.
+
+Usage:
+    python rebuild_analytics.py
+"""
+
+import asyncio
+
+from server import AnalyticsRebuildRunning, client, rebuild_analytics_rollups
+
+
+async def main():
+    print("Rebuilding analytics rollups from orders...")
+    try:
+        summary = await rebuild_analytics_rollups()
+    except AnalyticsRebuildRunning as e:
+        print(f"   ✗ {e}")
+        client.close()
+        return
+    print(f"   ✓ {summary['orders']} orders")
+    print(f"   ✓ {summary['days']} daily rollups")
+    print(f"   ✓ {summary['statuses']} status rollups")
+    print(f"   ✓ {summary['products']} product rollups")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -43,7 +43,7 @@ async def seed_database():
             "full_name": "Admin User",
             "role": "admin",
             "password": pwd_context.hash("admin@ZM"),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.users.insert_one(admin_user)
         print("   ✓ Admin user created (info@zakimart.com / admin123)")
@@ -57,25 +57,25 @@ async def seed_database():
             "id": "cat-001",
             "name": "Electronics",
             "description": "Electronic devices and accessories",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "cat-002",
             "name": "Fashion",
             "description": "Clothing and fashion items",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "cat-003",
             "name": "Home & Garden",
             "description": "Home decor and garden supplies",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "cat-004",
             "name": "Sports",
             "description": "Sports equipment and gear",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     
@@ -100,7 +100,7 @@ async def seed_database():
             "category_id": category_ids["Electronics"],
             "stock": 50,
             "image_url": "https://images.unsplash.com/photo-1505740420928-5e560c06d30e?auto=format&fit=crop&w=400&h=400&q=80",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "prod-002",
@@ -110,7 +110,7 @@ async def seed_database():
             "category_id": category_ids["Electronics"],
             "stock": 30,
             "image_url": "https://images.unsplash.com/photo-1523275335684-37898b6baf30?auto=format&fit=crop&w=400&h=400&q=80",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "prod-003",
@@ -120,7 +120,7 @@ async def seed_database():
             "category_id": category_ids["Fashion"],
             "stock": 100,
             "image_url": "https://images.unsplash.com/photo-1553062407-98eeb64c6a62?auto=format&fit=crop&w=400&h=400&q=80",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "prod-004",
@@ -130,7 +130,7 @@ async def seed_database():
             "category_id": category_ids["Sports"],
             "stock": 75,
             "image_url": "https://images.unsplash.com/photo-1542291026-7eec264c27ff?auto=format&fit=crop&w=400&h=400&q=80",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "prod-005",
@@ -140,7 +140,7 @@ async def seed_database():
             "category_id": category_ids["Home & Garden"],
             "stock": 40,
             "image_url": "https://images.unsplash.com/photo-1517668808822-9ebb02f2a0e6?auto=format&fit=crop&w=400&h=400&q=80",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "prod-006",
@@ -150,7 +150,7 @@ async def seed_database():
             "category_id": category_ids["Sports"],
             "stock": 120,
             "image_url": "https://images.unsplash.com/photo-1601925260368-ae2f83cf8b7f?auto=format&fit=crop&w=400&h=400&q=80",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "prod-007",
@@ -160,7 +160,7 @@ async def seed_database():
             "category_id": category_ids["Electronics"],
             "stock": 60,
             "image_url": "https://images.unsplash.com/photo-1608043152269-423dbba4e7e1?auto=format&fit=crop&w=400&h=400&q=80",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "prod-008",
@@ -170,7 +170,7 @@ async def seed_database():
             "category_id": category_ids["Fashion"],
             "stock": 45,
             "image_url": "https://images.unsplash.com/photo-1572635196237-14b3f281503f?auto=format&fit=crop&w=400&h=400&q=80",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     
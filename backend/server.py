@@ -1,17 +1,28 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Request, Query, Header, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, TypeAdapter, ValidationError, create_model
+from typing import Awaitable, Callable, List, Optional, get_args, get_origin, Union
 import uuid
+import time
+from collections import OrderedDict, deque
 import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import io
+import csv
+from itertools import islice
+from urllib.parse import urlencode
 from datetime import datetime, timezone, timedelta
 import jwt
 from passlib.context import CryptContext
@@ -19,6 +30,17 @@ import aiofiles
 from enum import Enum
 import requests
 import base64
+import hashlib
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+import re
+import json
+import math
+import orjson
+import random
+import socket
+import gzip
+import sys
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,7 +51,7 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # JWT Configuration
@@ -38,8 +60,33 @@ JWT_ALGORITHM = 'HS256'
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Authenticated user cache: verified users are kept for a short TTL so
+# get_current_user does not hit MongoDB on every request
+USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', '60'))
+USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES', '10000'))
+# When enabled, require_admin trusts the role claim of the access token
+# instead of loading the user (a demoted admin keeps access until the token expires)
+AUTH_CLAIMS_ONLY = os.environ.get('AUTH_CLAIMS_ONLY', 'false').lower() in ('1', 'true', 'yes')
+
+# Public catalog responses are cached as rendered JSON until the matching
+# admin route changes the data. "memory" keeps them in-process, "redis"
+# shares them between workers through RESPONSE_CACHE_URL (needs the redis
+# package), "off" disables the cache
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL', 'redis://localhost:6379/0')
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '300'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '5000'))
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs on PASSWORD_HASH_WORKERS threads (it releases the GIL) instead of
+# the event loop. A hash is refused with 503 when the queue ahead of it would
+# take longer than PASSWORD_HASH_MAX_WAIT_SECONDS at the measured bcrypt speed,
+# or when PASSWORD_HASH_MAX_PENDING hashes are already waiting or running.
+# PASSWORD_HASH_WORKERS=0 hashes on the event loop (no offloading, no cap)
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '128'))
+PASSWORD_HASH_MAX_WAIT_SECONDS = float(os.environ.get('PASSWORD_HASH_MAX_WAIT_SECONDS', '5'))
 security = HTTPBearer()
 
 # Create uploads directory
@@ -56,9 +103,101 @@ GODADDY_SSH_KEY = os.environ.get('GODADDY_SSH_KEY')  # SSH private key
 GODADDY_REMOTE_DIR = os.environ.get('GODADDY_REMOTE_DIR', 'public_html/uploads')
 GODADDY_BASE_URL = os.environ.get('GODADDY_BASE_URL')
 GODADDY_PUBLIC_PATH = os.environ.get('GODADDY_PUBLIC_PATH', '/uploads')
+# Uploads are copied in chunks of UPLOAD_CHUNK_SIZE bytes and rejected
+# with 413 as soon as they exceed UPLOAD_MAX_BYTES
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', str(25 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', str(256 * 1024)))
+# Resized variants produced for every uploaded image (max width in pixels)
+IMAGE_VARIANT_WIDTHS = {"thumb": 160, "card": 480, "detail": 1200}
+IMAGE_VARIANT_SAVE_OPTIONS = {"webp": {"quality": 80, "method": 4}, "avif": {"quality": 55, "speed": 8}}
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+# Images resized on demand by /api/uploads/{filename}?w=&h=&fmt=&q= are kept
+# in a size-bounded LRU cache under UPLOADS_DIR
+IMAGE_CACHE_DIR = UPLOADS_DIR / '.cache'
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+IMAGE_MAX_DIMENSION = 2400
+# Upload names are UUIDs (and derived images are keyed by their source), so
+# a given URL never changes content and browsers may cache it for good
+UPLOADS_CACHE_CONTROL = os.environ.get('UPLOADS_CACHE_CONTROL', 'public, max-age=31536000, immutable')
+# Let the ASGI server send files itself (zerocopy/pathsend extensions) when it supports it
+UPLOADS_SENDFILE = os.environ.get('UPLOADS_SENDFILE', 'true').lower() in ('1', 'true', 'yes')
+# Product imports are spooled to IMPORTS_DIR (outside the public uploads) so
+# an interrupted job can be resumed from its last committed row
+IMPORTS_DIR = Path(os.environ.get('IMPORTS_DIR', str(ROOT_DIR / 'imports')))
+PRODUCT_IMPORT_MAX_BYTES = int(os.environ.get('PRODUCT_IMPORT_MAX_BYTES', str(512 * 1024 * 1024)))
+PRODUCT_IMPORT_BATCH_SIZE = int(os.environ.get('PRODUCT_IMPORT_BATCH_SIZE', '1000'))
+PRODUCT_IMPORT_MAX_ERRORS = 1000
+SFTP_POOL_SIZE = int(os.environ.get('SFTP_POOL_SIZE', '4'))
+SFTP_POOL_IDLE_CHECK_SECONDS = float(os.environ.get('SFTP_POOL_IDLE_CHECK_SECONDS', '30'))
+
+# Analytics configuration
+# "rollup" answers from counters maintained on every order write,
+# "pipeline" runs a single server-side aggregation over the orders,
+# "scan" is the original full scan over the orders collection
+ANALYTICS_MODE = os.environ.get('ANALYTICS_MODE', 'rollup')
+
+# Order placement: stock is reserved with conditional $inc updates and
+# released again if a later step fails. With ORDER_TRANSACTIONS enabled
+# (needs a replica set) reservation and insert run in one transaction instead
+ORDER_TRANSACTIONS = os.environ.get('ORDER_TRANSACTIONS', 'false').lower() in ('1', 'true', 'yes')
+# POST /orders with an Idempotency-Key header returns the original order for
+# IDEMPOTENCY_TTL_SECONDS. A claim older than IDEMPOTENCY_LOCK_SECONDS is
+# assumed abandoned (crashed worker) and may be taken over by a retry
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', str(24 * 60 * 60)))
+IDEMPOTENCY_LOCK_SECONDS = float(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', '30'))
+
+# Background jobs (jobs collection). Workers lease a job for
+# JOB_VISIBILITY_TIMEOUT_SECONDS and extend the lease while it runs; a job
+# whose lease runs out (crashed worker) becomes visible again. Failures are
+# retried with exponential backoff up to JOB_MAX_ATTEMPTS times.
+# JOB_WORKER_CONCURRENCY=0 disables the in-process worker (run `python worker.py` instead)
+JOB_WORKER_CONCURRENCY = int(os.environ.get('JOB_WORKER_CONCURRENCY', '2'))
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', '1'))
+JOB_VISIBILITY_TIMEOUT_SECONDS = float(os.environ.get('JOB_VISIBILITY_TIMEOUT_SECONDS', '300'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '5'))
+JOB_RETRY_BASE_SECONDS = float(os.environ.get('JOB_RETRY_BASE_SECONDS', '5'))
+JOB_RETRY_MAX_SECONDS = float(os.environ.get('JOB_RETRY_MAX_SECONDS', '600'))
+JOB_RETENTION_SECONDS = int(os.environ.get('JOB_RETENTION_SECONDS', str(7 * 24 * 60 * 60)))
+# On shutdown running jobs get this long to finish; the rest are cancelled
+# and run again once their lease expires
+JOB_SHUTDOWN_TIMEOUT_SECONDS = float(os.environ.get('JOB_SHUTDOWN_TIMEOUT_SECONDS', '20'))
+
+# Product search configuration
+# "text" uses the products text index with relevance ranking,
+# "memory" resolves ids from an in-process inverted index built at startup,
+# "regex" is the original unanchored regex scan
+SEARCH_MODE = os.environ.get('SEARCH_MODE', 'text')
+SEARCH_INDEX_MAX_PREFIX = int(os.environ.get('SEARCH_INDEX_MAX_PREFIX', '12'))
+
+# Translation bundles: every translation write takes the next revision from
+# the counters collection; workers poll that counter at most every
+# TRANSLATION_BUNDLE_CHECK_SECONDS and apply only the newer documents.
+# A revision is reserved before its document is written, so writes can land
+# out of order: revisions reserved in the last TRANSLATION_WRITE_WINDOW_SECONDS
+# are re-read on every check, and the versions handed to clients lag that far
+TRANSLATION_LANGUAGES = ("en", "ar")
+TRANSLATION_BUNDLE_CHECK_SECONDS = float(os.environ.get('TRANSLATION_BUNDLE_CHECK_SECONDS', '2'))
+TRANSLATION_WRITE_WINDOW_SECONDS = float(os.environ.get('TRANSLATION_WRITE_WINDOW_SECONDS', '30'))
+TRANSLATION_BATCH_MAX_REF_IDS = 500
+PRODUCT_BATCH_MAX_IDS = 500
+TRANSLATION_BATCH_MAX_PREFIXES = 20
+TRANSLATION_BULK_MAX_ENTRIES = 10000
+TRANSLATION_BULK_CHUNK_SIZE = 1000
+
+# Responses are rendered with orjson. OPT_UTC_Z writes UTC datetimes as
+# "...Z", the same way Pydantic does
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+def dump_json(content) -> bytes:
+    """orjson, falling back to jsonable_encoder for Pydantic models and other non-native types"""
+    return orjson.dumps(content, default=jsonable_encoder, option=ORJSON_OPTIONS)
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return dump_json(content)
 
 # Create the main app
-app = FastAPI(title="eCommerce API", version="1.0.0")
+app = FastAPI(title="eCommerce API", version="1.0.0", default_response_class=FastJSONResponse)
 
 # Parse CORS origins
 cors_origins_str = os.environ.get('CORS_ORIGINS', '*')
@@ -78,7 +217,13 @@ app.add_middleware(
 )
 
 # Import for file serving
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse, RedirectResponse
+from starlette.responses import Response
+from fastapi.encoders import jsonable_encoder
+import anyio
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -106,6 +251,9 @@ ERROR_MESSAGES = {
     # Validation
     "UNSUPPORTED_LANGUAGE": "Unsupported language",
     "INVALID_FILE": "Invalid file",
+    
+    # Availability
+    "SERVER_BUSY": "Too many sign-in requests, please try again shortly",
 }
 def _godaddy_configured() -> bool:
     """Check if GoDaddy SSH/SFTP is properly configured"""
@@ -134,113 +282,253 @@ def _build_godaddy_url(file_name: str) -> str:
     return f"{base_url}{public_path.rstrip('/')}/{file_name}"
 
 
-async def upload_file_to_godaddy(file_name: str, content: bytes) -> str:
-    """Upload file to GoDaddy via SSH/SFTP"""
-    logger.info(f"🚀 [Upload] Starting GoDaddy SSH upload for {file_name} ({len(content)} bytes)")
-    
-    if not _godaddy_configured():
-        logger.error("❌ [Upload] GoDaddy SSH is not configured")
-        raise HTTPException(status_code=500, detail="GoDaddy SSH is not configured")
+class SFTPSession:
+    """One authenticated SSH connection with its SFTP channel"""
 
-    try:
+    def __init__(self, ssh, sftp):
+        self.ssh = ssh
+        self.sftp = sftp
+        self.last_used = time.monotonic()
+
+    def is_alive(self) -> bool:
+        transport = self.ssh.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            self.sftp.stat('.')
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        for closable in (self.sftp, self.ssh):
+            try:
+                closable.close()
+            except Exception:
+                pass
+
+
+class SFTPPool:
+    """Bounded pool of persistent SFTP sessions.
+
+    The private key is parsed once and the remote directory check is done
+    once per pool, so an upload only pays for the transfer itself. Sessions
+    that sat idle longer than idle_check_seconds are health-checked before
+    reuse and transparently replaced when the server dropped them. All
+    methods block and are meant to run in a worker thread.
+    """
+
+    def __init__(self, host: str, port: int, username: str, key: str, remote_dir: str,
+                 max_size: int = 4, idle_check_seconds: float = 60, acquire_timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.remote_dir = remote_dir
+        self.max_size = max_size
+        self.idle_check_seconds = idle_check_seconds
+        self.acquire_timeout = acquire_timeout
+        self._key = key
+        self._pkey = None
+        self._remote_dir_ready = False
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+        self._in_use = 0
+        self.metrics = {
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "reconnects": 0,
+            "failures": 0,
+            "uploads": 0,
+            "bytes_uploaded": 0,
+            "handshake_seconds": 0.0,
+        }
+
+    def _load_pkey(self):
         import paramiko
-        logger.info(f"✅ [SFTP] paramiko module available")
-    except ImportError:
-        logger.error("❌ [SFTP] paramiko not installed - cannot use SSH upload")
-        raise HTTPException(status_code=500, detail="SFTP module not available")
-    
-    def _upload_ssh():
+        if self._pkey is None:
+            errors = []
+            for key_class in (paramiko.RSAKey, paramiko.Ed25519Key, paramiko.ECDSAKey):
+                try:
+                    self._pkey = key_class.from_private_key(io.StringIO(self._key))
+                    logger.info(f"✅ [SSH] {key_class.__name__} private key loaded")
+                    break
+                except Exception as e:
+                    errors.append(f"{key_class.__name__}: {e}")
+            else:
+                logger.error("❌ [SSH] Make sure you provided the PRIVATE key, not the public key")
+                raise Exception(f"Invalid SSH private key: {'; '.join(errors)}")
+        return self._pkey
+
+    def _connect(self) -> SFTPSession:
         import paramiko
-        logger.info(f"🔑 [SSH] Creating SSH connection...")
-        
-        # Create SSH client
+        pkey = self._load_pkey()
+        started = time.monotonic()
+        logger.info(f"🔌 [SSH] Connecting to {self.username}@{self.host}:{self.port}")
         ssh = paramiko.SSHClient()
         ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        logger.info(f"✅ [SSH] SSH client created")
-        
-        # Load the SSH key from string
-        logger.info(f"🔑 [SSH] Loading SSH private key for authentication")
-        key_file = io.StringIO(GODADDY_SSH_KEY)
-        
-        try:
-            # Try RSA key
-            pkey = paramiko.RSAKey.from_private_key(key_file)
-            logger.info(f"✅ [SSH] RSA private key loaded successfully")
-        except Exception as e:
-            logger.error(f"❌ [SSH] Failed to load RSA key: {e}")
-            logger.error(f"❌ [SSH] Make sure you provided the PRIVATE key, not the public key")
-            raise Exception(f"Invalid SSH private key: {e}")
-        
-        # Connect to server
-        logger.info(f"🔌 [SSH] Connecting to {GODADDY_SSH_USERNAME}@{GODADDY_SSH_HOST}:{GODADDY_SSH_PORT}")
-        try:
-            ssh.connect(
-                hostname=GODADDY_SSH_HOST,
-                port=GODADDY_SSH_PORT,
-                username=GODADDY_SSH_USERNAME,
-                pkey=pkey,
-                timeout=10,
-                banner_timeout=10
-            )
-            logger.info(f"✅ [SSH] Successfully connected to {GODADDY_SSH_HOST}")
-        except Exception as e:
-            logger.error(f"❌ [SSH] Connection failed: {e}")
-            raise
-        
-        # Open SFTP session
-        logger.info(f"📂 [SFTP] Opening SFTP session...")
+        ssh.connect(
+            hostname=self.host,
+            port=self.port,
+            username=self.username,
+            pkey=pkey,
+            timeout=10,
+            banner_timeout=10,
+            allow_agent=False,
+            look_for_keys=False
+        )
         try:
             sftp = ssh.open_sftp()
-            logger.info(f"✅ [SFTP] SFTP session opened successfully")
-        except Exception as e:
-            logger.error(f"❌ [SFTP] Failed to open SFTP session: {e}")
+        except Exception:
             ssh.close()
             raise
-        
-        # Build remote path
-        remote_path = f"{GODADDY_REMOTE_DIR}/{file_name}"
-        logger.info(f"📍 [SFTP] Target path: {remote_path}")
-        
-        # Ensure directory exists
+        session = SFTPSession(ssh, sftp)
+        self._ensure_remote_dir(session.sftp)
+        with self._lock:
+            self.metrics["connections_opened"] += 1
+            self.metrics["handshake_seconds"] += time.monotonic() - started
+        logger.info(f"✅ [SFTP] Session opened to {self.host}")
+        return session
+
+    def _ensure_remote_dir(self, sftp):
+        if self._remote_dir_ready:
+            return
         try:
-            logger.info(f"📁 [SFTP] Checking if directory exists: {GODADDY_REMOTE_DIR}")
-            sftp.stat(GODADDY_REMOTE_DIR)
-            logger.info(f"✅ [SFTP] Directory exists")
+            sftp.stat(self.remote_dir)
         except IOError:
-            logger.info(f"📁 [SFTP] Directory doesn't exist, creating: {GODADDY_REMOTE_DIR}")
+            logger.info(f"📁 [SFTP] Directory doesn't exist, creating: {self.remote_dir}")
             try:
-                sftp.mkdir(GODADDY_REMOTE_DIR)
-                logger.info(f"✅ [SFTP] Directory created successfully")
+                sftp.mkdir(self.remote_dir)
             except IOError as e:
                 logger.warning(f"⚠️ [SFTP] Could not create directory (may already exist): {e}")
-        
-        # Upload file
-        logger.info(f"📤 [SFTP] Uploading {len(content)} bytes to {remote_path}")
+        self._remote_dir_ready = True
+
+    def acquire(self) -> SFTPSession:
+        if self._closed:
+            raise RuntimeError("SFTP pool is closed")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError("Timed out waiting for a free SFTP session")
         try:
-            sftp.putfo(io.BytesIO(content), remote_path)
-            logger.info(f"✅ [SFTP] File uploaded successfully!")
-        except Exception as e:
-            logger.error(f"❌ [SFTP] Upload failed: {e}")
-            sftp.close()
-            ssh.close()
+            session = self._checkout()
+        except Exception:
+            self._slots.release()
             raise
-        
-        # Verify upload
+        with self._lock:
+            self._in_use += 1
+        return session
+
+    def _checkout(self) -> SFTPSession:
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                return self._connect()
+            idle_for = time.monotonic() - session.last_used
+            if idle_for < self.idle_check_seconds or session.is_alive():
+                with self._lock:
+                    self.metrics["connections_reused"] += 1
+                return session
+            logger.info("🔄 [SFTP] Idle session is dead, reconnecting")
+            session.close()
+            with self._lock:
+                self.metrics["reconnects"] += 1
+
+    def release(self, session: SFTPSession, broken: bool = False):
+        with self._lock:
+            self._in_use -= 1
         try:
-            file_stat = sftp.stat(remote_path)
-            logger.info(f"✅ [SFTP] Upload verified - remote file size: {file_stat.st_size} bytes")
-        except Exception as e:
-            logger.warning(f"⚠️ [SFTP] Could not verify upload: {e}")
-        
-        # Clean up
-        sftp.close()
-        ssh.close()
-        logger.info(f"🔒 [SSH] Connection closed")
+            if broken or self._closed:
+                session.close()
+            else:
+                session.last_used = time.monotonic()
+                with self._lock:
+                    self._idle.append(session)
+        finally:
+            self._slots.release()
+
+    def upload(self, fileobj, file_name: str) -> int:
+        """Upload a file object to the remote directory, retrying once on a fresh session"""
+        remote_path = f"{self.remote_dir}/{file_name}"
+        start_position = fileobj.tell()
+        for attempt in range(2):
+            session = self.acquire()
+            try:
+                fileobj.seek(start_position)
+                attributes = session.sftp.putfo(fileobj, remote_path)
+            except Exception as e:
+                self.release(session, broken=True)
+                with self._lock:
+                    self.metrics["failures"] += 1
+                if attempt:
+                    raise
+                logger.warning(f"⚠️ [SFTP] Upload of {file_name} failed ({e}), retrying on a new session")
+                continue
+            self.release(session)
+            with self._lock:
+                self.metrics["uploads"] += 1
+                self.metrics["bytes_uploaded"] += attributes.st_size or 0
+            return attributes.st_size
+
+    def warm(self, count: int = 1):
+        sessions = [self.acquire() for _ in range(min(count, self.max_size))]
+        for session in sessions:
+            self.release(session)
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            session.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"max_size": self.max_size, "idle": len(self._idle), "in_use": self._in_use, **self.metrics}
+
+
+sftp_pool: Optional[SFTPPool] = None
+
+def get_sftp_pool() -> SFTPPool:
+    global sftp_pool
+    if sftp_pool is None:
+        sftp_pool = SFTPPool(
+            GODADDY_SSH_HOST,
+            GODADDY_SSH_PORT,
+            GODADDY_SSH_USERNAME,
+            GODADDY_SSH_KEY,
+            GODADDY_REMOTE_DIR,
+            max_size=SFTP_POOL_SIZE,
+            idle_check_seconds=SFTP_POOL_IDLE_CHECK_SECONDS
+        )
+    return sftp_pool
+
+
+async def upload_file_to_godaddy(file_name: str, file_path: Path) -> str:
+    """Upload a local file to GoDaddy via a pooled SSH/SFTP session.
+
+    paramiko reads the file in small blocks, so the upload never holds the
+    whole file in memory.
+    """
+    logger.info(f"🚀 [Upload] Starting GoDaddy SSH upload for {file_name} ({file_path.stat().st_size} bytes)")
+    
+    if not _godaddy_configured():
+        logger.error("❌ [Upload] GoDaddy SSH is not configured")
+        raise HTTPException(status_code=500, detail="GoDaddy SSH is not configured")
+
+    try:
+        import paramiko
+    except ImportError:
+        logger.error("❌ [SFTP] paramiko not installed - cannot use SSH upload")
+        raise HTTPException(status_code=500, detail="SFTP module not available")
     
+    def _upload():
+        with open(file_path, 'rb') as source:
+            return get_sftp_pool().upload(source, file_name)
+
     try:
-        logger.info(f"🚀 [SSH] Running SSH upload in thread...")
-        await asyncio.to_thread(_upload_ssh)
-        logger.info(f"✅ [SSH] SSH upload completed successfully")
+        size = await asyncio.to_thread(_upload)
+        logger.info(f"✅ [SFTP] Uploaded {size} bytes to {GODADDY_REMOTE_DIR}/{file_name}")
     except Exception as exc:
         logger.error(f"❌ [SSH] SSH upload failed: {type(exc).__name__}: {exc}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to upload to GoDaddy: {str(exc)}")
@@ -320,6 +608,7 @@ class Product(BaseModel):
     category_id: str
     image_url: Optional[str] = None
     stock: int = 0
+    sku: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ProductCreate(BaseModel):
@@ -329,6 +618,15 @@ class ProductCreate(BaseModel):
     category_id: str
     image_url: Optional[str] = None
     stock: int = 0
+    sku: Optional[str] = None
+
+class ProductImportRow(ProductCreate):
+    id: Optional[str] = None
+
+class ProductBatchRequest(BaseModel):
+    ids: List[str]
+    lang: Optional[str] = None
+    fields: Optional[str] = None
 
 class OrderItem(BaseModel):
     product_id: str
@@ -409,12 +707,484 @@ class PartnerCreate(BaseModel):
     name: str
     logo_url: str
 
+# Read serialization
+class TrustedShape:
+    """Renders database documents the way model.model_dump(mode="json") would, without validating them.
+
+    Every document is written through the same model, so a document that
+    has all of the model's fields with values of the right kind is copied
+    field by field (legacy ISO-string dates parsed, whole-number floats
+    coerced, unknown fields dropped). Anything else goes through full model
+    validation, so the response schema holds either way. projection asks
+    MongoDB for the model's fields only.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        # Normalized fields= value of a sparse shape (for cache keys), None for the full model
+        self.selection = None
+        self._sparse = {}
+        self.fields = []
+        self.defaults = {}
+        self.converters = {}
+        self.projection = {"_id": 0}
+        for name, field in model.model_fields.items():
+            self.fields.append(name)
+            if not field.is_required() and field.default_factory is None:
+                self.defaults[name] = field.default
+            annotation, nullable = field.annotation, False
+            if get_origin(annotation) is Union:
+                args = [a for a in get_args(annotation) if a is not type(None)]
+                nullable = len(args) < len(get_args(annotation))
+                annotation = args[0] if len(args) == 1 else annotation
+            nested = self._nested_shape(annotation)
+            convert = self._converter(annotation, nested)
+            if nested is not None:
+                for sub_field in nested.projection:
+                    if sub_field != "_id":
+                        self.projection[f"{name}.{sub_field}"] = 1
+            else:
+                self.projection[name] = 1
+            if convert is not None or not nullable:
+                self.converters[name] = (convert, nullable)
+
+    def sparse(self, fields: Optional[str]) -> "TrustedShape":
+        """Shape of a model slimmed to a comma-separated fields= selection (id is always kept)"""
+        if not fields:
+            return self
+        selected = {f.strip() for f in fields.split(",") if f.strip()} | {"id"}
+        unknown = selected - set(self.fields)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(self.fields)}"
+            )
+        key = frozenset(selected)
+        shape = self._sparse.get(key)
+        if shape is None:
+            # Same field definitions in the same order, so the slim model is a true subset
+            slim = create_model(
+                f"{self.model.__name__}Fields",
+                __config__=ConfigDict(extra="ignore"),
+                **{name: (info.annotation, info) for name, info in self.model.model_fields.items() if name in key}
+            )
+            shape = self._sparse[key] = TrustedShape(slim)
+            shape.selection = ",".join(shape.fields)
+        return shape
+
+    @staticmethod
+    def _nested_shape(annotation) -> Optional["TrustedShape"]:
+        if get_origin(annotation) in (list, List):
+            annotation = get_args(annotation)[0]
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return TrustedShape(annotation)
+        return None
+
+    @staticmethod
+    def _converter(annotation, nested: Optional["TrustedShape"]):
+        if nested is not None:
+            if get_origin(annotation) in (list, List):
+                return lambda items: [nested.dump_trusted(item) for item in items]
+            return nested.dump_trusted
+        if annotation is datetime:
+            return _as_datetime
+        if annotation in _SCALAR_CHECKS:
+            return _SCALAR_CHECKS[annotation]
+        if isinstance(annotation, type) and issubclass(annotation, Enum):
+            values = {member.value for member in annotation}
+            def check(value):
+                value = getattr(value, "value", value)
+                if value not in values:
+                    raise ValueError(value)
+                return value
+            return check
+        # Anything without a cheap check (EmailStr...) is validated on its own,
+        # still far cheaper than validating the whole model
+        adapter = TypeAdapter(annotation)
+        return lambda value: adapter.dump_python(adapter.validate_python(value), mode="json")
+
+    def dump_trusted(self, doc: dict) -> dict:
+        """Copy doc into the model's shape; raises ValueError/TypeError/KeyError when it does not fit"""
+        out = {}
+        for name in self.fields:
+            value = doc[name] if name in doc else self.defaults[name]
+            rule = self.converters.get(name)
+            if rule is not None:
+                convert, nullable = rule
+                if value is None:
+                    if not nullable:
+                        raise ValueError(f"{name} is required")
+                elif convert is not None:
+                    value = convert(value)
+            out[name] = value
+        return out
+
+    def dump(self, doc: dict) -> dict:
+        try:
+            return self.dump_trusted(doc)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return self.model.model_validate(doc).model_dump(mode="json")
+
+    def dump_many(self, docs: List[dict], skip_invalid: bool = False) -> List[dict]:
+        """dump() every document; with skip_invalid, documents failing validation are logged and left out"""
+        rows = []
+        for doc in docs:
+            try:
+                rows.append(self.dump(doc))
+            except ValidationError as e:
+                if not skip_invalid:
+                    raise
+                logger.error(f"Skipping invalid {self.model.__name__} {doc.get('id')}: {e}")
+        return rows
+
+def _as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    raise TypeError(value)
+
+def _exact(kind):
+    def check(value):
+        if type(value) is not kind:
+            raise TypeError(value)
+        return value
+    return check
+
+def _as_float(value):
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        return float(value)
+    raise TypeError(value)
+
+# Anything else (numeric strings, bools...) is left to Pydantic's coercion rules
+_SCALAR_CHECKS = {str: _exact(str), int: _exact(int), float: _as_float}
+
+USER_SHAPE = TrustedShape(User)
+CATEGORY_SHAPE = TrustedShape(Category)
+PRODUCT_SHAPE = TrustedShape(Product)
+ORDER_SHAPE = TrustedShape(Order)
+
+# Caching
+class TTLCache:
+    """Small LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key):
+        entry = self._data.pop(key, None)
+        return entry[0] if entry else None
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+user_cache = TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+
+
+class MemoryCacheBackend:
+    """In-process response cache storage: a TTLCache plus namespace generations"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._values = TTLCache(maxsize, ttl)
+        # Generations are never evicted, a reset counter could resurrect stale entries
+        self._generations = {}
+
+    async def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    async def bump(self, namespace: str):
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._values.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self._values.set(key, value)
+
+    def stats(self) -> dict:
+        values = self._values.stats()
+        return {"backend": "memory", **{k: values[k] for k in ("entries", "max_entries", "ttl_seconds", "evictions")}}
+
+
+class RedisCacheBackend:
+    """Response cache storage shared through Redis.
+
+    Accepts any client with async get/set(ex=)/incr, so a local stand-in
+    such as fakeredis can be passed instead of a real connection.
+    """
+
+    def __init__(self, client, ttl: float, prefix: str = "resp:"):
+        self.client = client
+        self.ttl = max(1, int(ttl))
+        self.prefix = prefix
+
+    async def generation(self, namespace: str) -> int:
+        value = await self.client.get(f"{self.prefix}gen:{namespace}")
+        return int(value) if value is not None else 0
+
+    async def bump(self, namespace: str):
+        await self.client.incr(f"{self.prefix}gen:{namespace}")
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes):
+        await self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "ttl_seconds": self.ttl}
+
+    async def close(self):
+        close = getattr(self.client, "aclose", None) or getattr(self.client, "close", None)
+        if close:
+            await close()
+
+
+class ResponseCache:
+    """Cache-aside for public GET endpoints.
+
+    Entries are keyed by namespace, the namespace generation and the
+    normalized query parameters. Admin mutations bump the generation of the
+    namespaces they touch, which orphans every older entry at once (they
+    age out through the backend TTL). An entry can also depend on broader
+    namespaces (depends_on), so one bump covers many narrow namespaces. Concurrent misses for the same key
+    share a single producer call. Backend failures fall back to the
+    database rather than failing the request.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(namespace: str, generation: str, params: dict) -> str:
+        # Values are percent-encoded, so a free-text parameter cannot spell out another key
+        normalized = urlencode(sorted((k, str(v)) for k, v in params.items() if v is not None))
+        return f"{namespace}:{generation}:{normalized}"
+
+    async def cached(self, namespace: str, params: dict, producer, depends_on: tuple = ()) -> Response:
+        """Return the cached JSON for (namespace, params), calling producer() on a miss"""
+        if self.backend is None:
+            return FastJSONResponse(await producer())
+        try:
+            generations = [await self.backend.generation(ns) for ns in (namespace, *depends_on)]
+            key = self._key(namespace, ".".join(map(str, generations)), params)
+            body = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache unavailable: {e}")
+            return FastJSONResponse(await producer())
+        
+        if body is not None:
+            self.hits += 1
+            return Response(content=body, media_type="application/json")
+        
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            self.misses += 1
+            inflight = asyncio.ensure_future(self._produce(key, producer))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        body = await asyncio.shield(inflight)
+        return Response(content=body, media_type="application/json")
+
+    async def _produce(self, key: str, producer) -> bytes:
+        body = dump_json(await producer())
+        try:
+            await self.backend.set(key, body)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache unavailable: {e}")
+        return body
+
+    async def invalidate(self, *namespaces: str):
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            try:
+                await self.backend.bump(namespace)
+                self.invalidations += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Failed to invalidate response cache namespace {namespace}: {e}")
+
+    def stats(self) -> dict:
+        if self.backend is None:
+            return {"backend": "off"}
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            **self.backend.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "inflight": len(self._inflight),
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    async def close(self):
+        close = getattr(self.backend, "close", None)
+        if close:
+            await close()
+
+def create_response_cache_backend():
+    if RESPONSE_CACHE_BACKEND == "off":
+        return None
+    if RESPONSE_CACHE_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            logger.warning("RESPONSE_CACHE_BACKEND=redis but the redis package is not installed, caching in-process")
+        else:
+            return RedisCacheBackend(redis_asyncio.from_url(RESPONSE_CACHE_URL), RESPONSE_CACHE_TTL_SECONDS)
+    return MemoryCacheBackend(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS)
+
+response_cache = ResponseCache(create_response_cache_backend())
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool and sheds load before the queue gets long"""
+
+    def __init__(self, workers: int, max_pending: int, max_wait_seconds: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_wait_seconds = max_wait_seconds
+        self._executor = None
+        # _timed runs on the executor threads, so every counter is updated under this lock
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        # Moving average of one bcrypt call, seeded with a typical cost-12 hash
+        self.avg_seconds = 0.25
+        self.total_wait_seconds = 0.0
+
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def expected_wait(self) -> float:
+        """Seconds a new hash would wait for a thread at the current queue depth (call with _lock held)"""
+        if not self.workers:
+            return 0.0
+        return max(self.pending - self.workers + 1, 0) * self.avg_seconds / self.workers
+
+    def _timed(self, fn, args, queued_at: float):
+        started = time.perf_counter()
+        with self._lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.running -= 1
+                self.avg_seconds += (elapsed - self.avg_seconds) * 0.1
+                self.total_wait_seconds += started - queued_at
+
+    async def run(self, fn, *args):
+        if not self.workers:
+            with self._lock:
+                self.completed += 1
+            return self._timed(fn, args, time.perf_counter())
+        with self._lock:
+            expected_wait = self.expected_wait()
+            busy = self.pending >= self.max_pending or expected_wait > self.max_wait_seconds
+            if busy:
+                self.rejected += 1
+            else:
+                self.pending += 1
+                self.peak_pending = max(self.peak_pending, self.pending)
+        if busy:
+            raise HTTPException(status_code=503, detail=ERROR_MESSAGES["SERVER_BUSY"],
+                                headers={"Retry-After": str(max(1, math.ceil(expected_wait)))})
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor(), self._timed, fn, args, time.perf_counter())
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self.running,
+                "queued": max(self.pending - self.running, 0),
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_hash_ms": round(self.avg_seconds * 1000, 1),
+                "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 1) if self.completed else 0.0,
+                "expected_wait_ms": round(self.expected_wait() * 1000, 1),
+            }
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_MAX_WAIT_SECONDS)
+
 # Helper functions
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(pwd_context.hash, password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(pwd_context.verify, plain_password, hashed_password)
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
@@ -439,15 +1209,19 @@ def decode_token(token: str) -> dict:
         logger.error(f"Invalid token: {str(e)}, token: {token[:20]}...")
         raise HTTPException(status_code=401, detail=ERROR_MESSAGES["INVALID_TOKEN"])
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    token = credentials.credentials
+def decode_access_token(token: str) -> dict:
     payload = decode_token(token)
-    
     if payload.get("type") != "access":
         raise HTTPException(status_code=401, detail=ERROR_MESSAGES["INVALID_TOKEN_TYPE"])
+    return payload
+
+async def load_user(user_id: str) -> User:
+    """Fetch a user by id, served from user_cache when possible"""
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
     
-    user_id = payload.get("user_id")
-    user_data = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user_data = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
     
     if not user_data:
         raise HTTPException(status_code=404, detail=ERROR_MESSAGES["USER_NOT_FOUND"])
@@ -455,9 +1229,29 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     if isinstance(user_data['created_at'], str):
         user_data['created_at'] = datetime.fromisoformat(user_data['created_at'])
     
-    return User(**user_data)
+    user = User(**user_data)
+    user_cache.set(user_id, user)
+    return user
 
-async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    payload = decode_access_token(credentials.credentials)
+    return await load_user(payload.get("user_id"))
+
+async def require_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    payload = decode_access_token(credentials.credentials)
+    
+    if AUTH_CLAIMS_ONLY:
+        # Trust the role embedded by create_access_token, no database lookup
+        if payload.get("role") != UserRole.ADMIN.value:
+            raise HTTPException(status_code=403, detail=ERROR_MESSAGES["ADMIN_ACCESS_REQUIRED"])
+        return User.model_construct(
+            id=payload.get("user_id"),
+            email=payload.get("email", ""),
+            full_name=payload.get("full_name", ""),
+            role=UserRole.ADMIN
+        )
+    
+    current_user = await load_user(payload.get("user_id"))
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail=ERROR_MESSAGES["ADMIN_ACCESS_REQUIRED"])
     return current_user
@@ -478,8 +1272,7 @@ async def register(user_data: UserCreate):
     )
     
     user_dict = user.model_dump()
-    user_dict['created_at'] = user_dict['created_at'].isoformat()
-    user_dict['password'] = hash_password(user_data.password)
+    user_dict['password'] = await hash_password(user_data.password)
     
     await db.users.insert_one(user_dict)
     
@@ -493,7 +1286,7 @@ async def register(user_data: UserCreate):
 async def login(credentials: UserLogin):
     user_data = await db.users.find_one({"email": credentials.email}, {"_id": 0})
     
-    if not user_data or not verify_password(credentials.password, user_data['password']):
+    if not user_data or not await verify_password(credentials.password, user_data['password']):
         raise HTTPException(status_code=401, detail=ERROR_MESSAGES["INVALID_CREDENTIALS"])
     
     if isinstance(user_data['created_at'], str):
@@ -523,7 +1316,7 @@ async def update_profile(update_data: UserUpdate, current_user: User = Depends(g
             update_dict['full_name'] = update_data.full_name
         
         if update_data.password:
-            update_dict['password'] = hash_password(update_data.password)
+            update_dict['password'] = await hash_password(update_data.password)
         
         if update_data.role and current_user.role == UserRole.ADMIN:
             update_dict['role'] = update_data.role
@@ -541,6 +1334,7 @@ async def update_profile(update_data: UserUpdate, current_user: User = Depends(g
             if result.matched_count == 0:
                 logger.error(f"User not found: {current_user.id}")
                 raise HTTPException(status_code=404, detail=ERROR_MESSAGES["USER_NOT_FOUND"])
+            user_cache.pop(current_user.id)
         
         updated_user = await db.users.find_one({"id": current_user.id}, {"_id": 0, "password": 0})
         if not updated_user:
@@ -569,7 +1363,7 @@ async def update_user_by_id(user_id: str, update_data: UserUpdate, admin: User =
             update_dict['full_name'] = update_data.full_name
         
         if update_data.password:
-            update_dict['password'] = hash_password(update_data.password)
+            update_dict['password'] = await hash_password(update_data.password)
         
         if update_data.role:
             update_dict['role'] = update_data.role
@@ -587,6 +1381,7 @@ async def update_user_by_id(user_id: str, update_data: UserUpdate, admin: User =
             if result.matched_count == 0:
                 logger.error(f"User not found: {user_id}")
                 raise HTTPException(status_code=404, detail=ERROR_MESSAGES["USER_NOT_FOUND"])
+            user_cache.pop(user_id)
         
         updated_user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
         if not updated_user:
@@ -617,7 +1412,7 @@ async def forgot_password(request: PasswordReset):
     
     await db.password_resets.update_one(
         {"email": request.email},
-        {"$set": {"token": reset_token, "created_at": datetime.now(timezone.utc).isoformat()}},
+        {"$set": {"token": reset_token, "created_at": datetime.now(timezone.utc)}},
         upsert=True
     )
     
@@ -640,45 +1435,137 @@ async def reset_password(request: PasswordResetConfirm):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    hashed_password = hash_password(request.new_password)
+    hashed_password = await hash_password(request.new_password)
     await db.users.update_one(
         {"email": email},
         {"$set": {"password": hashed_password}}
     )
+    user_cache.pop(user.get("id"))
     
     await db.password_resets.delete_one({"email": email})
     
     return {"message": "Password has been reset successfully"}
 
+# Pagination
+COUNT_MODES = ("exact", "estimated", "none")
+KEYSET_SORT = [("created_at", -1), ("id", -1)]
+
+def encode_cursor(doc: dict) -> str:
+    """Opaque `after` token for the (created_at, id) position of a document"""
+    created_at = doc.get("created_at")
+    if isinstance(created_at, datetime):
+        position = ["d", created_at.isoformat(), doc.get("id")]
+    else:
+        position = ["s", created_at, doc.get("id")]
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        kind, created_at, doc_id = json.loads(raw)
+        if kind == "d":
+            created_at = datetime.fromisoformat(created_at)
+        elif kind != "s" or not isinstance(created_at, str):
+            raise ValueError(kind)
+        if not isinstance(doc_id, str):
+            raise ValueError(doc_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return created_at, doc_id
+
+def keyset_filter(query: dict, after: Optional[str]) -> dict:
+    """Restrict query to documents that sort after the cursor in KEYSET_SORT order"""
+    if not after:
+        return query
+    created_at, doc_id = decode_cursor(after)
+    branches = [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": doc_id}},
+    ]
+    if isinstance(created_at, datetime):
+        # BSON orders dates above strings, so legacy ISO-string rows follow every date
+        branches.append({"created_at": {"$type": "string"}})
+    return {**query, "$or": branches} if query else {"$or": branches}
+
+async def count_total(collection, query: dict, count: str) -> Optional[int]:
+    """Total for the pagination block: exact, estimated from collection metadata, or skipped"""
+    if count == "none":
+        return None
+    if count == "estimated" and not query:
+        return await collection.estimated_document_count()
+    # estimated_document_count cannot take a filter, fall back to an exact count
+    return await collection.count_documents(query)
+
+async def paginate(collection, query: dict, projection: dict, page: int, limit: int,
+                   cursor: bool = False, after: Optional[str] = None, count: str = "exact"):
+    """Return (documents, pagination) using skip/limit pages or keyset cursors.
+
+    Cursor mode walks KEYSET_SORT through the (created_at, id) compound
+    indexes, so page 1000 costs the same as page 1. The `next` token is
+    passed back as `after` to fetch the following page.
+    """
+    if count not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"count must be one of {', '.join(COUNT_MODES)}")
+    
+    if cursor or after:
+        docs = await collection.find(keyset_filter(query, after), projection) \
+            .sort(KEYSET_SORT).limit(limit + 1).to_list(limit + 1)
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        total = await count_total(collection, query, count)
+        return docs, {
+            "total": total,
+            "limit": limit,
+            "next": encode_cursor(docs[-1]) if has_more else None,
+            "has_more": has_more,
+        }
+    
+    skip = (page - 1) * limit
+    total = await count_total(collection, query, count)
+    docs = await collection.find(query, projection).skip(skip).limit(limit).to_list(limit)
+    return docs, {
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "pages": (total + limit - 1) // limit if total is not None else None,
+    }
+
+def sparse_projection(shape: TrustedShape, keyset: bool) -> dict:
+    """The shape's projection, plus created_at when a cursor has to be encoded from the last document.
+
+    keyset is true whenever paginate runs in cursor mode (cursor=true or an after token).
+    """
+    if keyset and "created_at" not in shape.projection:
+        return {**shape.projection, "created_at": 1}
+    return shape.projection
+
 # Category Routes
 @api_router.get("/categories")
-async def get_categories(page: int = 1, limit: int = 12):
+async def get_categories(page: int = 1, limit: int = 12, cursor: bool = False,
+                         after: Optional[str] = None, count: str = "exact", lang: Optional[str] = None):
     page = max(1, page)
-    limit = min(limit, 100)
-    skip = (page - 1) * limit
+    limit = max(1, min(limit, 100))
+    validate_lang(lang)
     
-    total_count = await db.categories.count_documents({})
-    categories = await db.categories.find({}, {"_id": 0}).skip(skip).limit(limit).to_list(limit)
-    for cat in categories:
-        if isinstance(cat['created_at'], str):
-            cat['created_at'] = datetime.fromisoformat(cat['created_at'])
-    
-    return {
-        "data": [Category(**cat) for cat in categories],
-        "pagination": {
-            "total": total_count,
-            "page": page,
-            "limit": limit,
-            "pages": (total_count + limit - 1) // limit
+    async def load():
+        categories, pagination = await paginate(db.categories, {}, CATEGORY_SHAPE.projection,
+                                                page, limit, cursor, after, count)
+        await localize_entities(categories, "category", lang)
+        return {
+            "data": CATEGORY_SHAPE.dump_many(categories),
+            "pagination": pagination
         }
-    }
+    
+    params = {"page": page, "limit": limit, "cursor": cursor or None, "after": after, "count": count, "lang": lang}
+    return await response_cache.cached("categories", params, load)
 
 @api_router.post("/categories", response_model=Category)
 async def create_category(category_data: CategoryCreate, admin: User = Depends(require_admin)):
     category = Category(**category_data.model_dump())
     cat_dict = category.model_dump()
-    cat_dict['created_at'] = cat_dict['created_at'].isoformat()
     await db.categories.insert_one(cat_dict)
+    await response_cache.invalidate("categories")
     return category
 
 @api_router.put("/categories/{category_id}", response_model=Category)
@@ -689,6 +1576,7 @@ async def update_category(category_id: str, category_data: CategoryCreate, admin
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Category not found")
+    await response_cache.invalidate("categories")
     
     updated = await db.categories.find_one({"id": category_id}, {"_id": 0})
     if not updated:
@@ -702,103 +1590,648 @@ async def delete_category(category_id: str, admin: User = Depends(require_admin)
     result = await db.categories.delete_one({"id": category_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Category not found")
+    await response_cache.invalidate("categories")
     return {"message": "Category deleted"}
 
+# Product search
+# Arabic harakat, superscript alef and tatweel carry no meaning for search
+_ARABIC_DIACRITICS = re.compile(r'[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+_ARABIC_LETTER_VARIANTS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه',
+})
+_SEARCH_TOKEN = re.compile(r'\w+')
+
+def search_tokens(text: Optional[str]) -> List[str]:
+    """Split text into lowercase tokens with Arabic diacritics and letter variants folded"""
+    if not text:
+        return []
+    text = _ARABIC_DIACRITICS.sub('', text.lower()).translate(_ARABIC_LETTER_VARIANTS)
+    return _SEARCH_TOKEN.findall(text)
+
+def normalize_search_text(text: Optional[str]) -> str:
+    return ' '.join(search_tokens(text))
+
+def _product_translation_keys(product_id: str) -> List[str]:
+    return [f"entity.product.{product_id}.name", f"entity.product.{product_id}.description"]
+
+def _product_id_from_translation_key(key: str) -> Optional[str]:
+    # Keys look like "entity.product.{id}.name"
+    key_parts = key.split(".")
+    if len(key_parts) >= 3 and key_parts[0] == "entity" and key_parts[1] == "product":
+        return key_parts[2]
+    return None
+
+class CatalogSearchIndex:
+    """In-memory inverted index over the normalized product search fields.
+
+    Every token is indexed in full and by its prefixes (up to max_prefix
+    characters) so the last word of a query can be matched while the user
+    is still typing. The index lives in the worker process: mutations made
+    through another worker only show up after that worker rebuilds it.
+    """
+
+    def __init__(self, max_prefix: int = SEARCH_INDEX_MAX_PREFIX):
+        self.max_prefix = max_prefix
+        self._tokens = {}    # token -> {product_id}
+        self._prefixes = {}  # prefix -> {product_id}
+        self._docs = {}      # product_id -> (name_tokens, body_tokens, category_id)
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, product_id: str, search_name: str, search_body: str, category_id: Optional[str] = None):
+        self.remove(product_id)
+        name_tokens = frozenset(search_name.split())
+        body_tokens = frozenset(search_body.split())
+        self._docs[product_id] = (name_tokens, body_tokens, category_id)
+        for token in name_tokens | body_tokens:
+            self._tokens.setdefault(token, set()).add(product_id)
+            for size in range(1, min(len(token), self.max_prefix) + 1):
+                self._prefixes.setdefault(token[:size], set()).add(product_id)
+
+    def remove(self, product_id: str):
+        doc = self._docs.pop(product_id, None)
+        if not doc:
+            return
+        for token in doc[0] | doc[1]:
+            self._discard(self._tokens, token, product_id)
+            for size in range(1, min(len(token), self.max_prefix) + 1):
+                self._discard(self._prefixes, token[:size], product_id)
+
+    @staticmethod
+    def _discard(postings: dict, key: str, product_id: str):
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(product_id)
+            if not ids:
+                del postings[key]
+
+    def _matching(self, term: str, prefix: bool) -> set:
+        if not prefix:
+            return self._tokens.get(term, set())
+        ids = self._prefixes.get(term[:self.max_prefix], set())
+        if len(term) > self.max_prefix:
+            ids = {pid for pid in ids if any(t.startswith(term) for t in self._docs[pid][0] | self._docs[pid][1])}
+        return ids
+
+    def search(self, query: str, category_id: Optional[str] = None) -> List[str]:
+        """Return product ids containing every query term, best matches first.
+
+        All terms but the last must match a whole token; the last one may be
+        a prefix. Name matches outrank description matches and whole-token
+        matches outrank prefix matches.
+        """
+        terms = search_tokens(query)
+        if not terms:
+            return []
+        candidates = None
+        for i, term in enumerate(terms):
+            ids = self._matching(term, prefix=i == len(terms) - 1)
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        if category_id:
+            candidates = {pid for pid in candidates if self._docs[pid][2] == category_id}
+
+        def _score(product_id):
+            name_tokens, body_tokens, _ = self._docs[product_id]
+            score = 0
+            for term in terms:
+                if term in name_tokens:
+                    score += 10
+                elif any(t.startswith(term) for t in name_tokens):
+                    score += 5
+                elif term in body_tokens:
+                    score += 2
+                else:
+                    score += 1
+            return score
+
+        return sorted(candidates, key=lambda pid: (-_score(pid), pid))
+
+    def stats(self) -> dict:
+        """Approximate memory footprint of the index structures"""
+        def _postings_bytes(postings):
+            total = sys.getsizeof(postings)
+            for key, ids in postings.items():
+                total += sys.getsizeof(key) + sys.getsizeof(ids)
+            return total
+
+        docs_bytes = sys.getsizeof(self._docs) + sum(
+            sys.getsizeof(pid) + sys.getsizeof(name) + sys.getsizeof(body)
+            + sum(sys.getsizeof(t) for t in name | body)
+            for pid, (name, body, _) in self._docs.items()
+        )
+        tokens_bytes = _postings_bytes(self._tokens)
+        prefixes_bytes = _postings_bytes(self._prefixes)
+        return {
+            "products": len(self._docs),
+            "tokens": len(self._tokens),
+            "prefixes": len(self._prefixes),
+            "postings": sum(len(ids) for ids in self._tokens.values()) + sum(len(ids) for ids in self._prefixes.values()),
+            "approx_bytes": docs_bytes + tokens_bytes + prefixes_bytes,
+            "approx_bytes_by_structure": {
+                "documents": docs_bytes,
+                "tokens": tokens_bytes,
+                "prefixes": prefixes_bytes,
+            },
+            "built_at": self.built_at,
+        }
+
+catalog_search_index = CatalogSearchIndex()
+
+async def build_catalog_search_index(batch_size: int = 1000) -> CatalogSearchIndex:
+    """Build a fresh inverted index from every product's search fields and swap it in"""
+    global catalog_search_index
+    index = CatalogSearchIndex()
+    cursor = db.products.find(
+        {}, {"_id": 0, "id": 1, "category_id": 1, "search_name": 1, "search_body": 1}
+    ).batch_size(batch_size)
+    async for product in cursor:
+        index.add(product["id"], product.get("search_name", ""), product.get("search_body", ""), product.get("category_id"))
+    index.built_at = datetime.now(timezone.utc).isoformat()
+    catalog_search_index = index
+    logger.info(f"✓ Catalog search index built for {len(index)} products")
+    return index
+
+async def refresh_product_search_fields(product_ids: Optional[List[str]] = None, batch_size: int = 500) -> int:
+    """Recompute the normalized search fields of products from their own text and Arabic translations.
+
+    search_name holds the English and Arabic names and search_body the
+    descriptions, both covered by the weighted "products_search" text index.
+    With no product_ids every product missing the fields is backfilled.
+    """
+    query = {"id": {"$in": product_ids}} if product_ids is not None else {"search_name": {"$exists": False}}
+    cursor = db.products.find(query, {"_id": 0, "id": 1, "name": 1, "description": 1, "category_id": 1}).batch_size(batch_size)
+    updated = 0
+    batch = []
+
+    async def _flush():
+        keys = [key for p in batch for key in _product_translation_keys(p["id"])]
+        entries = await db.translations.find({"key": {"$in": keys}}, {"_id": 0, "key": 1, "ar": 1}).to_list(len(keys))
+        arabic = {e["key"]: e.get("ar") or "" for e in entries}
+        operations = []
+        for p in batch:
+            name_key, description_key = _product_translation_keys(p["id"])
+            fields = {
+                "search_name": normalize_search_text(f"{p.get('name', '')} {arabic.get(name_key, '')}"),
+                "search_body": normalize_search_text(f"{p.get('description', '')} {arabic.get(description_key, '')}"),
+            }
+            operations.append(UpdateOne({"id": p["id"]}, {"$set": fields}))
+            if SEARCH_MODE == "memory":
+                catalog_search_index.add(p["id"], fields["search_name"], fields["search_body"], p.get("category_id"))
+        await db.products.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async for product in cursor:
+        batch.append(product)
+        if len(batch) >= batch_size:
+            updated += await _flush()
+            batch = []
+    if batch:
+        updated += await _flush()
+    return updated
+
+async def _search_products_text(search: str, query: dict, skip: int, limit: int):
+    """Ranked, paginated search over the products text index"""
+    terms = normalize_search_text(search)
+    if not terms:
+        return 0, []
+    text_query = {**query, "$text": {"$search": terms}}
+    total_count = await db.products.count_documents(text_query)
+    products = await db.products.find(
+        text_query,
+        {"_id": 0, "search_name": 0, "search_body": 0, "score": {"$meta": "textScore"}}
+    ).sort([("score", {"$meta": "textScore"}), ("id", 1)]).skip(skip).limit(limit).to_list(limit)
+    return total_count, products
+
+async def _search_products_memory(search: str, query: dict, skip: int, limit: int):
+    """Resolve ranked ids from the in-memory index and fetch only the requested page"""
+    product_ids = catalog_search_index.search(search, query.get("category_id"))
+    page_ids = product_ids[skip:skip + limit]
+    if not page_ids:
+        return len(product_ids), []
+    found = await db.products.find(
+        {"id": {"$in": page_ids}}, {"_id": 0, "search_name": 0, "search_body": 0}
+    ).to_list(len(page_ids))
+    by_id = {p["id"]: p for p in found}
+    return len(product_ids), [by_id[pid] for pid in page_ids if pid in by_id]
+
+async def _search_products_regex(search: str, query: dict, skip: int, limit: int):
+    """Original search: unanchored regex over products and Arabic translations"""
+    category_id = query.get("category_id")
+    product_ids_from_search = set()
+        
+    # Search in products collection (English names/descriptions)
+    search_query = query.copy()
+    search_query["$or"] = [
+        {"name": {"$regex": search, "$options": "i"}},
+        {"description": {"$regex": search, "$options": "i"}}
+    ]
+    english_results = await db.products.find(search_query, {"_id": 0, "id": 1}).limit(100).to_list(100)
+    for prod in english_results:
+        product_ids_from_search.add(prod["id"])
+    
+    # Search in translations collection (Arabic names/descriptions)
+    translation_query = {
+        "key": {"$regex": "entity.product.", "$options": "i"},
+        "$or": [
+            {"ar": {"$regex": search, "$options": "i"}},
+        ]
+    }
+    arabic_results = await db.translations.find(translation_query, {"_id": 0, "key": 1}).limit(100).to_list(100)
+    for trans in arabic_results:
+        product_id = _product_id_from_translation_key(trans["key"])
+        if product_id:
+            product_ids_from_search.add(product_id)
+    
+    # Now get the actual products with IDs from both searches
+    if not product_ids_from_search:
+        return 0, []
+    final_query = {"id": {"$in": list(product_ids_from_search)}, **({
+    "category_id": category_id} if category_id else {})}
+    total_count = await db.products.count_documents(final_query)
+    products = await db.products.find(
+        final_query,
+        {"_id": 0}
+    ).skip(skip).limit(limit).to_list(limit)
+    return total_count, products
+
 # Product Routes
 @api_router.get("/products")
-async def get_products(category_id: Optional[str] = None, search: Optional[str] = None, page: int = 1, limit: int = 12):
+async def get_products(category_id: Optional[str] = None, search: Optional[str] = None, page: int = 1, limit: int = 12,
+                       cursor: bool = False, after: Optional[str] = None, count: str = "exact",
+                       lang: Optional[str] = None, fields: Optional[str] = None):
     # Validate pagination parameters
     page = max(1, page)
-    limit = min(limit, 500)  # Max 100 per page
+    limit = max(1, min(limit, 500))  # Max 500 per page
+    validate_lang(lang)
+    shape = PRODUCT_SHAPE.sparse(fields)
     skip = (page - 1) * limit
     query = {}
     if category_id:
         query["category_id"] = category_id
     
-    # If search term provided, we need to search both product DB and translations
+    # If search term provided, search product text and Arabic translations
     if search:
-        product_ids_from_search = set()
-        
-        # Search in products collection (English names/descriptions)
-        search_query = query.copy()
-        search_query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
-        ]
-        english_results = await db.products.find(search_query, {"_id": 0, "id": 1}).limit(100).to_list(100)
-        for prod in english_results:
-            product_ids_from_search.add(prod["id"])
-        
-        # Search in translations collection (Arabic names/descriptions)
-        translation_query = {
-            "key": {"$regex": "entity.product.", "$options": "i"},
-            "$or": [
-                {"ar": {"$regex": search, "$options": "i"}},
-            ]
-        }
-        arabic_results = await db.translations.find(translation_query, {"_id": 0, "key": 1}).limit(100).to_list(100)
-        for trans in arabic_results:
-            # Extract product ID from key like "entity.product.{id}.name"
-            key_parts = trans["key"].split(".")
-            if len(key_parts) >= 3 and key_parts[0] == "entity" and key_parts[1] == "product":
-                product_ids_from_search.add(key_parts[2])
-        
-        # Now get the actual products with IDs from both searches
-        if product_ids_from_search:
-            final_query = {"id": {"$in": list(product_ids_from_search)}, **({
-            "category_id": category_id} if category_id else {})}
-            total_count = await db.products.count_documents(final_query)
-            products = await db.products.find(
-                final_query,
-                {"_id": 0}
-            ).skip(skip).limit(limit).to_list(limit)
+        if cursor or after:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported with search")
+        if SEARCH_MODE == "regex":
+            total_count, products = await _search_products_regex(search, query, skip, limit)
+        elif SEARCH_MODE == "memory":
+            total_count, products = await _search_products_memory(search, query, skip, limit)
         else:
-            total_count = 0
-            products = []
-    else:
-        # No search term, just filter by category
-        total_count = await db.products.count_documents(query)
-        products = await db.products.find(query, {"_id": 0}).skip(skip).limit(limit).to_list(limit)
-    
-    for prod in products:
-        if isinstance(prod['created_at'], str):
-            prod['created_at'] = datetime.fromisoformat(prod['created_at'])
-    
-    return {
-        "data": [Product(**p) for p in products],
-        "pagination": {
+            total_count, products = await _search_products_text(search, query, skip, limit)
+        pagination = {
             "total": total_count,
             "page": page,
             "limit": limit,
             "pages": (total_count + limit - 1) // limit
         }
+        await localize_entities(products, "product", lang)
+        return FastJSONResponse(_product_page(products, pagination, shape))
+    
+    # No search term, just filter by category
+    async def load():
+        products, pagination = await paginate(db.products, query, sparse_projection(shape, cursor or bool(after)),
+                                              page, limit, cursor, after, count)
+        await localize_entities(products, "product", lang)
+        return _product_page(products, pagination, shape)
+    
+    params = {"category_id": category_id, "page": page, "limit": limit,
+              "cursor": cursor or None, "after": after, "count": count, "lang": lang, "fields": shape.selection}
+    return await response_cache.cached("products", params, load)
+
+def _product_page(products: List[dict], pagination: dict, shape: TrustedShape = PRODUCT_SHAPE) -> dict:
+    return {
+        "data": shape.dump_many(products),
+        "pagination": pagination
     }
 
-@api_router.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: str):
-    product = await db.products.find_one({"id": product_id}, {"_id": 0})
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    if isinstance(product['created_at'], str):
-        product['created_at'] = datetime.fromisoformat(product['created_at'])
-    return Product(**product)
+# Product import/export
+# Registered before /products/{product_id} so "export" and "import" are not taken for ids
+PRODUCT_IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+PRODUCT_EXPORT_FIELDS = ["id", "sku", "name", "description", "price", "category_id", "image_url", "stock", "created_at"]
+# Defaults for optional columns, applied only when a row inserts a new product
+PRODUCT_IMPORT_DEFAULTS = {"image_url": None, "stock": 0, "sku": None}
 
-@api_router.post("/products", response_model=Product)
-async def create_product(product_data: ProductCreate, admin: User = Depends(require_admin)):
-    product = Product(**product_data.model_dump())
-    prod_dict = product.model_dump()
-    prod_dict['created_at'] = prod_dict['created_at'].isoformat()
-    await db.products.insert_one(prod_dict)
-    return product
+def iter_product_rows(path: Path, fmt: str, start: int = 0):
+    """Yield (row_number, row) from a CSV or NDJSON file, skipping the first start rows.
 
-@api_router.put("/products/{product_id}", response_model=Product)
-async def update_product(product_id: str, product_data: ProductCreate, admin: User = Depends(require_admin)):
-    result = await db.products.update_one(
-        {"id": product_id},
-        {"$set": product_data.model_dump()}
-    )
-    if result.matched_count == 0:
+    Rows are read lazily; a malformed NDJSON line is yielded as the
+    exception so it can be reported against its row instead of aborting.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (line for line in f if line.strip())
+        for row_number, row in enumerate(rows, start=1):
+            if row_number <= start:
+                continue
+            if fmt != "csv":
+                try:
+                    row = json.loads(row)
+                    if not isinstance(row, dict):
+                        raise ValueError("expected a JSON object")
+                except ValueError as e:
+                    row = e
+            yield row_number, row
+
+def _clean_import_row(row: dict) -> dict:
+    # Blank cells mean "not provided", so they never overwrite stored values
+    cleaned = {}
+    for field, value in row.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if field and value not in (None, ""):
+            cleaned[field] = value
+    return cleaned
+
+def _validation_summary(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors())
+
+async def import_product_batch(batch: list, key: str = "id") -> dict:
+    """Validate a batch of (row_number, row) pairs and upsert them with one unordered bulk_write.
+
+    key="id" matches existing products by id (rows without one are
+    inserted with a new id), key="sku" matches them by sku. Returns the
+    counts, the per-row errors and the ids of the products written.
+    """
+    now = datetime.now(timezone.utc)
+    operations, operation_rows, operation_keys, errors = [], [], [], []
+    for row_number, raw in batch:
+        if isinstance(raw, Exception):
+            errors.append({"row": row_number, "error": str(raw)})
+            continue
+        try:
+            item = ProductImportRow.model_validate(_clean_import_row(raw))
+        except ValidationError as e:
+            errors.append({"row": row_number, "error": _validation_summary(e)})
+            continue
+        if key == "sku" and not item.sku:
+            errors.append({"row": row_number, "error": "sku: required when importing by sku"})
+            continue
+        
+        fields = item.model_dump(exclude={"id"}, exclude_unset=True)
+        on_insert = {
+            "id": item.id or str(uuid.uuid4()),
+            "created_at": now,
+            **{field: default for field, default in PRODUCT_IMPORT_DEFAULTS.items() if field not in fields},
+        }
+        match = {"id": on_insert["id"]} if key == "id" else {"sku": item.sku}
+        operations.append(UpdateOne(match, {"$set": fields, "$setOnInsert": on_insert}, upsert=True))
+        operation_rows.append(row_number)
+        operation_keys.append(match[key])
+    
+    if not operations:
+        return {"inserted": 0, "updated": 0, "errors": errors, "ids": []}
+    
+    try:
+        details = (await db.products.bulk_write(operations, ordered=False)).bulk_api_result
+    except BulkWriteError as e:
+        details = e.details
+    failed = set()
+    for write_error in details.get("writeErrors", []):
+        failed.add(write_error["index"])
+        errors.append({"row": operation_rows[write_error["index"]], "error": write_error.get("errmsg", "")})
+    written = [k for i, k in enumerate(operation_keys) if i not in failed]
+    if key == "id":
+        ids = written
+    else:
+        ids = [p["id"] for p in await db.products.find({"sku": {"$in": written}}, {"_id": 0, "id": 1}).to_list(None)]
+    
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "inserted": details.get("nUpserted", 0),
+        "updated": details.get("nMatched", 0),
+        "errors": errors,
+        "ids": ids,
+    }
+
+async def create_product_import_job(path: Path, fmt: str, key: str = "id", source_name: Optional[str] = None,
+                                    spooled: bool = False) -> dict:
+    """Record an import of path; spooled files (uploads copied to IMPORTS_DIR) are deleted once the job completes"""
+    now = datetime.now(timezone.utc)
+    job = {
+        "id": str(uuid.uuid4()),
+        "status": "pending",
+        "path": str(path),
+        "source_name": source_name or path.name,
+        "format": fmt,
+        "key": key,
+        "spooled": spooled,
+        "rows_processed": 0,
+        "inserted": 0,
+        "updated": 0,
+        "failed": 0,
+        "errors": [],
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    await db.import_jobs.insert_one(job)
+    job.pop("_id", None)
+    return job
+
+async def run_product_import(job_id: str, batch_size: int = PRODUCT_IMPORT_BATCH_SIZE) -> dict:
+    """Run (or resume) an import job from its last committed row.
+
+    rows_processed is advanced together with the counters after every
+    batch, so a job interrupted by a crash or restart continues where it
+    stopped when run again. Upserts are idempotent, so replaying the batch
+    that was in flight is harmless.
+    """
+    job = await db.import_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if job["status"] == "completed":
+        return job
+    
+    await db.import_jobs.update_one({"id": job_id}, {"$set": {"status": "running", "error": None}})
+    rows = iter_product_rows(Path(job["path"]), job["format"], start=job["rows_processed"])
+    try:
+        while True:
+            batch = await asyncio.to_thread(lambda: list(islice(rows, batch_size)))
+            if not batch:
+                break
+            result = await import_product_batch(batch, job["key"])
+            if result["ids"]:
+                await refresh_product_search_fields(result["ids"])
+                await response_cache.invalidate("products", "product-details")
+            await db.import_jobs.update_one({"id": job_id}, {
+                "$inc": {
+                    "rows_processed": len(batch),
+                    "inserted": result["inserted"],
+                    "updated": result["updated"],
+                    "failed": len(result["errors"]),
+                },
+                "$push": {"errors": {"$each": result["errors"], "$slice": PRODUCT_IMPORT_MAX_ERRORS}},
+                "$set": {"updated_at": datetime.now(timezone.utc)},
+            })
+        status_fields = {"status": "completed"}
+    except Exception as e:
+        logger.error(f"Product import {job_id} failed: {e}", exc_info=True)
+        status_fields = {"status": "failed", "error": str(e)}
+    finally:
+        rows.close()
+        await response_cache.invalidate("products")
+    
+    status_fields["updated_at"] = datetime.now(timezone.utc)
+    await db.import_jobs.update_one({"id": job_id}, {"$set": status_fields})
+    if status_fields["status"] == "completed" and job.get("spooled"):
+        Path(job["path"]).unlink(missing_ok=True)
+    return await db.import_jobs.find_one({"id": job_id}, {"_id": 0})
+
+async def start_product_import(import_id: str) -> dict:
+    """Queue the import on the jobs collection; a worker restart resumes it from its last committed row"""
+    return await enqueue_job("product_import", {"import_id": import_id})
+
+async def queued_product_import(import_id: str) -> Optional[dict]:
+    return await db.jobs.find_one(
+        {"type": "product_import", "payload.import_id": import_id, "status": {"$in": ["queued", "running"]}},
+        {"_id": 0}
+    )
+
+async def iter_product_export(fmt: str, batch_size: int = 1000):
+    """Yield the catalog as CSV or NDJSON text chunks, streaming from a cursor"""
+    projection = {"_id": 0, **{field: 1 for field in PRODUCT_EXPORT_FIELDS}}
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(PRODUCT_EXPORT_FIELDS)
+    async for product in db.products.find(projection=projection).batch_size(batch_size):
+        if isinstance(product.get("created_at"), datetime):
+            product["created_at"] = product["created_at"].isoformat()
+        if fmt == "csv":
+            writer.writerow(["" if product.get(field) is None else product.get(field) for field in PRODUCT_EXPORT_FIELDS])
+        else:
+            buffer.write(json.dumps({field: product.get(field) for field in PRODUCT_EXPORT_FIELDS}, ensure_ascii=False))
+            buffer.write("\n")
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@api_router.post("/products/import", status_code=202)
+async def import_products(file: UploadFile = File(...), format: Optional[str] = None, key: str = "id",
+                          admin: User = Depends(require_admin)):
+    """Upload a CSV or NDJSON catalog and import it in the background; poll the returned job"""
+    fmt = format or PRODUCT_IMPORT_FORMATS.get(Path(file.filename or "").suffix.lower())
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="Import format must be csv or ndjson")
+    if key not in ("id", "sku"):
+        raise HTTPException(status_code=400, detail="Import key must be id or sku")
+    
+    IMPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = IMPORTS_DIR / f"{uuid.uuid4()}.{fmt}"
+    await stream_upload_to_disk(file, path, PRODUCT_IMPORT_MAX_BYTES)
+    job = await create_product_import_job(path, fmt, key, source_name=file.filename, spooled=True)
+    job["queue_job"] = await start_product_import(job["id"])
+    return job
+
+@api_router.get("/products/import/{job_id}")
+async def get_product_import(job_id: str, admin: User = Depends(require_admin)):
+    job = await db.import_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+@api_router.post("/products/import/{job_id}/resume", status_code=202)
+async def resume_product_import(job_id: str, admin: User = Depends(require_admin)):
+    job = await db.import_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if job["status"] == "completed":
+        raise HTTPException(status_code=400, detail="Import job already completed")
+    if await queued_product_import(job_id):
+        raise HTTPException(status_code=409, detail="Import job is already queued or running")
+    job["queue_job"] = await start_product_import(job_id)
+    return job
+
+@api_router.get("/products/export")
+async def export_products(format: str = "csv", admin: User = Depends(require_admin)):
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="Export format must be csv or ndjson")
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        iter_product_export(format),
+        media_type=f"{media_type}; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'}
+    )
+
+# Batched product lookup (registered before /products/{product_id} for the same reason)
+async def get_products_by_ids(ids: List[str], lang: Optional[str] = None, fields: Optional[str] = None) -> dict:
+    """Resolve ids with one $in query on the id index.
+
+    Products come back in request order (duplicates collapsed) and ids
+    with no product are listed under "missing".
+    """
+    validate_lang(lang)
+    shape = PRODUCT_SHAPE.sparse(fields)
+    ids = list(dict.fromkeys(i for i in ids if i))
+    if not ids:
+        raise HTTPException(status_code=400, detail="Provide at least one product id")
+    if len(ids) > PRODUCT_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {PRODUCT_BATCH_MAX_IDS} ids per request")
+    
+    docs = await db.products.find({"id": {"$in": ids}}, shape.projection).to_list(len(ids))
+    await localize_entities(docs, "product", lang)
+    by_id = {doc["id"]: doc for doc in docs}
+    return {
+        "data": shape.dump_many([by_id[i] for i in ids if i in by_id]),
+        "missing": [i for i in ids if i not in by_id],
+    }
+
+@api_router.get("/products/batch")
+async def get_products_batch(ids: Optional[List[str]] = Query(None), lang: Optional[str] = None,
+                             fields: Optional[str] = None):
+    """ids may be repeated or comma-separated; use POST for lists too long for a URL"""
+    return FastJSONResponse(await get_products_by_ids(_split_query_values(ids), lang, fields))
+
+@api_router.post("/products/batch")
+async def post_products_batch(request: ProductBatchRequest):
+    return FastJSONResponse(await get_products_by_ids(request.ids, request.lang, request.fields))
+
+@api_router.get("/products/{product_id}", response_model=Product)
+async def get_product(product_id: str, lang: Optional[str] = None):
+    validate_lang(lang)
+    
+    async def load():
+        product = await db.products.find_one({"id": product_id}, PRODUCT_SHAPE.projection)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        await localize_entities([product], "product", lang)
+        return PRODUCT_SHAPE.dump(product)
+    
+    # product-details is bumped by imports, which touch too many products to bump each one
+    return await response_cache.cached(f"product:{product_id}", {"lang": lang}, load, depends_on=("product-details",))
+
+@api_router.post("/products", response_model=Product)
+async def create_product(product_data: ProductCreate, admin: User = Depends(require_admin)):
+    product = Product(**product_data.model_dump())
+    prod_dict = product.model_dump()
+    await db.products.insert_one(prod_dict)
+    await refresh_product_search_fields([product.id])
+    await response_cache.invalidate("products", f"product:{product.id}")
+    return product
+
+@api_router.put("/products/{product_id}", response_model=Product)
+async def update_product(product_id: str, product_data: ProductCreate, admin: User = Depends(require_admin)):
+    result = await db.products.update_one(
+        {"id": product_id},
+        {"$set": product_data.model_dump()}
+    )
+    if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    await refresh_product_search_fields([product_id])
+    await response_cache.invalidate("products", f"product:{product_id}")
     
     updated = await db.products.find_one({"id": product_id}, {"_id": 0})
     if not updated:
@@ -812,135 +2245,946 @@ async def delete_product(product_id: str, admin: User = Depends(require_admin)):
     result = await db.products.delete_one({"id": product_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    catalog_search_index.remove(product_id)
+    await response_cache.invalidate("products", f"product:{product_id}")
     return {"message": "Product deleted"}
 
+@api_router.get("/search/index-stats")
+async def get_search_index_stats(admin: User = Depends(require_admin)):
+    return {"mode": SEARCH_MODE, **catalog_search_index.stats()}
+
+# Translation bundles
+try:
+    import brotli
+except ImportError:  # optional, bundles are still served gzip-compressed
+    brotli = None
+
+TRANSLATIONS_COUNTER_ID = "translations"
+
+async def next_translation_rev(count: int = 1) -> int:
+    """Reserve count revisions and return the last one (the first is the result - count + 1)"""
+    counter = await db.counters.find_one_and_update(
+        {"id": TRANSLATIONS_COUNTER_ID},
+        {"$inc": {"rev": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["rev"]
+
+async def current_translation_rev() -> int:
+    counter = await db.counters.find_one({"id": TRANSLATIONS_COUNTER_ID}, {"_id": 0, "rev": 1})
+    return counter["rev"] if counter else 0
+
+
+class TranslationBundle:
+    """Serialized key -> text map for one language, with compressed encodings and a content hash"""
+
+    def __init__(self, version: int, strings: dict):
+        self.version = version
+        self.body = json.dumps(strings, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.encodings = {"gzip": gzip.compress(self.body, compresslevel=9)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(self.body, quality=11, mode=brotli.MODE_TEXT)
+
+    def encoded(self, accept_encoding: str) -> tuple:
+        """Return (content_encoding, payload) for the best encoding the client accepts"""
+        accepted = set()
+        for part in accept_encoding.lower().split(","):
+            coding, _, params = part.strip().partition(";")
+            if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                accepted.add(coding.strip())
+        for coding in ("br", "gzip"):
+            if coding in self.encodings and (coding in accepted or "*" in accepted):
+                return coding, self.encodings[coding]
+        return None, self.body
+
+
+class TranslationBundles:
+    """Per-language translation bundles kept in memory and updated incrementally.
+
+    The full table is read once. Afterwards only documents above the settled
+    revision are fetched and applied, and a language's bundle is
+    re-serialized lazily the next time it is requested. Every key remembers
+    the rev that last changed it, which is what delta requests
+    (since=<version>) are answered from. Concurrent requests for a
+    language share one build, and a build that an applied change overtook
+    is served once but not kept.
+
+    settled is a low watermark: every revision up to it has been applied.
+    It trails the counter by write_window seconds, because a writer that
+    reserved a lower revision may still be storing its document. Clients
+    are handed the settled revision, so their next delta re-reads anything
+    that landed late.
+    """
+
+    def __init__(self, languages=TRANSLATION_LANGUAGES, check_seconds: float = TRANSLATION_BUNDLE_CHECK_SECONDS,
+                 write_window: float = TRANSLATION_WRITE_WINDOW_SECONDS):
+        self.languages = languages
+        self.check_seconds = check_seconds
+        self.write_window = write_window
+        self.version = 0
+        self.settled = 0
+        self._observed = deque()  # (monotonic time, counter rev) not yet write_window old
+        self._entries = None  # key -> {"en", "ar", "rev"}
+        self._bundles = {}
+        self._generation = 0  # bumped whenever _bundles is reset
+        self._building = {}  # lang -> (generation, task)
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.rebuilds = 0
+
+    def _apply(self, doc: dict) -> bool:
+        rev = doc.get("rev") or 0
+        entry = {**{lang: doc.get(lang) for lang in self.languages}, "rev": rev}
+        if self._entries.get(doc["key"]) == entry:
+            return False
+        self._entries[doc["key"]] = entry
+        self.version = max(self.version, rev)
+        return True
+
+    def _observe(self, now: float, counter: int):
+        if not self._observed or counter > self._observed[-1][1]:
+            self._observed.append((now, counter))
+
+    def _text(self, entry: dict, lang: str) -> str:
+        return entry.get(lang) or entry.get("en") or ""
+
+    async def _sync(self, force: bool = False):
+        async with self._lock:
+            now = time.monotonic()
+            projection = {"_id": 0, "key": 1, "rev": 1, **{lang: 1 for lang in self.languages}}
+            if self._entries is None:
+                self._entries = {}
+                self._observe(now, await current_translation_rev())
+                # Documents written more than write_window ago are settled, and so
+                # is every revision reserved before theirs
+                written_before = datetime.now(timezone.utc) - timedelta(seconds=self.write_window)
+                async for doc in db.translations.find({}, {**projection, "updated_at": 1}):
+                    self._apply(doc)
+                    updated_at = doc.get("updated_at")
+                    if not isinstance(updated_at, datetime) or _as_utc(updated_at) < written_before:
+                        self.settled = max(self.settled, doc.get("rev") or 0)
+                changed = True
+            elif force or now - self._checked_at >= self.check_seconds:
+                counter = await current_translation_rev()
+                self._observe(now, counter)
+                changed = False
+                if counter > self.settled:
+                    async for doc in db.translations.find({"rev": {"$gt": self.settled}}, projection):
+                        changed = self._apply(doc) or changed
+                # Every revision reserved write_window ago has been written by now,
+                # and the query above (from the old watermark) has seen it
+                while self._observed and now - self._observed[0][0] >= self.write_window:
+                    self.settled = max(self.settled, self._observed.popleft()[1])
+            else:
+                return
+            self._checked_at = now
+            if changed:
+                self._bundles = {}
+                self._generation += 1
+
+    async def get(self, lang: str) -> TranslationBundle:
+        await self._sync()
+        bundle = self._bundles.get(lang)
+        if bundle is not None:
+            return bundle
+        building = self._building.get(lang)
+        if building is None or building[0] != self._generation:
+            strings = {key: self._text(entry, lang) for key, entry in self._entries.items()}
+            task = asyncio.ensure_future(self._build(lang, self._generation, self.settled, strings))
+            building = self._building[lang] = (self._generation, task)
+            self.rebuilds += 1
+        # Shielded so one cancelled request does not cancel the build the others wait for
+        return await asyncio.shield(building[1])
+
+    async def _build(self, lang: str, generation: int, version: int, strings: dict) -> TranslationBundle:
+        try:
+            bundle = await asyncio.to_thread(TranslationBundle, version, strings)
+            if generation == self._generation:
+                self._bundles[lang] = bundle
+            return bundle
+        finally:
+            if self._building.get(lang, (None,))[0] == generation:
+                del self._building[lang]
+
+    async def delta(self, lang: str, since: int) -> dict:
+        await self._sync()
+        changes = {
+            key: self._text(entry, lang)
+            for key, entry in self._entries.items()
+            if entry["rev"] > since
+        }
+        return {"version": self.settled, "since": since, "changes": changes}
+
+    async def lookup(self, lang: str, keys) -> dict:
+        """Texts of the given keys in lang, leaving out keys that have no text.
+
+        Always checks the revision counter first: callers cache what they
+        build from this, so it must not lag behind another worker's write.
+        """
+        await self._sync(force=True)
+        found = {}
+        for key in keys:
+            entry = self._entries.get(key)
+            text = self._text(entry, lang) if entry else ""
+            if text:
+                found[key] = text
+        return found
+
+    async def refresh(self):
+        """Pick up writes made by this process right away instead of after the next check interval"""
+        if self._entries is not None:
+            await self._sync(force=True)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "settled": self.settled,
+            "keys": len(self._entries or {}),
+            "rebuilds": self.rebuilds,
+            "encodings": ["br", "gzip"] if brotli is not None else ["gzip"],
+            "bundles": {
+                lang: {"etag": b.etag, "bytes": len(b.body),
+                       **{f"{coding}_bytes": len(data) for coding, data in b.encodings.items()}}
+                for lang, b in self._bundles.items()
+            },
+        }
+
+translation_bundles = TranslationBundles()
+
+LOCALIZED_FIELDS = ("name", "description")
+
+def validate_lang(lang: Optional[str]):
+    if lang is not None and lang not in TRANSLATION_LANGUAGES:
+        raise HTTPException(status_code=400, detail=ERROR_MESSAGES["UNSUPPORTED_LANGUAGE"])
+
+async def localize_entities(docs: List[dict], entity: str, lang: Optional[str]) -> List[dict]:
+    """Replace name/description of entity documents with their entity.{entity}.{id}.{field} translations.
+
+    The stored text is kept wherever no translation exists.
+    """
+    if not lang or not docs:
+        return docs
+    keys = [f"entity.{entity}.{doc['id']}.{field}" for doc in docs for field in LOCALIZED_FIELDS]
+    strings = await translation_bundles.lookup(lang, keys)
+    for doc in docs:
+        for field in LOCALIZED_FIELDS:
+            text = strings.get(f"entity.{entity}.{doc['id']}.{field}")
+            if text:
+                doc[field] = text
+    return docs
+
+def _response_namespaces_for_translation_keys(keys) -> set:
+    """Response cache namespaces whose localized output depends on the given translation keys"""
+    namespaces = {"translations"}
+    for key in keys:
+        key_parts = key.split(".")
+        if len(key_parts) >= 3 and key_parts[0] == "entity":
+            if key_parts[1] == "product":
+                namespaces.update(("products", f"product:{key_parts[2]}"))
+            elif key_parts[1] == "category":
+                namespaces.add("categories")
+    return namespaces
+
+def _split_query_values(values: Optional[List[str]]) -> List[str]:
+    """Accept both repeated query parameters and comma-separated values"""
+    return [v.strip() for value in values or [] for v in value.split(",") if v.strip()]
+
 # Translation Routes
+@api_router.get("/translations/{lang}/batch")
+async def get_translations_batch(
+    lang: str,
+    ref_ids: Optional[List[str]] = Query(None),
+    prefixes: Optional[List[str]] = Query(None),
+):
+    """Translations for many entities at once.
+
+    ref_ids and prefixes may be repeated or comma-separated; a prefix such
+    as entity.product.* matches every key starting with entity.product.
+    Served by the ref_id index ($in) and the key index (anchored regex).
+    """
+    if lang not in TRANSLATION_LANGUAGES:
+        raise HTTPException(status_code=400, detail=ERROR_MESSAGES["UNSUPPORTED_LANGUAGE"])
+    ref_ids = sorted(set(_split_query_values(ref_ids)))
+    prefixes = sorted({p.rstrip("*") for p in _split_query_values(prefixes) if p.rstrip("*")})
+    if not ref_ids and not prefixes:
+        raise HTTPException(status_code=400, detail="Provide at least one ref_id or key prefix")
+    if len(ref_ids) > TRANSLATION_BATCH_MAX_REF_IDS or len(prefixes) > TRANSLATION_BATCH_MAX_PREFIXES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {TRANSLATION_BATCH_MAX_REF_IDS} ref_ids and {TRANSLATION_BATCH_MAX_PREFIXES} prefixes per request"
+        )
+    
+    async def load():
+        clauses = [{"key": {"$regex": f"^{re.escape(prefix)}"}} for prefix in prefixes]
+        if ref_ids:
+            clauses.append({"ref_id": {"$in": ref_ids}})
+        query = clauses[0] if len(clauses) == 1 else {"$or": clauses}
+        result = {}
+        async for e in db.translations.find(query, {"_id": 0, "key": 1, "en": 1, lang: 1}):
+            result[e["key"]] = e.get(lang) or e.get("en") or ""
+        return result
+    
+    params = {"lang": lang, "ref_ids": ",".join(ref_ids), "prefixes": ",".join(prefixes)}
+    return await response_cache.cached("translations", params, load)
+
 @api_router.get("/translations/{lang}")
-async def get_translations(lang: str, ref_id: Optional[str] = None):
-    if lang not in ("en", "ar"):
+async def get_translations(request: Request, lang: str, ref_id: Optional[str] = None, since: Optional[int] = None):
+    """Translations for one language.
+
+    Without parameters this is the whole precompiled bundle, served
+    compressed with an ETag (If-None-Match gives 304) and the bundle
+    version in X-Translations-Version. since=<version> returns only the
+    keys changed after that version; ref_id returns the keys of one entity.
+    """
+    if lang not in TRANSLATION_LANGUAGES:
         raise HTTPException(status_code=400, detail=ERROR_MESSAGES["UNSUPPORTED_LANGUAGE"])
-    # Filter by ref_id if provided, otherwise get all translations
-    query = {"ref_id": ref_id} if ref_id else {}
-    entries = await db.translations.find(query, {"_id": 0}).limit(1000).to_list(1000)
-    result = {}
-    for e in entries:
-        val = e.get(lang) or e.get("en") or ""
-        result[e["key"]] = val
-    return result
+    
+    if ref_id is None:
+        if since is not None:
+            return await translation_bundles.delta(lang, since)
+        bundle = await translation_bundles.get(lang)
+        headers = {
+            "ETag": bundle.etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+            "X-Translations-Version": str(bundle.version),
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, bundle.etag):
+            return Response(status_code=304, headers=headers)
+        encoding, payload = bundle.encoded(request.headers.get("accept-encoding", ""))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=payload, media_type="application/json", headers=headers)
+    
+    async def load():
+        # Filter by ref_id if provided, otherwise get all translations
+        query = {"ref_id": ref_id} if ref_id else {}
+        entries = await db.translations.find(query, {"_id": 0}).limit(1000).to_list(1000)
+        result = {}
+        for e in entries:
+            val = e.get(lang) or e.get("en") or ""
+            result[e["key"]] = val
+        return result
+    
+    return await response_cache.cached("translations", {"lang": lang, "ref_id": ref_id}, load)
 
 @api_router.post("/translations")
 async def upsert_translation(entry: TranslationCreate, admin: User = Depends(require_admin)):
     payload = entry.model_dump()
-    payload["updated_at"] = datetime.now(timezone.utc).isoformat()
+    payload["updated_at"] = datetime.now(timezone.utc)
+    payload["rev"] = await next_translation_rev()
     await db.translations.update_one({"key": entry.key}, {"$set": payload}, upsert=True)
+    await response_cache.invalidate(*_response_namespaces_for_translation_keys([entry.key]))
+    await translation_bundles.refresh()
+    product_id = _product_id_from_translation_key(entry.key)
+    if product_id:
+        await refresh_product_search_fields([product_id])
     return {"message": "OK"}
 
-# Order Routes
-@api_router.get("/orders")
-async def get_orders(current_user: User = Depends(get_current_user), page: int = 1, limit: int = 12):
-    page = max(1, page)
-    limit = min(limit, 100)
-    skip = (page - 1) * limit
+@api_router.post("/translations/bulk")
+async def bulk_upsert_translations(entries: List[TranslationCreate], admin: User = Depends(require_admin)):
+    """Upsert many translations with unordered bulk writes (later duplicates of a key win)"""
+    if len(entries) > TRANSLATION_BULK_MAX_ENTRIES:
+        raise HTTPException(status_code=400, detail=f"At most {TRANSLATION_BULK_MAX_ENTRIES} translations per request")
+    by_key = {entry.key: entry for entry in entries}
+    if not by_key:
+        return {"matched": 0, "modified": 0, "upserted": 0, "errors": []}
     
-    query = {} if current_user.role == UserRole.ADMIN else {"user_id": current_user.id}
-    total_count = await db.orders.count_documents(query)
-    orders_list = await db.orders.find(query, {"_id": 0}).skip(skip).limit(limit).to_list(limit)
-    result = []
-    for order in orders_list:
+    keys = list(by_key)
+    
+    matched = modified = upserted = 0
+    errors = []
+    for start in range(0, len(keys), TRANSLATION_BULK_CHUNK_SIZE):
+        # Revisions are reserved per chunk, right before it is written, so
+        # each one lands within the bundles' write window
+        chunk_keys = keys[start:start + TRANSLATION_BULK_CHUNK_SIZE]
+        updated_at = datetime.now(timezone.utc)
+        first_rev = await next_translation_rev(len(chunk_keys)) - len(chunk_keys) + 1
+        chunk = [
+            UpdateOne({"key": key}, {"$set": {**by_key[key].model_dump(), "updated_at": updated_at, "rev": first_rev + i}},
+                      upsert=True)
+            for i, key in enumerate(chunk_keys)
+        ]
         try:
-            if isinstance(order.get('created_at'), str):
-                order['created_at'] = datetime.fromisoformat(order['created_at'])
-            # Skip orders with invalid shipping_address (string instead of object)
-            if isinstance(order.get('shipping_address'), str):
-                logger.warning(f"Skipping order {order.get('id')} with invalid shipping_address")
-                continue
-            # Ensure all required fields are present
-            if all(key in order for key in ['id', 'user_id', 'items', 'total', 'shipping_address', 'created_at']):
-                result.append(Order(**order))
-        except Exception as e:
-            logger.error(f"Error processing order {order.get('id')}: {str(e)}")
-            continue
+            result = await db.translations.bulk_write(chunk, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            errors.extend(
+                {"key": keys[start + err["index"]], "error": err.get("errmsg", "")}
+                for err in details.get("writeErrors", [])
+            )
+        matched += details.get("nMatched", 0)
+        modified += details.get("nModified", 0)
+        upserted += details.get("nUpserted", 0)
     
+    await response_cache.invalidate(*_response_namespaces_for_translation_keys(keys))
+    await translation_bundles.refresh()
+    product_ids = {pid for pid in map(_product_id_from_translation_key, keys) if pid}
+    if product_ids:
+        await refresh_product_search_fields(list(product_ids))
+    return {"matched": matched, "modified": modified, "upserted": upserted, "errors": errors}
+
+# Analytics rollups
+# Counters kept up to date by create_order/update_order_status so the
+# dashboard never has to scan the orders collection:
+#   analytics_totals   {"id": "totals", "orders", "sales"}
+#   analytics_daily    {"id": "YYYY-MM-DD", "orders", "sales"}
+#   analytics_status   {"id": <status>, "count"}
+#   analytics_products {"id": <product_id>, "quantity"}
+# The $inc runs after the order insert and outside its transaction, so a
+# crash between the two leaves the counters short by that order until the
+# next rebuild (POST /api/analytics/rebuild or rebuild_analytics.py).
+ANALYTICS_TOTALS_ID = "totals"
+# counters doc held while a rebuild runs, so two rebuilds never both apply their corrections
+ANALYTICS_REBUILD_LOCK_ID = "analytics_rebuild"
+ANALYTICS_REBUILD_LOCK_SECONDS = 30 * 60
+
+class AnalyticsRebuildRunning(Exception):
+    """Another process holds the analytics rebuild lock"""
+
+def created_since(moment: datetime, field: str = "created_at") -> dict:
+    """Range filter matching both BSON dates and ISO strings not yet converted by migrate_dates.py"""
+    return {"$or": [{field: {"$gte": moment}}, {field: {"$gte": moment.isoformat()}}]}
+
+def created_before(moment: datetime, field: str = "created_at") -> dict:
+    """The complement of created_since, for BSON dates and ISO strings alike"""
+    return {"$or": [{field: {"$lt": moment}}, {field: {"$lt": moment.isoformat()}}]}
+
+def day_key_expression(field_path: str) -> dict:
+    """Aggregation expression for the UTC "YYYY-MM-DD" of a BSON date or ISO string field"""
+    # $toString renders a date as ISO 8601 in UTC and leaves strings as they are
+    return {"$substrBytes": [{"$toString": field_path}, 0, 10]}
+
+def _rollup_day(created_at) -> str:
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return created_at.strftime('%Y-%m-%d')
+
+def _status_value(order_status) -> str:
+    return order_status.value if isinstance(order_status, OrderStatus) else (order_status or OrderStatus.PENDING.value)
+
+async def record_order_rollups(order_dict: dict):
+    """Add a newly created order to the analytics rollups"""
+    total = order_dict.get('total', 0)
+    await db.analytics_totals.update_one(
+        {"id": ANALYTICS_TOTALS_ID},
+        {"$inc": {"orders": 1, "sales": total}},
+        upsert=True
+    )
+    await db.analytics_daily.update_one(
+        {"id": _rollup_day(order_dict['created_at'])},
+        {"$inc": {"orders": 1, "sales": total}},
+        upsert=True
+    )
+    await db.analytics_status.update_one(
+        {"id": _status_value(order_dict.get('status'))},
+        {"$inc": {"count": 1}},
+        upsert=True
+    )
+
+    quantities = {}
+    for item in order_dict.get('items', []):
+        product_id = item.get('product_id')
+        quantities[product_id] = quantities.get(product_id, 0) + item.get('quantity', 0)
+    if quantities:
+        await db.analytics_products.bulk_write(
+            [UpdateOne({"id": pid}, {"$inc": {"quantity": qty}}, upsert=True) for pid, qty in quantities.items()],
+            ordered=False
+        )
+
+async def record_status_change_rollups(old_status, new_status):
+    """Move one order from old_status to new_status in the status rollup"""
+    old_value = _status_value(old_status)
+    new_value = _status_value(new_status)
+    if old_value == new_value:
+        return
+    await db.analytics_status.update_one({"id": old_value}, {"$inc": {"count": -1}}, upsert=True)
+    await db.analytics_status.update_one({"id": new_value}, {"$inc": {"count": 1}}, upsert=True)
+
+async def _acquire_analytics_rebuild_lock() -> bool:
+    now = datetime.now(timezone.utc)
+    try:
+        # Matches a missing or expired lock; a held one makes the upsert collide on the unique id
+        await db.counters.update_one(
+            {"id": ANALYTICS_REBUILD_LOCK_ID, "locked_until": {"$not": {"$gt": now}}},
+            {"$set": {"locked_until": now + timedelta(seconds=ANALYTICS_REBUILD_LOCK_SECONDS)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+async def _rollup_snapshot(collection, fields: tuple) -> dict:
+    projection = {"_id": 0, "id": 1, **{field: 1 for field in fields}}
+    return {doc["id"]: doc async for doc in collection.find({}, projection)}
+
+async def _recount_status_rollups(attempts: int = 3) -> dict:
+    """Recount analytics_status from every order and apply the difference.
+
+    The counters are read before and after the count; if a status change or
+    new order moved them in between, the count is retried. The difference is
+    applied with $inc, so changes landing after the second read are kept.
+    Only a change whose order update the count already saw but whose $inc
+    has not landed yet is counted twice.
+    """
+    for attempt in range(attempts):
+        before = await _rollup_snapshot(db.analytics_status, ("count",))
+        counts = {}
+        async for row in db.orders.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            status_value = _status_value(row["_id"])
+            counts[status_value] = counts.get(status_value, 0) + row["count"]
+        after = await _rollup_snapshot(db.analytics_status, ("count",))
+        if before == after:
+            break
+    else:
+        logger.warning(f"Status rollups kept changing during {attempts} recounts, applying the last one")
+
+    corrections = []
+    for status_value in counts.keys() | after.keys():
+        delta = counts.get(status_value, 0) - (after.get(status_value, {}).get("count") or 0)
+        if delta:
+            corrections.append(UpdateOne({"id": status_value}, {"$inc": {"count": delta}}, upsert=True))
+    if corrections:
+        await db.analytics_status.bulk_write(corrections, ordered=False)
+    stale = list(after.keys() - counts.keys())
+    if stale:
+        await db.analytics_status.delete_many({"id": {"$in": stale}, "count": 0})
+    return counts
+
+async def rebuild_analytics_rollups(batch_size: int = 1000) -> dict:
+    """Recompute every analytics rollup from the orders collection.
+
+    Orders are streamed in batches, so memory stays bounded by the number of
+    distinct days/statuses/products rather than the number of orders.
+
+    Orders keep being placed while this runs, so the rollups are not
+    overwritten: the current counters are snapshotted first, only orders
+    created before the snapshot are counted, and the difference is applied
+    with $inc on top of whatever the live orders added in the meantime.
+    An order whose created_at is before the snapshot but whose rollup $inc
+    lands after it (stock reservation, insert and transaction retries all
+    sit in between) is counted twice, as is any order stamped by a host
+    whose clock runs ahead of this one.
+
+    Status changes move existing orders between counters, which the
+    created_at cutoff cannot separate, so statuses are recounted after the
+    scan (see _recount_status_rollups). Raises AnalyticsRebuildRunning if
+    another rebuild holds the lock.
+    """
+    if not await _acquire_analytics_rebuild_lock():
+        raise AnalyticsRebuildRunning("An analytics rebuild is already running")
+    try:
+        started_at = datetime.now(timezone.utc)
+        rollups = [
+            (db.analytics_totals, ("orders", "sales")),
+            (db.analytics_daily, ("orders", "sales")),
+            (db.analytics_products, ("quantity",)),
+        ]
+        snapshots = [await _rollup_snapshot(collection, fields) for collection, fields in rollups]
+
+        totals = {"orders": 0, "sales": 0}
+        daily = {}
+        products = {}
+
+        cursor = db.orders.find(
+            created_before(started_at), {"_id": 0, "total": 1, "created_at": 1, "items": 1}
+        ).batch_size(batch_size)
+        async for order in cursor:
+            total = order.get('total', 0)
+            totals["orders"] += 1
+            totals["sales"] += total
+
+            day = daily.setdefault(_rollup_day(order['created_at']), {"orders": 0, "sales": 0})
+            day["orders"] += 1
+            day["sales"] += total
+
+            for item in order.get('items', []):
+                product_id = item.get('product_id')
+                products[product_id] = products.get(product_id, 0) + item.get('quantity', 0)
+
+        rebuilt = [
+            {ANALYTICS_TOTALS_ID: totals},
+            daily,
+            {k: {"quantity": v} for k, v in products.items()},
+        ]
+        for (collection, fields), snapshot, counts in zip(rollups, snapshots, rebuilt):
+            corrections = []
+            for doc_id in counts.keys() | snapshot.keys():
+                delta = {
+                    field: counts.get(doc_id, {}).get(field, 0) - (snapshot.get(doc_id, {}).get(field) or 0)
+                    for field in fields
+                }
+                if any(delta.values()):
+                    corrections.append(UpdateOne({"id": doc_id}, {"$inc": delta}, upsert=True))
+            for start in range(0, len(corrections), batch_size):
+                await collection.bulk_write(corrections[start:start + batch_size], ordered=False)
+
+            # Rollups no order counts any more; an order placed since keeps its doc non-zero
+            stale = [doc_id for doc_id in snapshot.keys() - counts.keys() if doc_id != ANALYTICS_TOTALS_ID]
+            if stale:
+                await collection.delete_many({"id": {"$in": stale}, fields[0]: 0})
+
+        statuses = await _recount_status_rollups()
+    finally:
+        await db.counters.delete_one({"id": ANALYTICS_REBUILD_LOCK_ID})
+
+    logger.info(f"Analytics rollups rebuilt from {totals['orders']} orders")
     return {
-        "data": result,
-        "pagination": {
-            "total": total_count,
-            "page": page,
-            "limit": limit,
-            "pages": (total_count + limit - 1) // limit
-        }
+        "orders": totals["orders"],
+        "days": len(daily),
+        "statuses": len(statuses),
+        "products": len(products),
     }
 
+# Order Routes
+@api_router.get("/orders")
+async def get_orders(current_user: User = Depends(get_current_user), page: int = 1, limit: int = 12,
+                     cursor: bool = False, after: Optional[str] = None, count: str = "exact",
+                     fields: Optional[str] = None):
+    page = max(1, page)
+    limit = max(1, min(limit, 100))
+    shape = ORDER_SHAPE.sparse(fields)
+    
+    query = {} if current_user.role == UserRole.ADMIN else {"user_id": current_user.id}
+    orders_list, pagination = await paginate(db.orders, query, sparse_projection(shape, cursor or bool(after)),
+                                             page, limit, cursor, after, count)
+    # Legacy orders that no longer fit the model (e.g. a string shipping_address) are skipped
+    return FastJSONResponse({
+        "data": shape.dump_many(orders_list, skip_invalid=True),
+        "pagination": pagination
+    })
+
 @api_router.get("/orders/{order_id}", response_model=Order)
 async def get_order(order_id: str, current_user: User = Depends(get_current_user)):
-    order = await db.orders.find_one({"id": order_id}, {"_id": 0})
+    order = await db.orders.find_one({"id": order_id}, ORDER_SHAPE.projection)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
     if current_user.role != UserRole.ADMIN and order['user_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
+    return FastJSONResponse(ORDER_SHAPE.dump(order))
+
+# Order placement
+class InsufficientStock(Exception):
+    def __init__(self, product: dict):
+        super().__init__(product["id"])
+        self.product = product
+
+def _merge_order_quantities(items: List[OrderItem]) -> dict:
+    """product_id -> total quantity, in first-seen order"""
+    quantities = {}
+    for item in items:
+        if item.quantity <= 0:
+            raise HTTPException(status_code=400, detail=f"Invalid quantity for product {item.product_id}")
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+async def reserve_stock(quantities: dict, products: dict, session=None):
+    """Decrement stock for every product, only where enough is left.
+
+    Each $inc is conditional on stock >= quantity, so concurrent orders can
+    never push stock below zero. If any product is short, the reservations
+    already made are released and InsufficientStock is raised.
+    """
+    reserved = []
+    try:
+        for product_id, quantity in quantities.items():
+            result = await db.products.update_one(
+                {"id": product_id, "stock": {"$gte": quantity}},
+                {"$inc": {"stock": -quantity}},
+                session=session
+            )
+            if result.modified_count == 0:
+                raise InsufficientStock(products[product_id])
+            reserved.append(product_id)
+    except BaseException:
+        if session is None:
+            await release_stock({pid: quantities[pid] for pid in reserved})
+        raise
+
+async def release_stock(quantities: dict, session=None):
+    """Give reserved stock back (failed placements and cancelled orders)"""
+    if not quantities:
+        return
+    await db.products.bulk_write(
+        [UpdateOne({"id": product_id}, {"$inc": {"stock": quantity}}) for product_id, quantity in quantities.items()],
+        ordered=False,
+        session=session
+    )
+
+def _order_quantities(order: dict) -> dict:
+    quantities = {}
+    for item in order.get("items", []):
+        quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+    return quantities
+
+async def place_order(user_id: str, items: List[OrderItem], shipping_address: AddressInfo,
+                      order_id: Optional[str] = None,
+                      before_reserve: Optional[Callable[[], Awaitable[None]]] = None) -> Order:
+    """Price an order from the catalog, reserve its stock and store it.
+
+    Client-supplied prices, names and totals are ignored: all products are
+    read with one $in query and the order is built from their current
+    values. Stock is reserved before the insert and released again if the
+    insert fails (or the whole thing runs in a transaction when
+    ORDER_TRANSACTIONS is enabled). before_reserve is awaited right before
+    any stock is touched and may raise to abort the placement.
+    """
+    quantities = _merge_order_quantities(items)
+    if not quantities:
+        raise HTTPException(status_code=400, detail="Order has no items")
+    products = {
+        p["id"]: p
+        for p in await db.products.find(
+            {"id": {"$in": list(quantities)}}, {"_id": 0, "id": 1, "name": 1, "price": 1}
+        ).to_list(len(quantities))
+    }
+    missing = [product_id for product_id in quantities if product_id not in products]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Products not found: {', '.join(missing)}")
+    
+    order_items = [
+        OrderItem(product_id=product_id, product_name=products[product_id]["name"],
+                  quantity=quantity, price=products[product_id]["price"])
+        for product_id, quantity in quantities.items()
+    ]
+    order = Order(
+        id=order_id or str(uuid.uuid4()),
+        user_id=user_id,
+        items=order_items,
+        total=round(sum(item.price * item.quantity for item in order_items), 2),
+        shipping_address=shipping_address
+    )
+    order_dict = order.model_dump()
+    order_dict['stock_reserved'] = True
+    if before_reserve is not None:
+        await before_reserve()
+    
+    try:
+        if ORDER_TRANSACTIONS:
+            async def reserve_and_insert(session):
+                await reserve_stock(quantities, products, session=session)
+                await db.orders.insert_one(order_dict, session=session)
+            
+            # with_transaction retries the whole callback on TransientTransactionError
+            # (write conflicts between buyers of the same product) and retries the commit
+            async with await client.start_session() as session:
+                await session.with_transaction(reserve_and_insert)
+        else:
+            await reserve_stock(quantities, products)
+            try:
+                await db.orders.insert_one(order_dict)
+            except BaseException:
+                await release_stock(quantities)
+                raise
+    except InsufficientStock as e:
+        raise HTTPException(status_code=409, detail=f"Insufficient stock for {e.product['name']}")
+    
+    await response_cache.invalidate("products", *(f"product:{product_id}" for product_id in quantities))
+    await record_order_rollups(order_dict)
+    return order
+
+# Idempotent order submission
+# idempotency_keys {"id": "<user_id>:<key>", "request_hash", "status": "in_progress" | "completed",
+#                   "order_id", "owner", "created_at", "locked_at"}; created_at carries the TTL index.
+# owner changes on every takeover, so a stalled worker can tell it lost the claim
+idempotency_cache = TTLCache(10000, IDEMPOTENCY_TTL_SECONDS)
+_idempotent_requests = {}
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+async def _load_order(order_id: str) -> Optional[Order]:
+    order = await db.orders.find_one({"id": order_id}, {"_id": 0})
+    if not order:
+        return None
     if isinstance(order['created_at'], str):
         order['created_at'] = datetime.fromisoformat(order['created_at'])
     return Order(**order)
 
-@api_router.post("/orders", response_model=Order)
-async def create_order(order_data: OrderCreate, current_user: User = Depends(get_current_user)):
-    order = Order(
-        user_id=current_user.id,
-        items=order_data.items,
-        total=order_data.total,
-        shipping_address=order_data.shipping_address
+class IdempotencyClaimLost(Exception):
+    """Another worker took over the idempotency claim while this one was stalled"""
+
+async def _claim_idempotency_key(record_id: str, request_hash: str) -> dict:
+    """Insert the in-progress record for record_id, or return the record that already owns it.
+
+    Returns {"claimed": bool, "order_id": ..., "owner": ...}. Waits while another
+    worker holds a fresh claim, and takes over a claim older than IDEMPOTENCY_LOCK_SECONDS.
+    """
+    deadline = time.monotonic() + IDEMPOTENCY_LOCK_SECONDS
+    owner = str(uuid.uuid4())
+    while True:
+        now = datetime.now(timezone.utc)
+        order_id = str(uuid.uuid4())
+        try:
+            await db.idempotency_keys.insert_one({
+                "id": record_id, "request_hash": request_hash, "status": "in_progress",
+                "order_id": order_id, "owner": owner, "created_at": now, "locked_at": now,
+            })
+            return {"claimed": True, "order_id": order_id, "owner": owner}
+        except DuplicateKeyError:
+            existing = await db.idempotency_keys.find_one({"id": record_id}, {"_id": 0})
+        if existing is None:
+            continue  # expired or released in between
+        if existing["request_hash"] != request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if existing["status"] == "completed":
+            return {"claimed": False, "order_id": existing["order_id"], "owner": None}
+        if now - _as_utc(existing["locked_at"]) > timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS):
+            taken = await db.idempotency_keys.find_one_and_update(
+                {"id": record_id, "status": "in_progress", "locked_at": existing["locked_at"]},
+                {"$set": {"locked_at": now, "owner": owner}}
+            )
+            if taken:
+                return {"claimed": True, "order_id": existing["order_id"], "owner": owner}
+            continue
+        if time.monotonic() > deadline:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        await asyncio.sleep(0.1)
+
+async def _refresh_idempotency_claim(record_id: str, owner: str):
+    """Renew the claim right before stock is reserved; raises IdempotencyClaimLost if it was taken over"""
+    renewed = await db.idempotency_keys.find_one_and_update(
+        {"id": record_id, "owner": owner, "status": "in_progress"},
+        {"$set": {"locked_at": datetime.now(timezone.utc)}}
     )
+    if renewed is None:
+        raise IdempotencyClaimLost(record_id)
+
+async def _place_order_once(record_id: str, request_hash: str, user_id: str, order_data: OrderCreate) -> Order:
+    while True:
+        claim = await _claim_idempotency_key(record_id, request_hash)
+        # A taken-over claim may belong to a worker that stored the order before dying
+        order = await _load_order(claim["order_id"])
+        if order is not None:
+            break
+        if not claim["claimed"]:
+            raise HTTPException(status_code=409, detail="The order for this Idempotency-Key no longer exists")
+        try:
+            order = await place_order(
+                user_id, order_data.items, order_data.shipping_address, order_id=claim["order_id"],
+                before_reserve=lambda: _refresh_idempotency_claim(record_id, claim["owner"])
+            )
+            break
+        except IdempotencyClaimLost:
+            # A retry took over while this worker was stalled; wait for its result instead
+            continue
+        except DuplicateKeyError:
+            # The worker that took over (or the one taken over from) stored the order
+            # first; our reservation was released, answer with the stored order
+            order = await _load_order(claim["order_id"])
+            if order is None:
+                raise
+            break
+        except BaseException:
+            # Nothing was stored, let the client retry with the same key
+            await db.idempotency_keys.delete_one({"id": record_id, "owner": claim["owner"]})
+            raise
+    await db.idempotency_keys.update_one(
+        {"id": record_id, "order_id": claim["order_id"]},
+        {"$set": {"status": "completed"}}
+    )
+    idempotency_cache.set(record_id, (request_hash, order))
+    return order
+
+async def place_order_idempotent(user_id: str, key: str, order_data: OrderCreate) -> Order:
+    """Place an order at most once per (user, Idempotency-Key).
+
+    Retries are answered from an in-process cache, concurrent duplicates in
+    this process share one attempt, and the idempotency_keys collection
+    collapses duplicates across workers.
+    """
+    record_id = f"{user_id}:{key}"
+    request_hash = hashlib.sha256(order_data.model_dump_json().encode()).hexdigest()
+    cached = idempotency_cache.get(record_id)
+    if cached is None:
+        inflight_hash, inflight = _idempotent_requests.get(record_id, (request_hash, None))
+        if inflight_hash != request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if inflight is None:
+            inflight = asyncio.ensure_future(_place_order_once(record_id, request_hash, user_id, order_data))
+            _idempotent_requests[record_id] = (request_hash, inflight)
+            inflight.add_done_callback(lambda _: _idempotent_requests.pop(record_id, None))
+        return await asyncio.shield(inflight)
     
-    order_dict = order.model_dump()
-    order_dict['created_at'] = order_dict['created_at'].isoformat()
-    await db.orders.insert_one(order_dict)
-    
+    cached_hash, order = cached
+    if cached_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
     return order
 
+@api_router.post("/orders", response_model=Order)
+async def create_order(
+    order_data: OrderCreate,
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+):
+    if idempotency_key:
+        return await place_order_idempotent(current_user.id, idempotency_key, order_data)
+    return await place_order(current_user.id, order_data.items, order_data.shipping_address)
+
 @api_router.put("/orders/{order_id}/status", response_model=Order)
 async def update_order_status(order_id: str, status_update: OrderStatusUpdate, admin: User = Depends(require_admin)):
-    result = await db.orders.update_one(
+    # Return the previous document so the status rollup can move the order
+    # out of the status it actually had, even under concurrent updates
+    previous = await db.orders.find_one_and_update(
         {"id": order_id},
-        {"$set": {"status": status_update.status}}
+        {"$set": {"status": status_update.status}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
     )
-    if result.matched_count == 0:
+    if not previous:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    updated = await db.orders.find_one({"id": order_id}, {"_id": 0})
-    if not updated:
-        raise HTTPException(status_code=404, detail="Order not found")
+    # Cancelling returns the reserved stock; reopening a cancelled order reserves it again
+    was_cancelled = previous.get('status') == OrderStatus.CANCELLED.value
+    is_cancelled = status_update.status == OrderStatus.CANCELLED
+    if previous.get('stock_reserved') and not was_cancelled and is_cancelled:
+        await release_stock(_order_quantities(previous))
+    elif previous.get('stock_reserved') and was_cancelled and not is_cancelled:
+        quantities = _order_quantities(previous)
+        try:
+            await reserve_stock(quantities, {item["product_id"]: {"id": item["product_id"], "name": item["product_name"]}
+                                             for item in previous["items"]})
+        except InsufficientStock as e:
+            # Put the order back to cancelled, unless its status was changed again meanwhile;
+            # then the reopening stands in the rollups and the later change owns the order
+            reverted = await db.orders.update_one(
+                {"id": order_id, "status": status_update.status},
+                {"$set": {"status": OrderStatus.CANCELLED.value}}
+            )
+            if reverted.modified_count == 0:
+                await record_status_change_rollups(previous.get('status'), status_update.status)
+            raise HTTPException(status_code=409, detail=f"Insufficient stock for {e.product['name']}")
+    if was_cancelled != is_cancelled and previous.get('stock_reserved'):
+        await response_cache.invalidate("products", *(f"product:{item['product_id']}" for item in previous["items"]))
+    await record_status_change_rollups(previous.get('status'), status_update.status)
+
+    updated = {**previous, "status": status_update.status}
     if isinstance(updated['created_at'], str):
         updated['created_at'] = datetime.fromisoformat(updated['created_at'])
     return Order(**updated)
 
 # User Management (Admin)
 @api_router.get("/users")
-async def get_users(admin: User = Depends(require_admin), page: int = 1, limit: int = 12):
+async def get_users(admin: User = Depends(require_admin), page: int = 1, limit: int = 12,
+                    cursor: bool = False, after: Optional[str] = None, count: str = "exact"):
     page = max(1, page)
-    limit = min(limit, 100)
-    skip = (page - 1) * limit
+    limit = max(1, min(limit, 100))
     
-    total_count = await db.users.count_documents({})
-    users = await db.users.find({}, {"_id": 0, "password": 0}).skip(skip).limit(limit).to_list(limit)
-    for user in users:
-        if isinstance(user['created_at'], str):
-            user['created_at'] = datetime.fromisoformat(user['created_at'])
-    
-    return {
-        "data": [User(**u) for u in users],
-        "pagination": {
-            "total": total_count,
-            "page": page,
-            "limit": limit,
-            "pages": (total_count + limit - 1) // limit
-        }
-    }
+    users, pagination = await paginate(db.users, {}, USER_SHAPE.projection, page, limit, cursor, after, count)
+    return FastJSONResponse({
+        "data": USER_SHAPE.dump_many(users),
+        "pagination": pagination
+    })
 
 # Analytics (Admin)
-@api_router.get("/analytics")
-async def get_analytics(admin: User = Depends(require_admin)):
+async def _analytics_from_scan() -> dict:
+    """Original implementation: load the orders and aggregate them in Python"""
     total_users = await db.users.count_documents({})
     total_products = await db.products.count_documents({})
     total_orders = await db.orders.count_documents({})
@@ -1005,16 +3249,448 @@ async def get_analytics(admin: User = Depends(require_admin)):
         "top_products": top_product_details
     }
 
+async def _analytics_from_rollups() -> dict:
+    """Answer the dashboard from the rollup collections in constant time"""
+    total_users = await db.users.count_documents({})
+    total_products = await db.products.count_documents({})
+
+    totals = await db.analytics_totals.find_one({"id": ANALYTICS_TOTALS_ID}, {"_id": 0}) or {}
+
+    # Rollups are per UTC day, so the 30/7 day windows start at midnight
+    now = datetime.now(timezone.utc)
+    thirty_days_key = (now - timedelta(days=30)).strftime('%Y-%m-%d')
+    seven_days_key = (now - timedelta(days=7)).strftime('%Y-%m-%d')
+    days = await db.analytics_daily.find(
+        {"id": {"$gte": thirty_days_key}}, {"_id": 0}
+    ).to_list(31)
+    recent_sales = sum(day['sales'] for day in days)
+    daily_sales = {day['id']: day['sales'] for day in days if day['id'] >= seven_days_key}
+
+    statuses = await db.analytics_status.find({"count": {"$gt": 0}}, {"_id": 0}).to_list(len(OrderStatus))
+    status_breakdown = {s['id']: s['count'] for s in statuses}
+
+    top = await db.analytics_products.find({}, {"_id": 0}).sort("quantity", -1).limit(5).to_list(5)
+    names = {}
+    if top:
+        products = await db.products.find(
+            {"id": {"$in": [t['id'] for t in top]}}, {"_id": 0, "id": 1, "name": 1}
+        ).to_list(len(top))
+        names = {p['id']: p.get('name', 'Unknown') for p in products}
+    top_product_details = [
+        {"name": names[t['id']], "quantity": t['quantity']}
+        for t in top if t['id'] in names
+    ]
+
+    return {
+        "total_users": total_users,
+        "total_products": total_products,
+        "total_orders": totals.get('orders', 0),
+        "total_sales": totals.get('sales', 0),
+        "recent_sales": recent_sales,  # Sales in last 30 days
+        "status_breakdown": status_breakdown,
+        "daily_sales": daily_sales,
+        "top_products": top_product_details
+    }
+
+async def _analytics_from_pipeline() -> dict:
+    """Compute the dashboard in one MongoDB aggregation so no orders cross the wire"""
+    total_users = await db.users.count_documents({})
+    total_products = await db.products.count_documents({})
+
+    now = datetime.now(timezone.utc)
+    thirty_days_ago = now - timedelta(days=30)
+    seven_days_ago = now - timedelta(days=7)
+
+    # The date windows run as their own pipeline: a leading $match can use
+    # the orders created_at index, a $facet sub-pipeline never does
+    recent_pipeline = [
+        {"$match": created_since(thirty_days_ago)},
+        {"$facet": {
+            "recent": [
+                {"$group": {"_id": None, "sales": {"$sum": "$total"}}},
+            ],
+            "daily": [
+                {"$match": created_since(seven_days_ago)},
+                {"$group": {"_id": day_key_expression("$created_at"), "sales": {"$sum": "$total"}}},
+            ],
+        }}
+    ]
+    pipeline = [
+        {"$facet": {
+            "totals": [
+                {"$group": {"_id": None, "orders": {"$sum": 1}, "sales": {"$sum": "$total"}}},
+            ],
+            "status": [
+                {"$group": {"_id": {"$ifNull": ["$status", OrderStatus.PENDING.value]}, "count": {"$sum": 1}}},
+            ],
+            "top_products": [
+                {"$unwind": "$items"},
+                {"$group": {"_id": "$items.product_id", "quantity": {"$sum": "$items.quantity"}}},
+                {"$sort": {"quantity": -1}},
+                {"$limit": 5},
+                {"$lookup": {"from": "products", "localField": "_id", "foreignField": "id", "as": "product"}},
+                {"$unwind": "$product"},
+                {"$project": {"_id": 0, "name": {"$ifNull": ["$product.name", "Unknown"]}, "quantity": 1}},
+            ],
+        }}
+    ]
+    result, windows = await asyncio.gather(
+        db.orders.aggregate(pipeline).to_list(1),
+        db.orders.aggregate(recent_pipeline).to_list(1),
+    )
+    result, windows = result[0], windows[0]
+    totals = result["totals"][0] if result["totals"] else {}
+    recent = windows["recent"][0] if windows["recent"] else {}
+
+    return {
+        "total_users": total_users,
+        "total_products": total_products,
+        "total_orders": totals.get('orders', 0),
+        "total_sales": totals.get('sales', 0),
+        "recent_sales": recent.get('sales', 0),  # Sales in last 30 days
+        "status_breakdown": {s['_id']: s['count'] for s in result["status"]},
+        "daily_sales": {d['_id']: d['sales'] for d in sorted(windows["daily"], key=lambda d: d['_id'])},
+        "top_products": result["top_products"]
+    }
+
+@api_router.get("/analytics")
+async def get_analytics(admin: User = Depends(require_admin)):
+    if ANALYTICS_MODE == "scan":
+        return await _analytics_from_scan()
+    if ANALYTICS_MODE == "pipeline":
+        return await _analytics_from_pipeline()
+    return await _analytics_from_rollups()
+
+@api_router.post("/analytics/rebuild", status_code=202)
+async def rebuild_analytics(admin: User = Depends(require_admin)):
+    """Queue a rollup rebuild; follow it through /api/jobs/{id}"""
+    return await enqueue_job("rebuild_analytics", max_attempts=1)
+
+# Timestamp migration
+# Timestamps used to be written as ISO strings; they are now BSON dates. Every
+# reader accepts both, so migrate_dates.py can convert documents in batches
+# while the API keeps serving
+TIMESTAMP_FIELDS = {
+    "users": ["created_at"],
+    "categories": ["created_at"],
+    "products": ["created_at"],
+    "orders": ["created_at"],
+    "partners": ["created_at"],
+    "theme_settings": ["updated_at"],
+    "translations": ["updated_at"],
+    "password_resets": ["created_at"],
+    "import_jobs": ["created_at", "updated_at"],
+}
+
+async def migrate_timestamps(collection_name: str, fields: List[str], batch_size: int = 1000,
+                             pause_seconds: float = 0, dry_run: bool = False) -> dict:
+    """Convert ISO-string timestamps in one collection to BSON dates.
+
+    Walks the documents that still hold a string in _id order, so every
+    batch is a bounded index range and unparseable values are skipped
+    rather than revisited. Each update matches the old string as well, so
+    a document rewritten by the API in the meantime is left alone.
+    """
+    collection = db[collection_name]
+    summary = {"collection": collection_name, "converted": 0, "invalid": 0}
+    for field in fields:
+        last_id = None
+        while True:
+            query = {field: {"$type": "string"}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            docs = await collection.find(query, {field: 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            operations = []
+            for doc in docs:
+                try:
+                    value = _as_utc(datetime.fromisoformat(doc[field]))
+                except ValueError:
+                    summary["invalid"] += 1
+                    continue
+                operations.append(UpdateOne({"_id": doc["_id"], field: doc[field]}, {"$set": {field: value}}))
+            if operations and not dry_run:
+                result = await collection.bulk_write(operations, ordered=False)
+                summary["converted"] += result.modified_count
+            elif dry_run:
+                summary["converted"] += len(operations)
+            if pause_seconds:
+                await asyncio.sleep(pause_seconds)
+    summary["remaining"] = await collection.count_documents(
+        {"$or": [{field: {"$type": "string"}} for field in fields]})
+    return summary
+
+# Background jobs
+# jobs {"id", "type", "payload", "status": queued | running | succeeded | failed,
+#       "attempts", "max_attempts", "available_at", "worker", "last_error", "result",
+#       "created_at", "updated_at", "finished_at"}
+# available_at is when a queued job may run, or when a running job's lease expires
+JOB_HANDLERS = {}
+
+def job_handler(job_type: str):
+    """Register an async function(payload) -> result as the handler for job_type"""
+    def register(fn):
+        JOB_HANDLERS[job_type] = fn
+        return fn
+    return register
+
+async def enqueue_job(job_type: str, payload: Optional[dict] = None, max_attempts: int = JOB_MAX_ATTEMPTS,
+                      delay_seconds: float = 0) -> dict:
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+    now = datetime.now(timezone.utc)
+    job = {
+        "id": str(uuid.uuid4()),
+        "type": job_type,
+        "payload": payload or {},
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "available_at": now + timedelta(seconds=delay_seconds),
+        "worker": None,
+        "last_error": None,
+        "result": None,
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None,
+    }
+    await db.jobs.insert_one(job)
+    job.pop("_id", None)
+    if job_worker:
+        job_worker.wake()
+    return job
+
+def job_retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: base, 2x base, 4x base... capped at JOB_RETRY_MAX_SECONDS"""
+    delay = min(JOB_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)), JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+class JobWorker:
+    """Claims jobs from the jobs collection and runs up to concurrency of them at a time"""
+
+    def __init__(self, concurrency: int = JOB_WORKER_CONCURRENCY, poll_seconds: float = JOB_POLL_SECONDS,
+                 visibility_timeout: float = JOB_VISIBILITY_TIMEOUT_SECONDS):
+        self.concurrency = max(1, concurrency)
+        self.poll_seconds = poll_seconds
+        self.visibility_timeout = visibility_timeout
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._task = None
+        self._wakeup = None
+        self._running = set()
+        self.claimed = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+
+    async def claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await db.jobs.find_one_and_update(
+            {"status": {"$in": ["queued", "running"]}, "available_at": {"$lte": now}},
+            {
+                "$set": {"status": "running", "worker": self.worker_id, "updated_at": now,
+                         "available_at": now + timedelta(seconds=self.visibility_timeout)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            now = datetime.now(timezone.utc)
+            await db.jobs.update_one(
+                {"id": job_id, "worker": self.worker_id, "status": "running"},
+                {"$set": {"available_at": now + timedelta(seconds=self.visibility_timeout), "updated_at": now}}
+            )
+
+    async def _finish(self, job: dict, fields: dict):
+        now = datetime.now(timezone.utc)
+        # Only the current lease holder may record the outcome
+        await db.jobs.update_one(
+            {"id": job["id"], "worker": self.worker_id, "status": "running"},
+            {"$set": {**fields, "updated_at": now}}
+        )
+
+    async def run_job(self, job: dict):
+        self.claimed += 1
+        handler = JOB_HANDLERS.get(job["type"])
+        if job["attempts"] > job["max_attempts"]:
+            # Its lease expired on the last attempt, typically a worker crash
+            self.failed += 1
+            await self._finish(job, {"status": "failed", "finished_at": datetime.now(timezone.utc),
+                                     "last_error": job.get("last_error") or "Visibility timeout exceeded"})
+            return
+        if handler is None:
+            self.failed += 1
+            await self._finish(job, {"status": "failed", "finished_at": datetime.now(timezone.utc),
+                                     "last_error": f"No handler for job type {job['type']}"})
+            return
+        
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        try:
+            result = await handler(job["payload"])
+        except Exception as e:
+            error = f"{type(e).__name__}: {getattr(e, 'detail', None) or e}"
+            if job["attempts"] < job["max_attempts"]:
+                delay = job_retry_delay(job["attempts"])
+                self.retried += 1
+                logger.warning(f"Job {job['id']} ({job['type']}) attempt {job['attempts']} failed, retrying in {delay:.0f}s: {error}")
+                await self._finish(job, {"status": "queued", "last_error": error,
+                                         "available_at": datetime.now(timezone.utc) + timedelta(seconds=delay)})
+            else:
+                self.failed += 1
+                logger.error(f"Job {job['id']} ({job['type']}) failed after {job['attempts']} attempts: {error}")
+                await self._finish(job, {"status": "failed", "last_error": error,
+                                         "finished_at": datetime.now(timezone.utc)})
+        else:
+            self.succeeded += 1
+            await self._finish(job, {"status": "succeeded", "result": result,
+                                     "finished_at": datetime.now(timezone.utc)})
+        finally:
+            heartbeat.cancel()
+
+    async def run(self):
+        logger.info(f"Job worker {self.worker_id} started ({self.concurrency} concurrent jobs)")
+        while True:
+            try:
+                if len(self._running) >= self.concurrency:
+                    await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                job = await self.claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker could not claim a job: {e}")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self.run_job(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    def wake(self):
+        """Skip the rest of the poll interval; called when a job is enqueued in this process"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self, timeout: float = JOB_SHUTDOWN_TIMEOUT_SECONDS):
+        """Stop claiming and give the jobs in progress timeout seconds to finish.
+
+        Jobs still running after that are cancelled. They keep their lease,
+        so another worker (or this one after a restart) runs them again once
+        it expires.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._running:
+            _, pending = await asyncio.wait(set(self._running), timeout=timeout)
+            if pending:
+                logger.warning(f"Cancelling {len(pending)} jobs still running after {timeout:g}s")
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "running": len(self._running),
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+job_worker: Optional[JobWorker] = None
+
+@job_handler("rebuild_analytics")
+async def _rebuild_analytics_job(payload: dict) -> dict:
+    return await rebuild_analytics_rollups()
+
+@job_handler("product_import")
+async def _product_import_job(payload: dict) -> dict:
+    import_job = await run_product_import(payload["import_id"])
+    if import_job["status"] == "failed":
+        # Retried with backoff; the next attempt resumes from rows_processed
+        raise RuntimeError(import_job["error"])
+    return {field: import_job[field] for field in ("id", "status", "rows_processed", "inserted", "updated", "failed")}
+
+@api_router.get("/jobs")
+async def get_jobs(status: Optional[str] = None, type: Optional[str] = None, limit: int = 50,
+                   admin: User = Depends(require_admin)):
+    query = {}
+    if status:
+        query["status"] = status
+    if type:
+        query["type"] = type
+    limit = max(1, min(limit, 200))
+    return await db.jobs.find(query, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(limit)
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str, admin: User = Depends(require_admin)):
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@api_router.post("/jobs/{job_id}/retry")
+async def retry_job(job_id: str, admin: User = Depends(require_admin)):
+    """Queue a failed job again with a fresh set of attempts"""
+    now = datetime.now(timezone.utc)
+    job = await db.jobs.find_one_and_update(
+        {"id": job_id, "status": "failed"},
+        {"$set": {"status": "queued", "attempts": 0, "available_at": now, "finished_at": None, "updated_at": now}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Failed job not found")
+    if job_worker:
+        job_worker.wake()
+    return job
+
+# Metrics (Admin)
+@api_router.get("/metrics")
+async def get_metrics(admin: User = Depends(require_admin)):
+    return {
+        "user_cache": user_cache.stats(),
+        "sftp_pool": sftp_pool.stats() if sftp_pool else None,
+        "image_cache": derived_image_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "translation_bundles": translation_bundles.stats(),
+        "job_worker": job_worker.stats() if job_worker else None,
+        "password_hasher": password_hasher.stats(),
+    }
+
 # Theme Settings Routes
 @api_router.get("/theme", response_model=ThemeSettings)
 async def get_theme():
-    theme = await db.theme_settings.find_one({"id": "theme_config"}, {"_id": 0})
-    if not theme:
-        # Return default theme
-        return ThemeSettings()
-    if isinstance(theme['updated_at'], str):
-        theme['updated_at'] = datetime.fromisoformat(theme['updated_at'])
-    return ThemeSettings(**theme)
+    async def load():
+        theme = await db.theme_settings.find_one({"id": "theme_config"}, {"_id": 0})
+        if not theme:
+            # Return default theme
+            return ThemeSettings()
+        if isinstance(theme['updated_at'], str):
+            theme['updated_at'] = datetime.fromisoformat(theme['updated_at'])
+        return ThemeSettings(**theme)
+    
+    return await response_cache.cached("theme", {}, load)
 
 @api_router.put("/theme", response_model=ThemeSettings)
 async def update_theme(theme_data: ThemeSettingsUpdate, admin: User = Depends(require_admin)):
@@ -1030,13 +3706,14 @@ async def update_theme(theme_data: ThemeSettingsUpdate, admin: User = Depends(re
     if theme_data.border_radius:
         update_dict['border_radius'] = theme_data.border_radius
     
-    update_dict['updated_at'] = datetime.now(timezone.utc).isoformat()
+    update_dict['updated_at'] = datetime.now(timezone.utc)
     
     await db.theme_settings.update_one(
         {"id": "theme_config"},
         {"$set": update_dict},
         upsert=True
     )
+    await response_cache.invalidate("theme")
     
     updated = await db.theme_settings.find_one({"id": "theme_config"}, {"_id": 0})
     if isinstance(updated['updated_at'], str):
@@ -1047,8 +3724,11 @@ async def update_theme(theme_data: ThemeSettingsUpdate, admin: User = Depends(re
 @api_router.get("/partners")
 async def get_partners():
     """Get all partners"""
-    partners = await db.partners.find({}, {"_id": 0}).to_list(length=None)
-    return partners or []
+    async def load():
+        partners = await db.partners.find({}, {"_id": 0}).to_list(length=None)
+        return partners or []
+    
+    return await response_cache.cached("partners", {}, load)
 
 @api_router.post("/partners", response_model=Partner)
 async def create_partner(partner_data: PartnerCreate, admin: User = Depends(require_admin)):
@@ -1059,9 +3739,9 @@ async def create_partner(partner_data: PartnerCreate, admin: User = Depends(requ
     )
     
     partner_dict = partner.model_dump()
-    partner_dict['created_at'] = partner_dict['created_at'].isoformat()
     
     result = await db.partners.insert_one(partner_dict)
+    await response_cache.invalidate("partners")
     partner_dict['id'] = str(result.inserted_id) if hasattr(result, 'inserted_id') else partner.id
     
     return Partner(**partner_dict)
@@ -1073,12 +3753,216 @@ async def delete_partner(partner_id: str, admin: User = Depends(require_admin)):
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Partner not found")
+    await response_cache.invalidate("partners")
     
     return {"message": "Partner deleted successfully"}
 
+# Image variants
+def _image_output_formats() -> List[str]:
+    """WebP always, AVIF when the installed Pillow was built with it"""
+    formats = ["webp"]
+    try:
+        from PIL import features
+        if features.check("avif"):
+            formats.append("avif")
+    except Exception:
+        pass
+    return formats
+
+def generate_image_variants(source_path: str, output_dir: str, stem: str) -> dict:
+    """Write thumb/card/detail variants of an image and return their file names.
+
+    Runs in the image process pool, so it must stay a plain top-level function.
+    Images are never upscaled: a variant wider than the original is encoded
+    at the original size.
+    """
+    from PIL import Image, ImageOps
+
+    variants = {}
+    formats = _image_output_formats()
+    with Image.open(source_path) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ("RGB", "RGBA"):
+            original = original.convert("RGBA" if "transparency" in original.info or original.mode in ("LA", "PA") else "RGB")
+        for variant, max_width in IMAGE_VARIANT_WIDTHS.items():
+            image = original.copy()
+            image.thumbnail((max_width, max_width * 4), Image.LANCZOS)
+            variants[variant] = {"width": image.width, "height": image.height}
+            for fmt in formats:
+                file_name = f"{stem}-{variant}.{fmt}"
+                image.save(Path(output_dir) / file_name, fmt.upper(), **IMAGE_VARIANT_SAVE_OPTIONS[fmt])
+                variants[variant][fmt] = file_name
+    return variants
+
+def render_image_variant(source_path: str, destination: str, width: Optional[int], height: Optional[int],
+                         fmt: str, quality: int) -> int:
+    """Resize/transcode one image to destination and return its size in bytes.
+
+    Runs in the image process pool. The result is written to a temporary
+    name first so readers never see a half-written file.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if width or height:
+            image.thumbnail((width or IMAGE_MAX_DIMENSION, height or IMAGE_MAX_DIMENSION), Image.LANCZOS)
+        if fmt == "jpeg" and image.mode != "RGB":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        options = {**IMAGE_VARIANT_SAVE_OPTIONS.get(fmt, {}), "quality": quality}
+        temporary = f"{destination}.{os.getpid()}.tmp"
+        image.save(temporary, fmt.upper(), **options)
+    os.replace(temporary, destination)
+    return os.path.getsize(destination)
+
+
+class DerivedImageCache:
+    """Disk cache of resized images with size-bounded LRU eviction.
+
+    Entries are addressed by a hash of the source file identity (name, size,
+    mtime) and the requested parameters, so a changed source never serves a
+    stale variant. Hits refresh the entry's atime, which is the LRU clock
+    (mtime is left alone so ETag/Last-Modified stay stable).
+    Concurrent requests for the same missing variant share one encode.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes = None  # path -> size, loaded lazily from disk
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.evictions = 0
+
+    def _load(self):
+        if self._sizes is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._sizes = {
+                path: path.stat().st_size
+                for path in self.directory.glob('*/*')
+                if not path.name.endswith('.tmp')
+            }
+
+    def path_for(self, source: Path, params: tuple, fmt: str) -> Path:
+        stat = source.stat()
+        digest = hashlib.sha256(f"{source.name}:{stat.st_size}:{stat.st_mtime_ns}:{params}".encode()).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.{fmt}"
+
+    async def get(self, source: Path, width: Optional[int], height: Optional[int], fmt: str, quality: int) -> Path:
+        self._load()
+        path = self.path_for(source, (width, height, fmt, quality), fmt)
+        if path in self._sizes and path.exists():
+            self.hits += 1
+            os.utime(path, ns=(time.time_ns(), path.stat().st_mtime_ns))
+            return path
+
+        self.misses += 1
+        inflight = self._inflight.get(path)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._render(source, path, width, height, fmt, quality))
+            self._inflight[path] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(path, None))
+        await asyncio.shield(inflight)
+        return path
+
+    async def _render(self, source: Path, path: Path, width, height, fmt: str, quality: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.renders += 1
+        loop = asyncio.get_running_loop()
+        size = await loop.run_in_executor(
+            get_image_executor(), render_image_variant, str(source), str(path), width, height, fmt, quality
+        )
+        self._sizes[path] = size
+        if sum(self._sizes.values()) > self.max_bytes:
+            await asyncio.to_thread(self._evict, keep=path)
+
+    def _evict(self, keep: Path):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for path in list(self._sizes):
+            try:
+                entries.append((path.stat().st_atime, path))
+            except FileNotFoundError:
+                self._sizes.pop(path, None)
+        total = sum(self._sizes.values())
+        for _, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            total -= self._sizes.pop(path, 0)
+            path.unlink(missing_ok=True)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._sizes or {}),
+            "bytes": sum((self._sizes or {}).values()),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "renders": self.renders,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+        }
+
+derived_image_cache = DerivedImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
+
+image_executor: Optional[ProcessPoolExecutor] = None
+
+def get_image_executor() -> ProcessPoolExecutor:
+    global image_executor
+    if image_executor is None:
+        # spawn rather than fork: the API process runs threads (SFTP, motor)
+        image_executor = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return image_executor
+
+def _is_resizable_image(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith("image/") and content_type not in ("image/svg+xml", "image/gif")
+
+def _srcset(variants: dict, urls: dict) -> dict:
+    """Build {"webp": "url 160w, url 480w, ...", ...} from the variant map"""
+    formats = {fmt for v in variants.values() for fmt in v if fmt not in ("width", "height")}
+    return {
+        fmt: ", ".join(f"{urls[v[fmt]]} {v['width']}w" for v in variants.values() if fmt in v)
+        for fmt in sorted(formats)
+    }
+
 # File Upload
+async def stream_upload_to_disk(file: UploadFile, destination: Path, max_bytes: int = UPLOAD_MAX_BYTES) -> int:
+    """Copy an upload to disk chunk by chunk, enforcing max_bytes as it goes.
+
+    Only one chunk is held in memory at a time. On any failure the partial
+    file is removed.
+    """
+    size = 0
+    try:
+        async with aiofiles.open(destination, 'wb') as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit"
+                    )
+                await f.write(chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+    return size
+
 @api_router.post("/upload")
-async def upload_file(file: UploadFile = File(...), admin: User = Depends(require_admin)):
+async def upload_file(request: Request, file: UploadFile = File(...), admin: User = Depends(require_admin)):
     try:
         logger.info(f"📸 [Upload] ===== NEW UPLOAD REQUEST =====")
         logger.info(f"📸 [Upload] Admin user: {admin.email}")
@@ -1087,43 +3971,61 @@ async def upload_file(file: UploadFile = File(...), admin: User = Depends(requir
             logger.warning("📸 [Upload] Invalid file - no filename")
             raise HTTPException(status_code=400, detail=ERROR_MESSAGES["INVALID_FILE"])
         
+        # Reject oversized requests before touching the body when the client declares its size
+        declared_size = int(request.headers.get('content-length') or 0)
+        if declared_size > UPLOAD_MAX_BYTES + 64 * 1024:  # allow for multipart framing
+            raise HTTPException(status_code=413, detail=f"File exceeds the {UPLOAD_MAX_BYTES // (1024 * 1024)} MB upload limit")
+        
         file_extension = file.filename.split('.')[-1]
         file_name = f"{uuid.uuid4()}.{file_extension}"
-        content = await file.read()
+        file_path = UPLOADS_DIR / file_name
+        partial_path = UPLOADS_DIR / f".{file_name}.part"
+        size = await stream_upload_to_disk(file, partial_path)
         
         logger.info(f"📸 [Upload] Original file: {file.filename}")
         logger.info(f"📸 [Upload] Generated name: {file_name}")
-        logger.info(f"📸 [Upload] File size: {len(content)} bytes ({len(content)/1024:.2f} KB)")
+        logger.info(f"📸 [Upload] File size: {size} bytes ({size/1024:.2f} KB)")
         logger.info(f"📸 [Upload] File type: {file.content_type}")
 
-        if _godaddy_configured():
-            logger.info(f"🚀 [Upload] GoDaddy SSH configured - attempting remote upload")
+        # Resize in the process pool so encoding never blocks the event loop
+        variants = {}
+        if _is_resizable_image(file.content_type):
             try:
-                # Try GoDaddy SSH upload first
-                file_url = await upload_file_to_godaddy(file_name, content)
-                logger.info(f"✅ [Upload] Successfully uploaded to GoDaddy SSH")
-                logger.info(f"🌐 [Upload] Public URL: {file_url}")
-            except Exception as ssh_error:
-                # Fallback to local storage if SSH fails
-                logger.error(f"❌ [Upload] GoDaddy SSH upload failed: {str(ssh_error)}")
-                logger.info(f"💾 [Upload] Falling back to local storage...")
-                file_path = UPLOADS_DIR / file_name
-                async with aiofiles.open(file_path, 'wb') as f:
-                    await f.write(content)
-                file_url = f"/api/uploads/{file_name}"
-                logger.info(f"✅ [Upload] Saved to local storage: {file_url}")
-        else:
-            # GoDaddy not configured, use local storage
-            logger.info(f"💾 [Upload] GoDaddy SSH not configured, using local storage")
-            file_path = UPLOADS_DIR / file_name
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
-            file_url = f"/api/uploads/{file_name}"
-            logger.info(f"✅ [Upload] Saved to local storage: {file_url}")
+                loop = asyncio.get_running_loop()
+                variants = await loop.run_in_executor(
+                    get_image_executor(), generate_image_variants,
+                    str(partial_path), str(UPLOADS_DIR), file_name.rsplit('.', 1)[0]
+                )
+                logger.info(f"🖼️ [Upload] Generated variants: {', '.join(variants)}")
+            except Exception as e:
+                logger.warning(f"⚠️ [Upload] Could not generate image variants: {e}")
+        variant_files = [v[fmt] for v in variants.values() for fmt in v if fmt not in ("width", "height")]
+
+        # Always serve from local storage first; the GoDaddy copy is made by a
+        # background job and /api/uploads redirects there once the local file is gone
+        partial_path.replace(file_path)
+        file_url = f"/api/uploads/{file_name}"
+        variant_urls = {name: f"/api/uploads/{name}" for name in variant_files}
+        logger.info(f"✅ [Upload] Saved to local storage: {file_url}")
+        
+        response = {"url": file_url}
+        if _godaddy_configured():
+            job = await enqueue_job("replicate_upload", {"file_names": [file_name, *variant_files]})
+            response["replication_job"] = job["id"]
+            logger.info(f"🚀 [Upload] GoDaddy replication queued as job {job['id']}")
         
         logger.info(f"🎉 [Upload] Upload complete! Returning URL: {file_url}")
         logger.info(f"📸 [Upload] ===== UPLOAD REQUEST COMPLETE =====")
-        return {"url": file_url}
+        if not variants:
+            return response
+        return {
+            **response,
+            "variants": {
+                name: {key: variant_urls.get(value, value) for key, value in variant.items()}
+                for name, variant in variants.items()
+            },
+            "srcset": _srcset(variants, variant_urls),
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -1131,16 +4033,178 @@ async def upload_file(file: UploadFile = File(...), admin: User = Depends(requir
         logger.error(f"❌ [Upload] Upload failed for {file_name_str}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to upload image")
 
+@job_handler("replicate_upload")
+async def _replicate_upload_job(payload: dict) -> dict:
+    """Copy uploaded files to GoDaddy; files already copied on an earlier attempt are skipped"""
+    replicated = {}
+    for name in payload["file_names"]:
+        if await db.upload_replicas.find_one({"id": name}):
+            continue
+        path = UPLOADS_DIR / name
+        if not path.is_file():
+            raise FileNotFoundError(f"{name} is no longer on local disk")
+        url = await upload_file_to_godaddy(name, path)
+        await db.upload_replicas.update_one(
+            {"id": name},
+            {"$set": {"url": url, "replicated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        replicated[name] = url
+    return {"replicated": replicated}
+
 # Include the router in the main app
 app.include_router(api_router)
 
 # Serve uploaded files - must be defined AFTER api_router is included
-@app.get("/api/uploads/{filename}")
-async def serve_upload(filename: str):
+class FileRangeResponse(Response):
+    """Send a byte range of a file, through sendfile when the server offers it"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: Path, start: int, length: int, full: bool, status_code: int = 200,
+                 headers: Optional[dict] = None, media_type: Optional[str] = None):
+        self.path = path
+        self.start = start
+        self.length = length
+        self.full = full
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers({**(headers or {}), "content-length": str(length)})
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if scope["method"].upper() == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif UPLOADS_SENDFILE and "http.response.zerocopy" in extensions:
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": file.fileno(),
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False,
+                })
+        elif UPLOADS_SENDFILE and self.full and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.start)
+                remaining = self.length
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+def _parse_byte_range(header: str, size: int):
+    """Return (start, end) for a single "bytes=" range, None to ignore the header, or raise ValueError if unsatisfiable"""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None  # multiple ranges may be answered with the full file
+    first, _, last = spec.strip().partition("-")
+    if not (first.isdigit() or not first) or not (last.isdigit() or not last) or not (first or last):
+        return None  # malformed, serve the full file
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def file_response(request: Request, path: Path, media_type: Optional[str] = None) -> Response:
+    """Serve a file with validators, long-lived caching, conditional requests and single byte ranges"""
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    etag = f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+    headers = {
+        "etag": etag,
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "cache-control": UPLOADS_CACHE_CONTROL,
+        "accept-ranges": "bytes",
+    }
+    media_type = media_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+            if int(stat_result.st_mtime) <= since.timestamp():
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() in (etag, headers["last-modified"])):
+        try:
+            byte_range = _parse_byte_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+        if byte_range:
+            start, end = byte_range
+            return FileRangeResponse(
+                path, start, end - start + 1, full=False, status_code=206,
+                headers={**headers, "content-range": f"bytes {start}-{end}/{size}"},
+                media_type=media_type
+            )
+
+    return FileRangeResponse(path, 0, size, full=True, headers=headers, media_type=media_type)
+
+IMAGE_RESIZE_FORMATS = {"webp": "webp", "avif": "avif", "jpeg": "jpeg", "jpg": "jpeg", "png": "png"}
+
+@app.api_route("/api/uploads/{filename}", methods=["GET", "HEAD"])
+async def serve_upload(
+    request: Request,
+    filename: str,
+    w: Optional[int] = None,
+    h: Optional[int] = None,
+    fmt: Optional[str] = None,
+    q: Optional[int] = None
+):
+    # Hidden entries are partial uploads and the derived image cache
+    if filename.startswith('.'):
+        raise HTTPException(status_code=404, detail="File not found")
     file_path = UPLOADS_DIR / filename
-    if not file_path.exists():
+    if not file_path.is_file():
+        # Local disk may be ephemeral; fall back to the replicated copy
+        replica = await db.upload_replicas.find_one({"id": filename}, {"_id": 0, "url": 1})
+        if replica:
+            return RedirectResponse(replica["url"], status_code=307)
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(file_path)
+    
+    if w or h or fmt or q:
+        source_format = file_path.suffix.lstrip('.').lower()
+        target = IMAGE_RESIZE_FORMATS.get((fmt or source_format).lower())
+        if target == "avif" and "avif" not in _image_output_formats():
+            target = "webp"
+        if target and source_format in IMAGE_RESIZE_FORMATS:
+            width = min(max(w, 16), IMAGE_MAX_DIMENSION) if w else None
+            height = min(max(h, 16), IMAGE_MAX_DIMENSION) if h else None
+            quality = min(max(q, 30), 95) if q else IMAGE_VARIANT_SAVE_OPTIONS.get(target, {}).get("quality", 85)
+            try:
+                variant_path = await derived_image_cache.get(file_path, width, height, target, quality)
+                return file_response(request, variant_path, media_type=f"image/{target}")
+            except Exception as e:
+                logger.warning(f"⚠️ [Images] Could not resize {filename}, serving original: {e}")
+    return file_response(request, file_path)
 
 # Configure logging
 logging.basicConfig(
@@ -1170,41 +4234,283 @@ async def debug_cors():
 async def preflight_handler(full_path: str):
     return {"status": "ok"}
 
+# Indexes
+# Declarative index specs, applied by manage_indexes.py. Index names are left
+# to MongoDB's default (keys joined with underscores) unless an index is
+# referred to by name, so indexes created by earlier releases are recognized
+INDEX_SPECS = {
+    "products": [
+        IndexModel("id", unique=True),
+        IndexModel("sku", unique=True, partialFilterExpression={"sku": {"$type": "string"}}),
+        IndexModel(KEYSET_SORT),
+        # Category listings: equality on category_id, then the keyset sort
+        IndexModel([("category_id", 1)] + KEYSET_SORT),
+        IndexModel([("search_name", "text"), ("search_body", "text")], name="products_search",
+                   weights={"search_name": 10, "search_body": 1}, default_language="none"),
+    ],
+    "categories": [
+        IndexModel("id", unique=True),
+        IndexModel(KEYSET_SORT),
+    ],
+    "translations": [
+        IndexModel("key", unique=True),
+        IndexModel("ref_id"),
+        IndexModel("rev"),
+        IndexModel([("key", "text"), ("ar", "text"), ("en", "text")]),
+    ],
+    "users": [
+        IndexModel("id", unique=True),
+        IndexModel("email", unique=True),
+        IndexModel(KEYSET_SORT),
+    ],
+    "orders": [
+        IndexModel("id", unique=True),
+        # (created_at, id) also serves created_at range queries such as the analytics windows
+        IndexModel(KEYSET_SORT),
+        # A customer's orders: equality on user_id, then the keyset sort
+        IndexModel([("user_id", 1)] + KEYSET_SORT),
+    ],
+    "partners": [
+        IndexModel("id", unique=True),
+    ],
+    # Reset tokens are valid for an hour
+    "password_resets": [
+        IndexModel("email", unique=True),
+        IndexModel("created_at", expireAfterSeconds=60 * 60),
+    ],
+    "counters": [
+        IndexModel("id", unique=True),
+    ],
+    # Idempotency keys expire IDEMPOTENCY_TTL_SECONDS after the first request
+    "idempotency_keys": [
+        IndexModel("id", unique=True),
+        IndexModel("created_at", expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS),
+    ],
+    # Finished jobs expire after JOB_RETENTION_SECONDS
+    "jobs": [
+        IndexModel("id", unique=True),
+        IndexModel([("status", 1), ("available_at", 1)]),
+        IndexModel("finished_at", expireAfterSeconds=JOB_RETENTION_SECONDS),
+    ],
+    "upload_replicas": [IndexModel("id", unique=True)],
+    "import_jobs": [IndexModel("id", unique=True)],
+    "analytics_daily": [IndexModel("id", unique=True)],
+    "analytics_status": [IndexModel("id", unique=True)],
+    "analytics_products": [
+        IndexModel("id", unique=True),
+        IndexModel([("quantity", -1)]),
+    ],
+    "analytics_totals": [IndexModel("id", unique=True)],
+    "theme_settings": [IndexModel("id", unique=True)],
+}
+
+_INDEX_OPTION_DEFAULTS = {"unique": False, "sparse": False, "expireAfterSeconds": None, "partialFilterExpression": None}
+
+def _plain(value):
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _is_text_index(index: dict) -> bool:
+    return "_fts" in index["key"] or "text" in index["key"].values()
+
+def _index_matches(existing: dict, spec: dict) -> bool:
+    if _is_text_index(spec):
+        # A text index is stored as {_fts, _ftsx} plus its weights
+        weights = spec.get("weights", {})
+        expected = {field: weights.get(field, 1) for field, kind in spec["key"].items() if kind == "text"}
+        if not _is_text_index(existing) or _plain(existing.get("weights", {})) != expected:
+            return False
+        if existing.get("default_language", "english") != spec.get("default_language", "english"):
+            return False
+    elif list(_plain(existing["key"]).items()) != list(_plain(spec["key"]).items()):
+        return False
+    return all(
+        _plain(existing.get(option, default)) == _plain(spec.get(option, default))
+        for option, default in _INDEX_OPTION_DEFAULTS.items()
+    )
+
+def _same_keys(existing: dict, spec: dict) -> bool:
+    # MongoDB refuses a second index on the same keys (or a second text index)
+    if _is_text_index(spec):
+        return _is_text_index(existing)
+    return list(_plain(existing["key"]).items()) == list(_plain(spec["key"]).items())
+
+async def _duplicate_values(collection, spec: dict, limit: int = 5) -> list:
+    """Key values held by more than one document, which would make a unique build fail"""
+    pipeline = [{"$match": spec["partialFilterExpression"]}] if spec.get("partialFilterExpression") else []
+    pipeline += [
+        {"$group": {"_id": {field: f"${field}" for field in spec["key"]}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": limit},
+    ]
+    return [d["_id"] async for d in collection.aggregate(pipeline, allowDiskUse=True)]
+
+async def reconcile_indexes(dry_run: bool = False, drop_extra: bool = False) -> List[dict]:
+    """Bring every collection's indexes in line with INDEX_SPECS.
+
+    Missing indexes are created; an index whose definition changed (or an
+    old index on the same keys under another name) is dropped and rebuilt.
+    A unique index is only built once no duplicate values are left, so an
+    existing non-unique index is never dropped for a build that would fail.
+    Indexes not in the spec are reported, and dropped with drop_extra.
+    Returns one {"collection", "index", "action", "detail"} row per index.
+    """
+    report = []
+    for name, specs in INDEX_SPECS.items():
+        collection = db[name]
+        existing = {index["name"]: index async for index in collection.list_indexes()}
+        wanted = set()
+        for model in specs:
+            spec = model.document
+            wanted.add(spec["name"])
+            current = existing.get(spec["name"])
+            if current and _index_matches(current, spec):
+                report.append({"collection": name, "index": spec["name"], "action": "ok", "detail": ""})
+                continue
+            conflicts = [ix for ix_name, ix in existing.items()
+                         if ix_name != "_id_" and (ix_name == spec["name"] or _same_keys(ix, spec))]
+            action = "rebuild" if conflicts else "create"
+            if dry_run:
+                report.append({"collection": name, "index": spec["name"], "action": action,
+                               "detail": ", ".join(ix["name"] for ix in conflicts)})
+                continue
+            if spec.get("unique"):
+                duplicates = await _duplicate_values(collection, spec)
+                if duplicates:
+                    report.append({"collection": name, "index": spec["name"], "action": "failed",
+                                   "detail": f"duplicate values, e.g. {duplicates}"})
+                    continue
+            try:
+                for index in conflicts:
+                    await collection.drop_index(index["name"])
+                    existing.pop(index["name"])
+                await collection.create_indexes([model])
+                report.append({"collection": name, "index": spec["name"], "action": {"create": "created", "rebuild": "rebuilt"}[action],
+                               "detail": ", ".join(ix["name"] for ix in conflicts)})
+            except OperationFailure as e:
+                report.append({"collection": name, "index": spec["name"], "action": "failed", "detail": str(e)})
+        for index_name in existing.keys() - wanted - {"_id_"}:
+            if drop_extra and not dry_run:
+                await collection.drop_index(index_name)
+                report.append({"collection": name, "index": index_name, "action": "dropped", "detail": ""})
+            else:
+                report.append({"collection": name, "index": index_name, "action": "extra", "detail": "not in INDEX_SPECS"})
+    return report
+
+def hot_queries() -> List[dict]:
+    """Representative filters and sorts of the busiest read paths, for explain_hot_queries"""
+    now = datetime.now(timezone.utc)
+    return [
+        {"name": "product list", "collection": "products", "filter": {}, "sort": KEYSET_SORT},
+        {"name": "products by category", "collection": "products", "filter": {"category_id": "sample"}, "sort": KEYSET_SORT},
+        {"name": "product by id", "collection": "products", "filter": {"id": "sample"}},
+        {"name": "product batch", "collection": "products", "filter": {"id": {"$in": ["a", "b", "c"]}}},
+        {"name": "category list", "collection": "categories", "filter": {}, "sort": KEYSET_SORT},
+        {"name": "customer orders", "collection": "orders", "filter": {"user_id": "sample"}, "sort": KEYSET_SORT},
+        {"name": "all orders", "collection": "orders", "filter": {}, "sort": KEYSET_SORT},
+        {"name": "order by id", "collection": "orders", "filter": {"id": "sample"}},
+        {"name": "orders last 30 days", "collection": "orders", "filter": created_since(now - timedelta(days=30))},
+        {"name": "login by email", "collection": "users", "filter": {"email": "sample@example.com"}},
+        {"name": "user by id", "collection": "users", "filter": {"id": "sample"}},
+        {"name": "translations by ref_id", "collection": "translations", "filter": {"ref_id": {"$in": ["a", "b"]}}},
+        {"name": "translations since rev", "collection": "translations", "filter": {"rev": {"$gt": 0}}},
+        {"name": "job claim", "collection": "jobs",
+         "filter": {"status": {"$in": ["queued", "running"]}, "available_at": {"$lte": now}}, "sort": [("available_at", 1)]},
+        {"name": "idempotency key", "collection": "idempotency_keys", "filter": {"id": "sample"}},
+    ]
+
+def _plan_stages(plan: dict, stages: list, indexes: list):
+    stages.append(plan.get("stage"))
+    if plan.get("indexName"):
+        indexes.append(plan["indexName"])
+    for child in [plan.get("inputStage"), plan.get("queryPlan"), *plan.get("inputStages", [])]:
+        if child:
+            _plan_stages(child, stages, indexes)
+
+async def explain_hot_queries(limit: int = 12) -> List[dict]:
+    """Winning plan of every hot query, flagging collection scans and in-memory sorts"""
+    report = []
+    for query in hot_queries():
+        cursor = db[query["collection"]].find(query["filter"], {"_id": 0}).limit(limit)
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+        stages, indexes = [], []
+        _plan_stages(plan, stages, indexes)
+        report.append({
+            "name": query["name"],
+            "collection": query["collection"],
+            "stages": [stage for stage in stages if stage],
+            "indexes": indexes,
+            "collection_scan": "COLLSCAN" in stages,
+            "in_memory_sort": "SORT" in stages,
+        })
+    return report
+
 @app.on_event("startup")
 async def startup():
     logger.info("Starting up application...")
     logger.info(f"Connecting to MongoDB at {mongo_url}")
     logger.info("Database connection successful")
     
-    # Create database indexes for performance
+    # Indexes are built by `python manage_indexes.py sync` (build.sh runs it
+    # on every deploy); every worker only lists them here and reports drift
     try:
-        # Products collection indexes
-        await db.products.create_index("id")
-        await db.products.create_index("category_id")
-        await db.products.create_index([("name", "text"), ("description", "text")])
-        logger.info("✓ Products indexes created")
-        
-        # Categories collection indexes
-        await db.categories.create_index("id")
-        logger.info("✓ Categories indexes created")
-        
-        # Translations collection indexes
-        await db.translations.create_index("key")
-        await db.translations.create_index("ref_id")
-        await db.translations.create_index([("key", "text"), ("ar", "text"), ("en", "text")])
-        logger.info("✓ Translations indexes created")
-        
-        # Users collection indexes
-        await db.users.create_index("email", unique=True)
-        logger.info("✓ Users indexes created")
-        
-        # Orders collection indexes
-        await db.orders.create_index("user_id")
-        await db.orders.create_index("id")
-        logger.info("✓ Orders indexes created")
+        drift = [r for r in await reconcile_indexes(dry_run=True) if r["action"] in ("create", "rebuild")]
+        if drift:
+            logger.warning(f"{len(drift)} indexes differ from INDEX_SPECS, run `python manage_indexes.py sync`: "
+                           + ", ".join(f"{r['collection']}.{r['index']} ({r['action']})" for r in drift))
     except Exception as e:
-        logger.warning(f"Index creation failed (may already exist): {e}")
+        logger.warning(f"Index check failed: {e}")
+
+    # Open the first SFTP session up front so the first upload skips the handshake
+    if _godaddy_configured():
+        try:
+            await asyncio.to_thread(get_sftp_pool().warm)
+        except Exception as e:
+            logger.warning(f"SFTP pool warm-up failed: {e}")
+
+    # Backfill search fields for products created before they existed
+    try:
+        backfilled = await refresh_product_search_fields()
+        if backfilled:
+            logger.info(f"✓ Search fields backfilled for {backfilled} products")
+    except Exception as e:
+        logger.warning(f"Search field backfill failed: {e}")
+
+    if SEARCH_MODE == "memory":
+        try:
+            await build_catalog_search_index()
+        except Exception as e:
+            logger.warning(f"Catalog search index build failed: {e}")
+
+    # Seed the analytics rollups the first time this database is used with them
+    if ANALYTICS_MODE == "rollup":
+        try:
+            if not await db.analytics_totals.find_one({"id": ANALYTICS_TOTALS_ID}):
+                logger.info("Analytics rollups missing, rebuilding from orders...")
+                await rebuild_analytics_rollups()
+        except AnalyticsRebuildRunning:
+            logger.info("Analytics rollups are being rebuilt by another worker")
+        except Exception as e:
+            logger.warning(f"Analytics rollup rebuild failed: {e}")
+
+    global job_worker
+    if JOB_WORKER_CONCURRENCY > 0 and job_worker is None:
+        job_worker = JobWorker()
+        job_worker.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if job_worker:
+        await job_worker.stop()
+    if sftp_pool:
+        await asyncio.to_thread(sftp_pool.close)
+    if image_executor:
+        image_executor.shutdown(wait=False, cancel_futures=True)
+    password_hasher.close()
+    await response_cache.close()
     client.close()
@@ -0,0 +1,33 @@
+"""
+Run the background job worker outside the API process.
+Set JOB_WORKER_CONCURRENCY=0 on the API servers so only dedicated
+workers claim jobs, then start one or more of these.
+
+Usage:
+    python worker.py [concurrency]
+"""
+
+import asyncio
+import signal
+import sys
+
+from server import JOB_WORKER_CONCURRENCY, JobWorker, client, logger
+
+
+async def main(concurrency: int):
+    worker = JobWorker(concurrency=concurrency)
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    worker.start()
+    await stopping.wait()
+    logger.info("Job worker stopping, waiting for running jobs...")
+    await worker.stop()
+    logger.info(f"Job worker stopped: {worker.stats()}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else max(JOB_WORKER_CONCURRENCY, 1)))
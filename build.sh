@@ -5,4 +5,7 @@ echo "Installing Python dependencies..."
 pip install --upgrade pip
 pip install -r requirements.txt
 
+echo "Reconciling MongoDB indexes..."
+(cd backend && python manage_indexes.py sync)
+
 echo "Build completed successfully!"
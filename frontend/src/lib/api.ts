@@ -45,15 +45,19 @@ export const authApi = {
 
 // Products API
 export const productsApi = {
-  getAll: (categoryId?: string, search?: string, page: number = 1, limit: number = 10) => {
+  getAll: (categoryId?: string, search?: string, page: number = 1, limit: number = 10, fields?: string[]) => {
     const params = new URLSearchParams();
     if (categoryId) params.append('category_id', categoryId);
     if (search) params.append('search', search);
     params.append('page', page.toString());
     params.append('limit', limit.toString());
+    if (fields?.length) params.append('fields', fields.join(','));
     return api.get(`/products?${params.toString()}`);
   },
   getById: (id: string) => api.get(`/products/${id}`),
+  // One request for many products: { data: [...in request order], missing: [ids] }
+  getBatch: (ids: string[], fields?: string[]) =>
+    api.post('/products/batch', { ids, fields: fields?.length ? fields.join(',') : undefined }),
   create: (data: any) => api.post('/products', data),
   update: (id: string, data: any) => api.put(`/products/${id}`, data),
   delete: (id: string) => api.delete(`/products/${id}`)
@@ -74,14 +78,16 @@ export const categoriesApi = {
 
 // Orders API
 export const ordersApi = {
-  getAll: (page: number = 1, limit: number = 10) => {
+  getAll: (page: number = 1, limit: number = 10, fields?: string[]) => {
     const params = new URLSearchParams();
     params.append('page', page.toString());
     params.append('limit', limit.toString());
+    if (fields?.length) params.append('fields', fields.join(','));
     return api.get(`/orders?${params.toString()}`);
   },
   getById: (id: string) => api.get(`/orders/${id}`),
-  create: (data: any) => api.post('/orders', data),
+  create: (data: any, idempotencyKey?: string) =>
+    api.post('/orders', data, { headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {} }),
   updateStatus: (id: string, status: string) => 
     api.put(`/orders/${id}/status`, { status })
 };
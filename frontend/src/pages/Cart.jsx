@@ -1,16 +1,33 @@
+import { useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
+import { useQuery } from '@tanstack/react-query';
 import { useTranslation } from 'react-i18next';
 import { Button } from '@/components/ui/button';
 import { Card } from '@/components/ui/card';
 import { Trash2, Plus, Minus } from 'lucide-react';
 import { useCartStore } from '@/store/cartStore';
+import { productsApi } from '@/lib/api';
 import { getImageUrl, getSizeForContext } from '@/lib/imageUtils';
 import OptimizedImage from '@/components/OptimizedImage';
 
 export default function Cart() {
   const { t } = useTranslation();
   const navigate = useNavigate();
-  const { items, removeItem, updateQuantity, totalPrice } = useCartStore();
+  const { items, removeItem, updateQuantity, totalPrice, syncProducts } = useCartStore();
+  const productIds = items.map(i => i.id);
+
+  // Prices and names in the persisted cart may be stale; refresh them in one batched request
+  const { data: freshProducts } = useQuery({
+    queryKey: ['cart-products', [...productIds].sort()],
+    queryFn: async () => (await productsApi.getBatch(productIds, ['id', 'name', 'price', 'image_url'])).data,
+    enabled: productIds.length > 0,
+  });
+
+  useEffect(() => {
+    if (freshProducts) {
+      syncProducts(freshProducts.data, freshProducts.missing);
+    }
+  }, [freshProducts, syncProducts]);
 
   if (items.length === 0) {
     return (
@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useRef, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import { useMutation } from '@tanstack/react-query';
@@ -40,6 +40,9 @@ export default function Checkout() {
     phone: ''
   });
 
+  // One key per checkout, so a retried submit returns the same order instead of placing a second one
+  const idempotencyKey = useRef(crypto.randomUUID());
+
   const createOrderMutation = useMutation({
     mutationFn: async () => {
       const orderData = {
@@ -52,7 +55,7 @@ export default function Checkout() {
         total: totalPrice(),
         shipping_address: shippingAddress
       };
-      return ordersApi.create(orderData);
+      return ordersApi.create(orderData, idempotencyKey.current);
     },
     onSuccess: () => {
       toast.success(t('checkout.orderSuccess'));
@@ -22,6 +22,8 @@ export default function Home() {
   const { toast } = useToast();
   const [currentPage, setCurrentPage] = useState(1);
   const PRODUCTS_PER_PAGE = 12;
+  // The featured grid only renders these, so skip descriptions and the rest
+  const PRODUCT_CARD_FIELDS = ['id', 'name', 'price', 'image_url', 'stock'];
 
   const { data: queryData = {} } = useQuery({
     queryKey: ['homepage-products', currentPage],
@@ -30,7 +32,8 @@ export default function Home() {
         undefined,
         undefined,
         currentPage,
-        PRODUCTS_PER_PAGE
+        PRODUCTS_PER_PAGE,
+        PRODUCT_CARD_FIELDS
       );
       
       // Handle both old array format and new paginated format
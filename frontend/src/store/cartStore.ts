@@ -15,6 +15,7 @@ interface CartStore {
   removeItem: (id: string) => void;
   updateQuantity: (id: string, quantity: number) => void;
   clearCart: () => void;
+  syncProducts: (products: Omit<CartItem, 'quantity'>[], missing: string[]) => void;
   totalItems: () => number;
   totalPrice: () => number;
 }
@@ -53,6 +54,15 @@ export const useCartStore = create<CartStore>()(persist(
       }
     },
     clearCart: () => set({ items: [] }),
+    syncProducts: (products, missing) => {
+      // Refresh persisted cart lines with current catalog data and drop deleted products
+      const current = new Map(products.map(p => [p.id, p]));
+      set({
+        items: get().items
+          .filter(i => !missing.includes(i.id))
+          .map(i => current.has(i.id) ? { ...i, ...current.get(i.id), quantity: i.quantity } : i)
+      });
+    },
     totalItems: () => get().items.reduce((sum, item) => sum + item.quantity, 0),
     totalPrice: () => get().items.reduce((sum, item) => sum + (item.price * item.quantity), 0)
   }),
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Analytics Rollup Test Script
+Checks rebuild_analytics_rollups against a throwaway database: drifted
+counters are corrected, an order placed and a status changed while the
+rebuild is scanning are each counted once, and a second rebuild is
+refused while the first holds the lock.
+
+Usage:
+    python test_analytics_rollups.py
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017
+    DB_NAME    defaults to analytics_rollups_test (dropped before and after the run)
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'analytics_rollups_test')
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+import server  # noqa: E402
+
+NOW = datetime.now(timezone.utc)
+
+
+def order(total, status="pending", product_id="p1", quantity=1, created_at=None):
+    return {"id": str(uuid.uuid4()), "total": total, "status": status,
+            "created_at": created_at or NOW - timedelta(hours=1),
+            "items": [{"product_id": product_id, "quantity": quantity}]}
+
+
+async def place(doc):
+    """Insert an order and count it, like place_order does"""
+    await server.db.orders.insert_one(dict(doc))
+    await server.record_order_rollups(doc)
+
+
+async def ship(order_id):
+    """Move an order to shipped, like update_order_status does"""
+    previous = await server.db.orders.find_one_and_update({"id": order_id}, {"$set": {"status": "shipped"}})
+    await server.record_status_change_rollups(previous["status"], "shipped")
+
+
+class DuringScan:
+    """Wraps server.db so `action` runs once, after the rebuild's snapshot and before its scan of orders"""
+
+    def __init__(self, database, action):
+        self.database = database
+        self.action = action
+
+    def __getattr__(self, name):
+        return getattr(self.database, name)
+
+    @property
+    def orders(self):
+        wrapper = self
+
+        class Orders:
+            def __getattr__(self, name):
+                return getattr(wrapper.database.orders, name)
+
+            def find(self, *args, **kwargs):
+                return Scan(wrapper, args, kwargs)
+
+        return Orders()
+
+
+class Scan:
+    """Defers the real find until iteration, so the action lands between snapshot and scan"""
+
+    def __init__(self, wrapper, args, kwargs):
+        self.wrapper, self.args, self.kwargs = wrapper, args, kwargs
+        self.size = None
+
+    def batch_size(self, size):
+        self.size = size
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        action, self.wrapper.action = self.wrapper.action, None
+        if action:
+            await action()
+        cursor = self.wrapper.database.orders.find(*self.args, **self.kwargs)
+        if self.size:
+            cursor = cursor.batch_size(self.size)
+        async for doc in cursor:
+            yield doc
+
+
+async def rebuild_during_scan(action):
+    database = server.db
+    server.db = DuringScan(database, action)
+    try:
+        await server.rebuild_analytics_rollups()
+    finally:
+        server.db = database
+
+
+async def rollups():
+    totals = await server.db.analytics_totals.find_one({"id": server.ANALYTICS_TOTALS_ID}) or {}
+    statuses = {d["id"]: d["count"] async for d in server.db.analytics_status.find({})}
+    products = {d["id"]: d["quantity"] async for d in server.db.analytics_products.find({})}
+    return totals.get("orders"), totals.get("sales"), statuses, products
+
+
+async def main():
+    print("=" * 60)
+    print("Analytics Rollup Test")
+    print("=" * 60)
+    await server.client.drop_database(server.db.name)
+    await server.reconcile_indexes()
+    failures = 0
+
+    print("\n[1/4] A rebuild corrects counters that drifted from the orders...")
+    for doc in (order(10.0), order(20.0, "shipped", "p2", 2), order(5.0, "shipped")):
+        await place(doc)
+    await server.db.orders.insert_one(order(7.0, product_id="p3"))  # crashed before its rollup
+    await server.db.analytics_status.update_one({"id": "cancelled"}, {"$inc": {"count": 3}}, upsert=True)
+    await server.rebuild_analytics_rollups()
+    orders, sales, statuses, products = await rollups()
+    ok = (orders == 4 and sales == 42.0 and statuses == {"pending": 2, "shipped": 2}
+          and products == {"p1": 2, "p2": 2, "p3": 1})
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} orders={orders} sales={sales} statuses={statuses} products={products}")
+
+    print("\n[2/4] An order placed during the rebuild is kept...")
+    await rebuild_during_scan(lambda: place(order(100.0, product_id="p4", created_at=datetime.now(timezone.utc))))
+    orders, sales, statuses, products = await rollups()
+    ok = orders == 5 and sales == 142.0 and statuses["pending"] == 3 and products.get("p4") == 1
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} orders={orders} sales={sales} pending={statuses['pending']} p4={products.get('p4')}")
+
+    print("\n[3/4] A status change during the rebuild is counted once...")
+    pending = await server.db.orders.find_one({"status": "pending", "total": 10.0})
+    await rebuild_during_scan(lambda: ship(pending["id"]))
+    _, _, statuses, _ = await rollups()
+    ok = statuses == {"pending": 2, "shipped": 3}
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} statuses={statuses}")
+
+    print("\n[4/4] A second rebuild is refused while the lock is held...")
+    await server.db.counters.insert_one({"id": server.ANALYTICS_REBUILD_LOCK_ID,
+                                         "locked_until": NOW + timedelta(minutes=5)})
+    try:
+        await server.rebuild_analytics_rollups()
+        refused = False
+    except server.AnalyticsRebuildRunning:
+        refused = True
+    await server.db.counters.update_one({"id": server.ANALYTICS_REBUILD_LOCK_ID},
+                                        {"$set": {"locked_until": NOW - timedelta(minutes=5)}})
+    await server.rebuild_analytics_rollups()
+    orders, *_ = await rollups()
+    lock = await server.db.counters.find_one({"id": server.ANALYTICS_REBUILD_LOCK_ID})
+    _, _, statuses, _ = await rollups()
+    ok = refused and orders == 5 and statuses == {"pending": 2, "shipped": 3} and lock is None
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} refused={refused} after expiry={orders} orders, lock released={lock is None}")
+
+    await server.client.drop_database(server.db.name)
+    print("\n" + "=" * 60)
+    print("✓ All checks passed" if not failures else f"✗ {failures} check(s) failed")
+    print("=" * 60)
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Upload Serving Test Script
+Checks how the backend serves files from /api/uploads: Range header
+parsing, weak ETag comparison, and the 206 / 416 / 304 responses for a
+file in a temporary uploads directory. No database is needed.
+
+Usage:
+    python test_file_ranges.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+uploads_dir = tempfile.mkdtemp(prefix="uploads-test-")
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'file_ranges_test')
+os.environ['UPLOADS_DIR'] = uploads_dir
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import server  # noqa: E402
+
+SIZE = 1000
+
+
+def parse(header, size=SIZE):
+    try:
+        return server._parse_byte_range(header, size)
+    except ValueError:
+        return "416"
+
+
+def main():
+    print("=" * 60)
+    print("Upload Serving Test")
+    print("=" * 60)
+    failures = 0
+
+    print("\n[1/4] Range headers are parsed like RFC 9110 asks...")
+    cases = {
+        "bytes=0-99": (0, 99),
+        "bytes=900-": (900, 999),
+        "bytes=-100": (900, 999),
+        "bytes=-5000": (0, 999),
+        "bytes=990-5000": (990, 999),
+        "bytes=1000-": "416",
+        "bytes=50-10": "416",
+        "bytes=-0": "416",
+        "bytes=0-1,5-6": None,
+        "items=0-1": None,
+        "bytes=abc": None,
+        "bytes=-": None,
+    }
+    results = {header: parse(header) for header in cases}
+    wrong = {header: result for header, result in results.items() if result != cases[header]}
+    ok = not wrong and parse("bytes=-1", 0) == "416"
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} {len(cases) - len(wrong)}/{len(cases)} headers" + (f", wrong: {wrong}" if wrong else ""))
+
+    print("\n[2/4] If-None-Match uses the weak comparison...")
+    etag = '"3e8-1"'
+    checks = {
+        '"3e8-1"': True,
+        'W/"3e8-1"': True,
+        '"other", W/"3e8-1"': True,
+        '*': True,
+        '"3e8-2"': False,
+        '3e8-1': False,
+    }
+    wrong = {h: expected for h, expected in checks.items() if server._etag_matches(h, etag) != expected}
+    ok = not wrong
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} {len(checks) - len(wrong)}/{len(checks)} headers" + (f", wrong: {wrong}" if wrong else ""))
+
+    payload = bytes(range(256)) * 4
+    Path(uploads_dir, "sample.bin").write_bytes(payload)
+    client = TestClient(server.app)
+
+    print("\n[3/4] Byte ranges are answered with 206 or 416...")
+    full = client.get("/api/uploads/sample.bin")
+    partial = client.get("/api/uploads/sample.bin", headers={"Range": "bytes=10-19"})
+    suffix = client.get("/api/uploads/sample.bin", headers={"Range": "bytes=-4"})
+    beyond = client.get("/api/uploads/sample.bin", headers={"Range": "bytes=5000-"})
+    stale = client.get("/api/uploads/sample.bin", headers={"Range": "bytes=10-19", "If-Range": '"stale"'})
+    ok = (full.status_code == 200 and full.content == payload and full.headers["accept-ranges"] == "bytes"
+          and partial.status_code == 206 and partial.content == payload[10:20]
+          and partial.headers["content-range"] == f"bytes 10-19/{len(payload)}"
+          and suffix.status_code == 206 and suffix.content == payload[-4:]
+          and beyond.status_code == 416 and beyond.headers["content-range"] == f"bytes */{len(payload)}"
+          and stale.status_code == 200 and stale.content == payload)
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} full={full.status_code} range={partial.status_code} suffix={suffix.status_code} "
+          f"beyond={beyond.status_code} stale If-Range={stale.status_code}")
+
+    print("\n[4/4] Conditional requests get 304...")
+    by_etag = client.get("/api/uploads/sample.bin", headers={"If-None-Match": full.headers["etag"]})
+    by_date = client.get("/api/uploads/sample.bin", headers={"If-Modified-Since": full.headers["last-modified"]})
+    changed = client.get("/api/uploads/sample.bin", headers={"If-None-Match": '"other"'})
+    ok = by_etag.status_code == 304 and not by_etag.content and by_date.status_code == 304 and changed.status_code == 200
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} If-None-Match={by_etag.status_code} If-Modified-Since={by_date.status_code} "
+          f"other ETag={changed.status_code}")
+
+    Path(uploads_dir, "sample.bin").unlink()
+    os.rmdir(uploads_dir)
+    print("\n" + "=" * 60)
+    print("✓ All checks passed" if not failures else f"✗ {failures} check(s) failed")
+    print("=" * 60)
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
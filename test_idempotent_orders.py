@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Idempotent Order Test Script
+Runs two "workers" against the same Idempotency-Key in a throwaway
+database and checks that a takeover after IDEMPOTENCY_LOCK_SECONDS never
+produces a second order or a second stock reservation: a stalled worker is
+fenced out before it reserves stock, and a worker that loses the race on
+the order insert answers with the stored order and keeps the key.
+
+Usage:
+    python test_idempotent_orders.py
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017
+    DB_NAME    defaults to idempotent_orders_test (dropped before and after the run)
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'idempotent_orders_test')
+os.environ.setdefault('IDEMPOTENCY_LOCK_SECONDS', '0.5')
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+import server  # noqa: E402
+
+LOCK = server.IDEMPOTENCY_LOCK_SECONDS
+STOCK = 10
+QUANTITY = 2
+
+
+async def reset():
+    for name in ("products", "orders", "idempotency_keys"):
+        await server.db[name].delete_many({})
+    server.idempotency_cache.clear()
+    await server.db.products.insert_one({"id": "p1", "name": "Lamp", "description": "", "price": 5.0,
+                                         "category_id": "c1", "stock": STOCK})
+
+
+def order_request():
+    return server.OrderCreate(
+        items=[server.OrderItem(product_id="p1", product_name="", quantity=QUANTITY, price=0)],
+        shipping_address=server.AddressInfo(street_address="1 Main St", city="Town", state="ST", zip_code="00000"),
+        total=0,
+    )
+
+
+async def state(record_id):
+    orders = await server.db.orders.count_documents({})
+    product = await server.db.products.find_one({"id": "p1"})
+    key = await server.db.idempotency_keys.find_one({"id": record_id})
+    return orders, product["stock"], key
+
+
+async def run_takeover(stall):
+    """Worker A stalls inside `stall`; worker B takes the key over meanwhile"""
+    await reset()
+    record_id = "u1:key"
+    request = order_request()
+    request_hash = server.hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+    worker_a = asyncio.ensure_future(server._place_order_once(record_id, request_hash, "u1", request))
+    await asyncio.sleep(LOCK * 1.5)
+    stall.release()
+    worker_b = await server._place_order_once(record_id, request_hash, "u1", request)
+    worker_a = await worker_a
+    return worker_a, worker_b, await state(record_id)
+
+
+class Stall:
+    """Patches server.<name> so its first call blocks until released, later calls pass through"""
+
+    def __init__(self, name, before=True):
+        self.name, self.before = name, before
+        self.original = getattr(server, name)
+        self.released = asyncio.Event()
+        self.calls = 0
+        setattr(server, name, self)
+
+    async def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls > 1:
+            return await self.original(*args, **kwargs)
+        if self.before:
+            await self.released.wait()
+            await asyncio.sleep(LOCK)  # let worker B finish
+            return await self.original(*args, **kwargs)
+        result = await self.original(*args, **kwargs)
+        await self.released.wait()
+        await asyncio.sleep(LOCK)
+        return result
+
+    def release(self):
+        self.released.set()
+
+    def restore(self):
+        setattr(server, self.name, self.original)
+
+
+async def main():
+    print("=" * 60)
+    print("Idempotent Order Test")
+    print("=" * 60)
+    await server.client.drop_database(server.db.name)
+    await server.reconcile_indexes()
+    failures = 0
+
+    print("\n[1/3] A worker stalled before reserving stock is fenced out...")
+    stall = Stall("_refresh_idempotency_claim")
+    try:
+        a, b, (orders, stock, key) = await run_takeover(stall)
+    finally:
+        stall.restore()
+    ok = a.id == b.id and orders == 1 and stock == STOCK - QUANTITY and key["status"] == "completed"
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} same order={a.id == b.id} orders={orders} stock={stock} key={key['status']}")
+
+    print("\n[2/3] A worker stalled after reserving loses the insert and keeps the key...")
+    stall = Stall("reserve_stock", before=False)
+    try:
+        a, b, (orders, stock, key) = await run_takeover(stall)
+    finally:
+        stall.restore()
+    ok = a.id == b.id and orders == 1 and stock == STOCK - QUANTITY and key is not None and key["status"] == "completed"
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} same order={a.id == b.id} orders={orders} stock={stock} "
+          f"key={key['status'] if key else 'deleted'}")
+
+    print("\n[3/3] A retry after both workers finished returns the same order...")
+    server.idempotency_cache.clear()
+    request = order_request()
+    request_hash = server.hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+    again = await server._place_order_once("u1:key", request_hash, "u1", request)
+    orders, stock, _ = await state("u1:key")
+    ok = again.id == a.id and orders == 1 and stock == STOCK - QUANTITY
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} same order={again.id == a.id} orders={orders} stock={stock}")
+
+    await server.client.drop_database(server.db.name)
+    print("\n" + "=" * 60)
+    print("✓ All checks passed" if not failures else f"✗ {failures} check(s) failed")
+    print("=" * 60)
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Pagination Cursor Test Script
+Checks the backend keyset pagination helpers: `after` tokens round-trip
+for date and legacy ISO-string created_at values, malformed tokens are
+rejected with 400, and following `next` through a throwaway collection
+that mixes both timestamp kinds visits every document exactly once in
+KEYSET_SORT order.
+
+Usage:
+    python test_pagination_cursors.py
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017
+    DB_NAME    defaults to pagination_cursors_test (dropped before and after the run)
+"""
+
+import asyncio
+import base64
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import HTTPException
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'pagination_cursors_test')
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+import server  # noqa: E402
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def token(position) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def rejected(value) -> bool:
+    try:
+        server.decode_cursor(value)
+    except HTTPException as e:
+        return e.status_code == 400
+    return False
+
+
+async def main():
+    print("=" * 60)
+    print("Pagination Cursor Test")
+    print("=" * 60)
+    failures = 0
+
+    print("\n[1/4] Tokens round-trip for dates and ISO strings...")
+    date_doc = {"id": "p1", "created_at": NOW}
+    string_doc = {"id": "p2", "created_at": NOW.isoformat()}
+    decoded_date = server.decode_cursor(server.encode_cursor(date_doc))
+    decoded_string = server.decode_cursor(server.encode_cursor(string_doc))
+    ok = decoded_date == (NOW, "p1") and decoded_string == (NOW.isoformat(), "p2") and "=" not in server.encode_cursor(date_doc)
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} date={decoded_date} string={decoded_string}")
+
+    print("\n[2/4] Malformed tokens are rejected with 400...")
+    bad = {
+        "not base64": "***",
+        "not json": base64.urlsafe_b64encode(b"nope").decode(),
+        "unknown kind": token(["x", NOW.isoformat(), "p1"]),
+        "missing created_at": token(["s", None, "p1"]),
+        "bad date": token(["d", "yesterday", "p1"]),
+        "numeric id": token(["d", NOW.isoformat(), 7]),
+        "short": token(["d", NOW.isoformat()]),
+    }
+    results = {name: rejected(value) for name, value in bad.items()}
+    ok = all(results.values())
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} " + ", ".join(f"{name}={'400' if r else 'accepted'}" for name, r in results.items()))
+
+    print("\n[3/4] A date cursor also matches the legacy string rows that sort after it...")
+    date_filter = server.keyset_filter({"category_id": "c1"}, server.encode_cursor(date_doc))
+    string_filter = server.keyset_filter({}, server.encode_cursor(string_doc))
+    ok = (date_filter["category_id"] == "c1"
+          and {"created_at": {"$type": "string"}} in date_filter["$or"]
+          and {"created_at": {"$type": "string"}} not in string_filter["$or"]
+          and server.keyset_filter({"a": 1}, None) == {"a": 1})
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} date branches={len(date_filter['$or'])} string branches={len(string_filter['$or'])}")
+
+    print("\n[4/4] Following next visits every document once, dates before strings...")
+    collection = server.db.pagination_cursors
+    await collection.delete_many({})
+    docs = [{"id": f"d{i:02d}", "created_at": NOW - timedelta(minutes=i // 2)} for i in range(7)]
+    docs += [{"id": f"s{i:02d}", "created_at": (NOW - timedelta(days=1, minutes=i // 2)).isoformat()} for i in range(5)]
+    await collection.insert_many([dict(doc) for doc in docs])
+    seen, after, pages = [], None, 0
+    while True:
+        page, pagination = await server.paginate(collection, {}, {"_id": 0}, 1, 3, cursor=True, after=after, count="none")
+        seen += [doc["id"] for doc in page]
+        pages += 1
+        after = pagination["next"]
+        if not after or pages > 10:
+            break
+    expected = [doc["id"] for doc in sorted(docs[:7], key=lambda d: (d["created_at"], d["id"]), reverse=True)]
+    expected += [doc["id"] for doc in sorted(docs[7:], key=lambda d: (d["created_at"], d["id"]), reverse=True)]
+    ok = seen == expected and pages == 4
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} {pages} pages, order {'matches' if seen == expected else f'differs: {seen}'}")
+    await server.client.drop_database(server.db.name)
+
+    print("\n" + "=" * 60)
+    print("✓ All checks passed" if not failures else f"✗ {failures} check(s) failed")
+    print("=" * 60)
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Response Cache Test Script
+Exercises the backend ResponseCache on top of RedisCacheBackend, with
+fakeredis standing in for a Redis server: a hit after the first miss,
+generation bumps (including broader depends_on namespaces), falling back
+to the producer when Redis is down, and cache keys that free-text query
+parameters cannot forge.
+
+Usage:
+    pip install fakeredis
+    python test_response_cache.py
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'response_cache_test')
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from server import RedisCacheBackend, ResponseCache  # noqa: E402
+
+
+class Producer:
+    """Counts calls, like the database query behind a cached route"""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class DownRedis:
+    """A client whose every command fails, like a Redis server that went away"""
+
+    async def get(self, *args, **kwargs):
+        raise RedisConnectionError("Connection refused")
+
+    set = incr = get
+
+
+async def main():
+    print("=" * 60)
+    print("Response Cache Test (fakeredis)")
+    print("=" * 60)
+    failures = 0
+    redis = FakeAsyncRedis()
+    cache = ResponseCache(RedisCacheBackend(redis, ttl=60))
+
+    print("\n[1/5] The second request is served from Redis...")
+    producer = Producer({"data": [1, 2, 3]})
+    first = await cache.cached("products", {"page": 1}, producer)
+    second = await cache.cached("products", {"page": 1}, producer)
+    ok = producer.calls == 1 and first.body == second.body and cache.hits == 1 and cache.misses == 1
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} producer calls={producer.calls} hits={cache.hits} misses={cache.misses}")
+
+    print("\n[2/5] Bumping the namespace generation orphans the cached entry...")
+    await cache.invalidate("products")
+    await cache.cached("products", {"page": 1}, producer)
+    generation = int(await redis.get("resp:gen:products"))
+    ok = producer.calls == 2 and generation == 1
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} producer calls={producer.calls} generation={generation}")
+
+    print("\n[3/5] Bumping a depends_on namespace orphans the narrow entries too...")
+    detail = Producer({"id": "p1"})
+    await cache.cached("product:p1", {"lang": "en"}, detail, depends_on=("product-details",))
+    await cache.cached("product:p1", {"lang": "en"}, detail, depends_on=("product-details",))
+    await cache.invalidate("product-details")
+    await cache.cached("product:p1", {"lang": "en"}, detail, depends_on=("product-details",))
+    ok = detail.calls == 2
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} producer calls={detail.calls}")
+
+    print("\n[4/5] Free-text parameters cannot collide with other keys...")
+    forged = ResponseCache._key("products", "0", {"category_id": "a&page=2"})
+    honest = ResponseCache._key("products", "0", {"category_id": "a", "page": 2})
+    ok = forged != honest
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} {forged!r} vs {honest!r}")
+
+    print("\n[5/5] A Redis outage falls back to the producer...")
+    down = ResponseCache(RedisCacheBackend(DownRedis(), ttl=60))
+    producer = Producer({"data": []})
+    response = await down.cached("products", {"page": 1}, producer)
+    await down.invalidate("products")
+    ok = producer.calls == 1 and response.status_code == 200 and down.errors == 2
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} producer calls={producer.calls} status={response.status_code} errors={down.errors}")
+
+    await redis.aclose()
+    print("\n" + "=" * 60)
+    print("✓ All checks passed" if not failures else f"✗ {failures} check(s) failed")
+    print("=" * 60)
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+SFTP Pool Test Script
+Starts a throwaway SSH/SFTP server on localhost (backed by a temp directory)
+and exercises the backend SFTPPool against it: session reuse, concurrent
+uploads, reconnecting after the server drops a session, and clean shutdown.
+
+Usage:
+    python test_sftp_pool.py
+"""
+
+import io
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import paramiko
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'sftp_pool_test')
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from server import SFTPPool  # noqa: E402
+
+
+class _Server(paramiko.ServerInterface):
+    def __init__(self, public_key):
+        self.public_key = public_key
+
+    def check_auth_publickey(self, username, key):
+        if key.get_base64() == self.public_key.get_base64():
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return "publickey"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+
+class _SFTPHandle(paramiko.SFTPHandle):
+    def stat(self):
+        return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+
+class _SFTPServer(paramiko.SFTPServerInterface):
+    ROOT = None
+
+    def _path(self, path):
+        return os.path.join(self.ROOT, self.canonicalize(path).lstrip('/'))
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._path(path)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    lstat = stat
+
+    def mkdir(self, path, attr):
+        try:
+            os.mkdir(self._path(path))
+            return paramiko.SFTP_OK
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def open(self, path, flags, attr):
+        try:
+            fd = os.open(self._path(path), flags, 0o644)
+            mode = 'r+b' if flags & os.O_RDWR else ('wb' if flags & os.O_WRONLY else 'rb')
+            handle = _SFTPHandle(flags)
+            handle.readfile = handle.writefile = os.fdopen(fd, mode)
+            return handle
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+
+class LocalSFTPServer:
+    """Accepts SSH connections on a random localhost port in a background thread"""
+
+    def __init__(self, root, client_key):
+        _SFTPServer.ROOT = root
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.client_key = client_key
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(16)
+        self.port = self.sock.getsockname()[1]
+        self.transports = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(self.host_key)
+            transport.set_subsystem_handler("sftp", paramiko.SFTPServer, _SFTPServer)
+            transport.start_server(server=_Server(self.client_key))
+            self.transports.append(transport)
+
+    def drop_all(self):
+        for transport in self.transports:
+            transport.close()
+
+    def close(self):
+        self.drop_all()
+        self.sock.close()
+
+
+def _private_key_text(key):
+    buffer = io.StringIO()
+    key.write_private_key(buffer)
+    return buffer.getvalue()
+
+
+def main():
+    print("=" * 60)
+    print("SFTP Pool Test (local server)")
+    print("=" * 60)
+
+    client_key = paramiko.RSAKey.generate(2048)
+    with tempfile.TemporaryDirectory() as root:
+        server = LocalSFTPServer(root, client_key)
+        pool = SFTPPool("127.0.0.1", server.port, "tester", _private_key_text(client_key),
+                        "uploads", max_size=3, idle_check_seconds=0)
+        failures = 0
+
+        print("\n[1/4] Sequential uploads reuse one session...")
+        for i in range(5):
+            pool.upload(io.BytesIO(b"x" * 1024), f"seq-{i}.bin")
+        stats = pool.stats()
+        ok = stats["connections_opened"] == 1 and stats["connections_reused"] == 4
+        failures += not ok
+        print(f"{'✓' if ok else '✗'} opened={stats['connections_opened']} reused={stats['connections_reused']}")
+
+        print("\n[2/4] 20 concurrent uploads stay within the pool bound...")
+        payload = os.urandom(256 * 1024)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            list(executor.map(lambda i: pool.upload(io.BytesIO(payload), f"par-{i}.bin"), range(20)))
+        elapsed = time.perf_counter() - started
+        stats = pool.stats()
+        written = [p for p in Path(root, "uploads").glob("par-*.bin") if p.read_bytes() == payload]
+        ok = stats["connections_opened"] <= 3 and len(written) == 20
+        failures += not ok
+        print(f"{'✓' if ok else '✗'} {len(written)}/20 files intact, {stats['connections_opened']} sessions, {elapsed:.2f}s")
+
+        print("\n[3/4] Dropped sessions are detected and replaced...")
+        server.drop_all()
+        time.sleep(0.2)
+        pool.upload(io.BytesIO(b"after drop"), "after-drop.bin")
+        stats = pool.stats()
+        ok = Path(root, "uploads", "after-drop.bin").read_bytes() == b"after drop" and stats["reconnects"] >= 1
+        failures += not ok
+        print(f"{'✓' if ok else '✗'} reconnects={stats['reconnects']} failures={stats['failures']}")
+
+        print("\n[4/4] Closing the pool releases every session...")
+        pool.close()
+        stats = pool.stats()
+        ok = stats["idle"] == 0 and stats["in_use"] == 0
+        failures += not ok
+        print(f"{'✓' if ok else '✗'} idle={stats['idle']} in_use={stats['in_use']}")
+
+        server.close()
+
+    print("\n" + "=" * 60)
+    print("✓ All checks passed" if not failures else f"✗ {failures} check(s) failed")
+    print("=" * 60)
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Translation Bundle Test Script
+Exercises the backend TranslationBundles cache against a throwaway
+database: delta responses (since=<version>), and two translation writes
+that store their documents out of revision order. The write that lands
+late must still reach the bundle and the delta of a client that polled
+in between. Concurrent requests for a language must share one build,
+and a write applied while a bundle is being built must not leave the
+stale bundle behind.
+
+Usage:
+    python test_translation_bundles.py
+
+Environment:
+    MONGO_URL  defaults to mongodb://localhost:27017
+    DB_NAME    defaults to translation_bundles_test (dropped before and after the run)
+"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'translation_bundles_test')
+os.environ.setdefault('TRANSLATION_WRITE_WINDOW_SECONDS', '1')
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+import server  # noqa: E402
+
+WINDOW = server.TRANSLATION_WRITE_WINDOW_SECONDS
+
+
+def entry(key, en, ar):
+    return server.TranslationCreate(key=key, en=en, ar=ar)
+
+
+async def main():
+    print("=" * 60)
+    print("Translation Bundle Test")
+    print("=" * 60)
+    await server.client.drop_database(server.db.name)
+    await server.reconcile_indexes()
+    bundles = server.translation_bundles = server.TranslationBundles(check_seconds=0)
+    failures = 0
+
+    print("\n[1/6] Writes are picked up and served in the bundle...")
+    await server.upsert_translation(entry("home.title", "Home", "الرئيسية"), admin=None)
+    await server.upsert_translation(entry("cart.title", "Cart", "السلة"), admin=None)
+    bundle = await bundles.get("ar")
+    strings = json.loads(bundle.body)
+    ok = strings == {"home.title": "الرئيسية", "cart.title": "السلة"} and bundle.version <= bundles.version
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} keys={sorted(strings)} version={bundle.version} applied={bundles.version}")
+
+    print("\n[2/6] A delta returns only the keys changed after since...")
+    await asyncio.sleep(WINDOW * 1.2)
+    await bundles.refresh()
+    since = (await bundles.delta("en", 0))["version"]
+    await server.upsert_translation(entry("cart.title", "Basket", "السلة"), admin=None)
+    delta = await bundles.delta("en", since)
+    ok = since == 2 and delta["changes"] == {"cart.title": "Basket"}
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} since={since} changes={delta['changes']}")
+
+    print("\n[3/6] A write that lands after a higher revision still reaches the bundle...")
+    await asyncio.sleep(WINDOW * 1.2)
+    await bundles.refresh()
+    late_rev = await server.next_translation_rev()  # writer A reserves, then stalls
+    await server.upsert_translation(entry("checkout.title", "Checkout", "الدفع"), admin=None)  # writer B
+    polled = await bundles.delta("en", since)  # a client polls between the two writes
+    await server.db.translations.update_one(
+        {"key": "late.title"},
+        {"$set": {"key": "late.title", "en": "Late", "ar": "متأخر", "rev": late_rev,
+                  "updated_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+    await bundles.refresh()
+    strings = json.loads((await bundles.get("en")).body)
+    ok = "late.title" not in polled["changes"] and strings.get("late.title") == "Late"
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} in bundle={strings.get('late.title')!r} first poll={sorted(polled['changes'])}")
+
+    print("\n[4/6] The client's next delta from the version it was handed includes the late write...")
+    delta = await bundles.delta("en", polled["version"])
+    ok = polled["version"] < late_rev and delta["changes"].get("late.title") == "Late"
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} handed version={polled['version']} late rev={late_rev} changes={sorted(delta['changes'])}")
+
+    print("\n[5/6] Concurrent requests for a language share one build...")
+    await server.upsert_translation(entry("menu.title", "Menu", "القائمة"), admin=None)
+    rebuilds = bundles.rebuilds
+    results = await asyncio.gather(*(bundles.get("ar") for _ in range(5)))
+    ok = bundles.rebuilds == rebuilds + 1 and all(bundle is results[0] for bundle in results)
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} builds={bundles.rebuilds - rebuilds} for {len(results)} requests")
+
+    print("\n[6/6] A write applied during a build does not leave a stale bundle...")
+
+    async def write_during_build():
+        await asyncio.sleep(0)  # let the build start first
+        await server.upsert_translation(entry("search.title", "Search", "بحث"), admin=None)
+
+    await server.upsert_translation(entry("menu.title", "Main menu", "القائمة"), admin=None)
+    during, _ = await asyncio.gather(bundles.get("en"), write_during_build())
+    after = json.loads((await bundles.get("en")).body)
+    ok = after.get("search.title") == "Search" and after.get("menu.title") == "Main menu"
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} bundle during the write has search.title={'search.title' in json.loads(during.body)}, "
+          f"next bundle has it={'search.title' in after}")
+
+    await server.client.drop_database(server.db.name)
+    print("\n" + "=" * 60)
+    print("✓ All checks passed" if not failures else f"✗ {failures} check(s) failed")
+    print("=" * 60)
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))